@@ -5,7 +5,6 @@ Account Monitor - 계좌 모니터링 모듈
 """
 
 import asyncio
-import aiohttp
 import json
 import time
 from datetime import datetime, timedelta
@@ -16,6 +15,7 @@ from decimal import Decimal, ROUND_HALF_UP
 from config.settings import Settings
 from utils.token_manager import TokenManager
 from utils.logger import get_logger
+from api.kiwoom_transport import get_kiwoom_transport
 from database.database_manager import get_database_manager
 
 logger = get_logger("account_monitor")
@@ -63,6 +63,7 @@ class AccountMonitor:
         self.settings = settings
         self.token_manager = token_manager
         self.db = get_database_manager()
+        self.transport = get_kiwoom_transport(settings)  # 키움 REST 공용 전송 계층 (계좌 조회 우선순위)
         
         # 모니터링 설정
         self.monitoring_interval = 30  # 30초마다 모니터링
@@ -102,32 +103,31 @@ class AccountMonitor:
                 'dmst_stex_tp': 'KRX',
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, headers=headers, json=data) as response:
-                    if response.status != 200:
-                        logger.error(f"계좌 요약 조회 실패: {response.status}")
-                        return None
-                    
-                    result = await response.json()
-                    if result.get('return_code') != 0:
-                        logger.error(f"API 오류: {result.get('return_message', 'Unknown error')}")
-                        return None
-                    
-                    # 데이터 파싱
-                    summary = AccountSummary(
-                        deposit=int(str(result.get('prsm_dpst_aset_amt', '0')).lstrip('0') or '0'),
-                        total_evaluation=int(str(result.get('tot_evlt_amt', '0')).lstrip('0') or '0'),
-                        total_profit_rate=float(str(result.get('tot_prft_rt', '0')).replace('+', '').lstrip('0') or '0'),
-                        total_purchase=int(str(result.get('tot_pur_amt', '0')).lstrip('0') or '0'),
-                        total_profit_loss=int(str(result.get('tot_evlt_pl', '0')).lstrip('0') or '0'),
-                        estimated_assets=int(str(result.get('tot_evlt_amt', '0')).lstrip('0') or '0')
-                    )
-                    
-                    # 데이터베이스에 저장
-                    self._save_account_summary(summary)
-                    
-                    return summary
-                    
+            response = await self.transport.post(url, headers=headers, json_data=data)
+            if not response.ok:
+                logger.error(f"계좌 요약 조회 실패: {response.status}")
+                return None
+            
+            result = response.data
+            if result.get('return_code') != 0:
+                logger.error(f"API 오류: {result.get('return_message', 'Unknown error')}")
+                return None
+            
+            # 데이터 파싱
+            summary = AccountSummary(
+                deposit=int(str(result.get('prsm_dpst_aset_amt', '0')).lstrip('0') or '0'),
+                total_evaluation=int(str(result.get('tot_evlt_amt', '0')).lstrip('0') or '0'),
+                total_profit_rate=float(str(result.get('tot_prft_rt', '0')).replace('+', '').lstrip('0') or '0'),
+                total_purchase=int(str(result.get('tot_pur_amt', '0')).lstrip('0') or '0'),
+                total_profit_loss=int(str(result.get('tot_evlt_pl', '0')).lstrip('0') or '0'),
+                estimated_assets=int(str(result.get('tot_evlt_amt', '0')).lstrip('0') or '0')
+            )
+            
+            # 데이터베이스에 저장
+            self._save_account_summary(summary)
+            
+            return summary
+            
         except Exception as e:
             logger.error(f"계좌 요약 조회 중 오류: {e}")
             return None
@@ -152,40 +152,39 @@ class AccountMonitor:
                 'dmst_stex_tp': 'KRX',
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, headers=headers, json=data) as response:
-                    if response.status != 200:
-                        logger.error(f"포트폴리오 조회 실패: {response.status}")
-                        return []
-                    
-                    result = await response.json()
-                    if result.get('return_code') != 0:
-                        logger.error(f"API 오류: {result.get('return_message', 'Unknown error')}")
-                        return []
-                    
-                    portfolio_list = result.get('acnt_evlt_remn_indv_tot', [])
-                    portfolio_items = []
-                    
-                    for item in portfolio_list:
-                        portfolio_item = PortfolioItem(
-                            stock_code=item.get('stk_cd', ''),
-                            stock_name=item.get('stk_nm', ''),
-                            current_price=int(str(item.get('cur_prc', '0')).lstrip('0') or '0'),
-                            quantity=int(str(item.get('rmnd_qty', '0')).lstrip('0') or '0'),
-                            purchase_price=int(str(item.get('pur_pric', '0')).lstrip('0') or '0'),
-                            purchase_amount=int(str(item.get('pur_amt', '0')).lstrip('0') or '0'),
-                            evaluation_amount=int(str(item.get('evlt_amt', '0')).lstrip('0') or '0'),
-                            profit_loss=int(str(item.get('evltv_prft', '0')).lstrip('0') or '0'),
-                            profit_rate=float(str(item.get('prft_rt', '0')).replace('+', '').lstrip('0') or '0'),
-                            orderable_quantity=int(str(item.get('trde_able_qty', '0')).lstrip('0') or '0')
-                        )
-                        portfolio_items.append(portfolio_item)
-                    
-                    # 데이터베이스에 저장
-                    self._save_portfolio(portfolio_items)
-                    
-                    return portfolio_items
-                    
+            response = await self.transport.post(url, headers=headers, json_data=data)
+            if not response.ok:
+                logger.error(f"포트폴리오 조회 실패: {response.status}")
+                return []
+            
+            result = response.data
+            if result.get('return_code') != 0:
+                logger.error(f"API 오류: {result.get('return_message', 'Unknown error')}")
+                return []
+            
+            portfolio_list = result.get('acnt_evlt_remn_indv_tot', [])
+            portfolio_items = []
+            
+            for item in portfolio_list:
+                portfolio_item = PortfolioItem(
+                    stock_code=item.get('stk_cd', ''),
+                    stock_name=item.get('stk_nm', ''),
+                    current_price=int(str(item.get('cur_prc', '0')).lstrip('0') or '0'),
+                    quantity=int(str(item.get('rmnd_qty', '0')).lstrip('0') or '0'),
+                    purchase_price=int(str(item.get('pur_pric', '0')).lstrip('0') or '0'),
+                    purchase_amount=int(str(item.get('pur_amt', '0')).lstrip('0') or '0'),
+                    evaluation_amount=int(str(item.get('evlt_amt', '0')).lstrip('0') or '0'),
+                    profit_loss=int(str(item.get('evltv_prft', '0')).lstrip('0') or '0'),
+                    profit_rate=float(str(item.get('prft_rt', '0')).replace('+', '').lstrip('0') or '0'),
+                    orderable_quantity=int(str(item.get('trde_able_qty', '0')).lstrip('0') or '0')
+                )
+                portfolio_items.append(portfolio_item)
+            
+            # 데이터베이스에 저장
+            self._save_portfolio(portfolio_items)
+            
+            return portfolio_items
+            
         except Exception as e:
             logger.error(f"포트폴리오 조회 중 오류: {e}")
             return []
@@ -1,9 +1,13 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
 import warnings
+from database.backtest_store import get_backtest_store
 warnings.filterwarnings('ignore')
 
 # 한글 폰트 설정
@@ -27,6 +31,22 @@ class AnalysisVisualizer:
         print(f"거래 데이터 로드 완료: {len(self.trades_df)} 건")
         return self.trades_df
     
+    def load_run(self, run_id=None, store=None, **filters):
+        """
+        백테스트 결과 저장소(database/backtest_store.py)에서 거래 데이터 로드
+
+        Args:
+            run_id: 실행 ID (None 이면 가장 최근 실행)
+            filters: stock_code / date_range / exit_reason 조건
+        """
+        store = store or get_backtest_store()
+        run_id = run_id or store.latest_run_id()
+        if run_id is None:
+            raise LookupError("저장된 백테스트 실행이 없습니다.")
+        self.trades_df = store.load_trades(run_id, **filters)
+        print(f"거래 데이터 로드 완료: {len(self.trades_df)} 건 (run {run_id})")
+        return self.trades_df
+    
     def calculate_metrics(self):
         """성과 지표 계산"""
         if self.trades_df is None or len(self.trades_df) == 0:
@@ -290,16 +310,13 @@ def main():
     """메인 실행 함수"""
     visualizer = AnalysisVisualizer()
     
-    # 거래 데이터 로드 (파일명에 따라 수정)
+    # 거래 데이터 로드 (백테스트 결과 저장소의 최근 실행)
     try:
-        visualizer.load_trades('gradual_rise_trades.csv')
-    except FileNotFoundError:
-        try:
-            visualizer.load_trades('optimized_trades.csv')
-        except FileNotFoundError:
-            print("거래 데이터 파일을 찾을 수 없습니다.")
-            print("먼저 백테스트를 실행해주세요.")
-            return
+        visualizer.load_run()
+    except LookupError:
+        print("저장된 백테스트 결과가 없습니다.")
+        print("먼저 백테스트를 실행해주세요.")
+        return
     
     # 종합 분석 리포트 생성
     visualizer.create_comprehensive_report()
@@ -6,16 +6,17 @@ Strategy 2 Analyzer - 전략 2 최종 버전 분석기
 
 import asyncio
 import logging
-import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
-import requests
 
 from utils.logger import get_logger
 from config.settings import Settings
 from utils.token_manager import TokenManager
 from database.database_manager import get_database_manager
+from data_collection.market_regime import current_regime, format_regime, REGIME_BEAR
+from data_collection.daily_chart_cache import get_daily_chart_cache
+from data_collection.market_snapshot import get_market_snapshot_service
 
 logger = get_logger("strategy2_analyzer")
 
@@ -36,6 +37,7 @@ class Strategy2Candidate:
     confidence_score: float  # 신뢰도 점수
     timestamp: datetime
     strategy_type: str = "순추세_조용한상승"
+    market_regime: str = ""  # 시장상황 (상승장/횡보장/하락장)
 
 class Strategy2Analyzer:
     """전략 2 최종 버전 분석 클래스"""
@@ -64,10 +66,15 @@ class Strategy2Analyzer:
         
         self.strategy_logic = settings.VOLUME_SCANNING.get("strategy2_logic", "AND_OR")
         self.enabled = settings.VOLUME_SCANNING.get("strategy2_enabled", True)
+        self.market_regime_filter = settings.VOLUME_SCANNING.get("market_regime_filter", False)
         
         # 데이터베이스 매니저
         self.db = get_database_manager()
         
+        # 일봉/거래량 순위는 공용 캐시와 스냅샷으로 조회
+        self.daily_charts = get_daily_chart_cache(settings)  # 일봉 캐시 (종목/기준일당 1회 조회)
+        self.market_snapshot = get_market_snapshot_service(settings)  # 거래량 순위 공용 스냅샷
+        
         logger.info("전략 2 분석기 초기화 완료")
         logger.info(f"핵심 조건: 등락률 {self.core_conditions['price_change_min']}~{self.core_conditions['price_change_max']}%, 거래량비율 {self.core_conditions['volume_ratio_max']}% 미만")
         logger.info(f"추가 조건: 거래대금 {self.additional_conditions['min_market_amount']/100000000:.1f}억원 이상, 이동평균선 추세 확인")
@@ -98,46 +105,15 @@ class Strategy2Analyzer:
         # 최소 1개 이상 충족하면 True
         return conditions_met >= 1
     
-    async def get_moving_averages(self, stock_code: str) -> Tuple[float, float]:
-        """이동평균선 계산"""
+    async def get_moving_averages(self, stock_code: str, current_price: float) -> Tuple[float, float]:
+        """이동평균선 계산 (어제까지 일봉은 캐시, 오늘 봉은 거래량 순위의 현재가)"""
         try:
-            token = await self.token_manager.get_valid_token()
-            if not token:
-                return 0.0, 0.0
-            
-            # 일봉 데이터 조회
-            url = self.settings.get_api_url("daily_chart")
-            headers = self.settings.get_headers(tr_type="daily_chart")
-            
-            data = {
-                "stk_cd": stock_code,
-                "base_dt": datetime.now().strftime("%Y%m%d"),
-                "upd_stkpc_tp": "1",
-                "req_cnt": 80,
-            }
-            
-            response = requests.post(url, headers=headers, json=data)
-            
-            if response.status_code != 200:
-                return 0.0, 0.0
-            
-            result = response.json()
-            daily_data = result.get('stk_dt_pole_chart_qry', [])
-            
-            if not daily_data or len(daily_data) < 30:
+            chart = await self.daily_charts.get(stock_code)
+            if chart is None or len(chart) + 1 < 30:
                 return 0.0, 0.0
             
-            # DataFrame 구성
-            df = pd.DataFrame(daily_data)
-            if 'dt' in df.columns:
-                df = df.sort_values('dt').reset_index(drop=True)
-            
-            df['cur_prc'] = df['cur_prc'].astype(int).abs()
-            
-            # 이동평균선 계산
-            ma_short = df['cur_prc'].rolling(window=self.additional_conditions["ma_short_period"]).mean().iloc[-1]
-            ma_long = df['cur_prc'].rolling(window=self.additional_conditions["ma_long_period"]).mean().iloc[-1]
-            
+            ma_short = chart.moving_average(self.additional_conditions["ma_short_period"], current_price)
+            ma_long = chart.moving_average(self.additional_conditions["ma_long_period"], current_price)
             return ma_short, ma_long
             
         except Exception as e:
@@ -201,7 +177,7 @@ class Strategy2Analyzer:
             market_amount = one_min_qty * current_price
             
             # 이동평균선 계산
-            ma_short, ma_long = await self.get_moving_averages(stock_code)
+            ma_short, ma_long = await self.get_moving_averages(stock_code, current_price)
             
             # 핵심 조건 확인
             core_conditions_met = self.check_core_conditions(price_change, volume_ratio)
@@ -248,8 +224,8 @@ class Strategy2Analyzer:
         self.order_manager = order_manager
         logger.info("주문 매니저가 전략 2 분석기에 연결되었습니다.")
 
-    async def scan_strategy2_candidates(self) -> List[Strategy2Candidate]:
-        """전략 2 후보 종목 스캔"""
+    async def scan_strategy2_candidates(self, snapshot=None) -> List[Strategy2Candidate]:
+        """전략 2 후보 종목 스캔 (snapshot 이 없으면 공용 스냅샷 조회)"""
         if not self.enabled:
             logger.info("전략 2가 비활성화되어 있습니다.")
             return []
@@ -257,24 +233,36 @@ class Strategy2Analyzer:
         try:
             logger.info("전략 2 후보 종목 스캔 시작...")
             
-            # 기존 volume_scanner의 데이터 활용 (중복 API 호출 방지)
-            if hasattr(self, 'volume_scanner') and self.volume_scanner:
-                # volume_scanner에서 이미 스캔된 데이터 활용
-                volume_data = await self.volume_scanner.get_volume_ranking()
+            # 거래량 순위 (공용 시장 스냅샷 - 전략별 중복 조회 없음)
+            if snapshot is not None:
+                volume_data = list(snapshot.volume_ranking)
             else:
-                # 독립적으로 거래량 순위 조회
                 volume_data = await self.get_volume_ranking()
             
             if not volume_data:
                 logger.warning("거래량 데이터를 가져올 수 없습니다.")
                 return []
             
+            # 시장상황은 스캔당 한 번만 조회
+            try:
+                market = current_regime()
+            except Exception as e:
+                logger.warning(f"KOSPI 시장상황 조회 실패: {e}")
+                market = None
+            if market:
+                logger.info(f"시장상황: {format_regime(market)}")
+                if self.market_regime_filter and market['regime'] == REGIME_BEAR:
+                    logger.info("하락장 - 전략 2 신규 매수 신호 생략")
+                    self.candidates = []
+                    return []
+            
             candidates = []
             
             for item in volume_data:
                 try:
                     candidate = await self.analyze_stock(item)
                     if candidate and candidate.final_signal:
+                        candidate.market_regime = market['label'] if market else ""
                         candidates.append(candidate)
                         
                         logger.info(f"🎯 전략 2 매수 신호 발생! {candidate.stock_name}({candidate.stock_code})")
@@ -286,11 +274,13 @@ class Strategy2Analyzer:
                         logger.info(f"   신뢰도: {candidate.confidence_score:.2f}")
                         logger.info(f"   핵심조건: {'만족' if candidate.core_conditions_met else '불만족'}")
                         logger.info(f"   추가조건: {'만족' if candidate.additional_conditions_met else '불만족'}")
+                        if candidate.market_regime:
+                            logger.info(f"   시장상황: {candidate.market_regime}")
                         
                         # 주문 매니저를 통한 자동매매 실행
                         if hasattr(self, 'order_manager') and self.order_manager:
                             try:
-                                order = self.order_manager.handle_strategy2_candidate(candidate)
+                                order = await self.order_manager.handle_strategy2_candidate(candidate)
                                 if order:
                                     logger.info(f"전략 2 자동매매 실행: {candidate.stock_code}")
                                 else:
@@ -330,33 +320,9 @@ class Strategy2Analyzer:
             return []
     
     async def get_volume_ranking(self) -> List[Dict]:
-        """거래량 순위 조회 (기존 volume_scanner의 로직 활용)"""
-        try:
-            token = await self.token_manager.get_valid_token()
-            if not token:
-                return []
-            
-            url = self.settings.get_api_url("volume_ranking")
-            headers = self.settings.get_headers(tr_type="volume_ranking")
-            
-            data = {
-                "stk_cd": "",
-                "base_dt": datetime.now().strftime("%Y%m%d"),
-                "upd_stkpc_tp": "1",
-                "req_cnt": 100,
-            }
-            
-            response = requests.post(url, headers=headers, json=data)
-            
-            if response.status_code != 200:
-                return []
-            
-            result = response.json()
-            return result.get('stk_vol_rank_qry', [])
-            
-        except Exception as e:
-            logger.error(f"거래량 순위 조회 실패: {e}")
-            return []
+        """거래량 급증 종목 순위 (공용 시장 스냅샷, 오래됐으면 새로 조회)"""
+        snapshot = await self.market_snapshot.get()
+        return list(snapshot.volume_ranking) if snapshot else []
     
     def get_candidates_summary(self) -> List[Dict]:
         """후보 종목 요약 반환"""
@@ -370,6 +336,7 @@ class Strategy2Analyzer:
                 'market_amount': c.market_amount,
                 'confidence_score': c.confidence_score,
                 'final_signal': c.final_signal,
+                'market_regime': c.market_regime,
                 'timestamp': c.timestamp.isoformat()
             }
             for c in self.candidates
@@ -391,21 +358,20 @@ class Strategy2Analyzer:
         """지속적인 스캐닝 시작"""
         logger.info("전략 2 스캐닝 시작...")
         
-        scan_interval = self.settings.VOLUME_SCANNING.get("scan_interval", 30)
-        
+        last_tick = 0
         while True:
             try:
-                # 전략 2 후보 스캔
-                candidates = await self.scan_strategy2_candidates()
+                # 공용 시장 스냅샷 구독 (조회 간격은 MarketSnapshotService 가 관리)
+                snapshot = await self.market_snapshot.next_snapshot(last_tick)
+                last_tick = snapshot.tick
                 
-                # 스캔 간격 대기
-                await asyncio.sleep(scan_interval)
+                # 전략 2 후보 스캔
+                await self.scan_strategy2_candidates(snapshot)
                 
             except Exception as e:
                 logger.error(f"전략 2 스캐닝 중 오류: {e}")
-                await asyncio.sleep(scan_interval) 
 
     def set_volume_scanner(self, volume_scanner):
-        """Volume Scanner 설정 (데이터 공유용)"""
+        """Volume Scanner 설정 (거래량 순위는 공용 시장 스냅샷으로 공유)"""
         self.volume_scanner = volume_scanner
         logger.info("Volume Scanner가 전략 2 분석기에 연결되었습니다.") 
\ No newline at end of file
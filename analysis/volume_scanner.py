@@ -6,21 +6,19 @@ Volume Scanner - 거래량 급증 종목 스크리닝
 
 import asyncio
 import logging
-import time
 import json
-import pandas as pd
-import requests
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
-import threading
-import collections
-import aiohttp
 
 from utils.logger import get_logger
+from api.kiwoom_transport import get_kiwoom_transport
 from config.settings import Settings
 from utils.token_manager import TokenManager
 from database.database_manager import get_database_manager
+from data_collection.market_regime import current_regime, format_regime, REGIME_BEAR
+from data_collection.daily_chart_cache import get_daily_chart_cache
+from data_collection.market_snapshot import get_market_snapshot_service
 
 logger = get_logger("volume_scanner")
 
@@ -38,6 +36,7 @@ class VolumeCandidate:
     is_breakout: bool   # 고점 돌파 여부
     ma_trend: str       # 이동평균 추세
     execution_strength: float = 0.0
+    market_regime: str = ""  # 시장상황 (상승장/횡보장/하락장)
 
 class VolumeScanner:
     """거래량 급증 종목 스크리닝 클래스"""
@@ -56,11 +55,10 @@ class VolumeScanner:
         self.last_breakout_check: Dict[str, datetime] = {}  # 종목별 마지막 돌파 체크 시간
         self.breakout_cooldown = 300  # 돌파 감지 후 5분간 대기
         
-        # API Rate Limiting (더 빠른 응답을 위해 조정)
-        self.API_RATE_LIMIT = 3  # 초당 3건으로 증가 (기존 2건에서 증가)
-        self.API_WINDOW = 1.0    # 1초로 단축 (기존 2초에서 단축)
-        self.api_call_timestamps = collections.deque(maxlen=self.API_RATE_LIMIT)
-        self.api_rate_lock = threading.Lock()
+        # 키움 REST 공용 전송 계층 (커넥션 풀, 초당 호출 제한은 프로세스 전체 공유)
+        self.transport = get_kiwoom_transport(settings)
+        self.daily_charts = get_daily_chart_cache(settings)  # 일봉 캐시 (종목/기준일당 1회 조회)
+        self.market_snapshot = get_market_snapshot_service(settings)  # 거래량 순위 공용 스냅샷
         
         # 스캐닝 설정 (최적화된 거래 조건 - 분석 결과 기반)
         self.scan_interval = getattr(settings, 'VOLUME_SCANNING', {}).get('scan_interval', 120)
@@ -79,6 +77,9 @@ class VolumeScanner:
         self.optimal_volume_ratio_range = getattr(settings, 'VOLUME_SCANNING', {}).get('optimal_volume_ratio_range', [0.5, 1.8])
         self.optimal_trade_value_range = getattr(settings, 'VOLUME_SCANNING', {}).get('optimal_trade_value_range', [1_000_000_000, 20_000_000_000])
         
+        # 시장상황 필터 (하락장에서 신규 후보 선정 생략)
+        self.market_regime_filter = getattr(settings, 'VOLUME_SCANNING', {}).get('market_regime_filter', False)
+        
         # 자동매매 설정
         self.auto_trade_enabled = False
         self.auto_trade_stocks: Dict[str, Dict] = {}
@@ -93,154 +94,48 @@ class VolumeScanner:
         self.order_manager = order_manager
         logger.info("주문 매니저가 거래량 스캐너에 연결되었습니다.")
     
-    def acquire_api_rate_limit(self):
-        """API 호출 속도 제한"""
-        while True:
-            with self.api_rate_lock:
-                now = time.monotonic()
-                if len(self.api_call_timestamps) >= self.API_RATE_LIMIT:
-                    oldest = self.api_call_timestamps[0]
-                    elapsed = now - oldest
-                    if elapsed < self.API_WINDOW:
-                        wait_time = self.API_WINDOW - elapsed
-                    else:
-                        wait_time = 0
-                else:
-                    wait_time = 0
-                if wait_time == 0:
-                    self.api_call_timestamps.append(now)
-                    return
-            if wait_time > 0:
-                time.sleep(wait_time)
-    
     async def get_volume_ranking(self) -> List[Dict]:
-        """거래량 급증 종목 순위 조회"""
-        try:
-            token = await self.token_manager.get_valid_token()
-            if not token:
-                logger.error("유효한 토큰을 가져올 수 없습니다.")
-                return []
-            
-            # 키움 API 거래량 급증 종목 조회 (실제 호스트 사용)
-            if self.settings.ENVIRONMENT == "simulation":
-                host = "https://mockapi.kiwoom.com"
-            else:
-                host = "https://openapi.kiwoom.com"
-            
-            endpoint = "/api/dostk/rkinfo"
-            url = host + endpoint
-            
-            headers = {
-                'Content-Type': 'application/json;charset=UTF-8',
-                'authorization': f'Bearer {token}',
-                'api-id': 'ka10023',
-            }
-            
-            data = {
-                'mrkt_tp': '000',  # 전체 시장
-                'sort_tp': '1',    # 거래량 순
-                'tm_tp': '1',      # 1분 단위
-                'trde_qty_tp': '50',  # 상위 50개
-                'tm': '',
-                'stk_cnd': '20',   # 거래량 급증 조건
-                'pric_tp': '0',    # 전체 가격대
-                'stex_tp': '3',    # 코스피
-            }
-            
-            self.acquire_api_rate_limit()
-            
-            while True:
-                response = requests.post(url, headers=headers, json=data)
-                if response.status_code == 429:
-                    logger.warning('거래량 순위 조회 429 에러(Too Many Requests) 발생! 15초 대기 후 재시도 (기존 60초에서 단축)')
-                    await asyncio.sleep(15)  # 60초 → 15초로 단축
-                    continue
-                if response.status_code != 200:
-                    logger.error(f"거래량 순위 조회 실패: {response.status_code}")
-                    return []
-                result = response.json()
-                if result.get("return_code") != 0:
-                    logger.error(f"API 오류: {result.get('return_msg')}")
-                    return []
-                return result.get("trde_qty_sdnin", [])
-            
-        except Exception as e:
-            logger.error(f"거래량 순위 조회 중 오류: {e}")
-            return []
+        """거래량 급증 종목 순위 (공용 시장 스냅샷, 오래됐으면 새로 조회)"""
+        snapshot = await self.market_snapshot.get()
+        return list(snapshot.volume_ranking) if snapshot else []
     
     async def get_daily_chart_score(self, stock_code: str, current_price: int) -> int:
-        """일봉 차트 기반 점수 계산"""
+        """일봉 차트 기반 점수 계산 (어제까지 일봉은 캐시, 오늘 봉은 현재가)"""
         try:
-            token = await self.token_manager.get_valid_token()
-            if not token:
-                return 0
-            
-            # 일봉 데이터 조회
-            url = self.settings.get_api_url("daily_chart")
-            headers = self.settings.get_headers(tr_type="daily_chart")
-            
-            data = {
-                "stk_cd": stock_code,
-                "base_dt": datetime.now().strftime("%Y%m%d"),
-                "upd_stkpc_tp": "1",
-                "req_cnt": 80,
-            }
-            
-            self.acquire_api_rate_limit()
-            
-            response = requests.post(url, headers=headers, json=data)
-            
-            if response.status_code != 200:
+            chart = await self.daily_charts.get(stock_code)
+            if chart is None or len(chart) + 1 < 60:
                 return 0
             
-            result = response.json()
-            daily_data = result.get('stk_dt_pole_chart_qry', [])
-            
-            if not daily_data or len(daily_data) < 60:
-                return 0
-            
-            # DataFrame 구성
-            df = pd.DataFrame(daily_data)
-            if 'dt' in df.columns:
-                df = df.sort_values('dt').reset_index(drop=True)
-            
-            df['cur_prc'] = df['cur_prc'].astype(int).abs()
-            df['MA10'] = df['cur_prc'].rolling(window=10).mean()
-            df['MA20'] = df['cur_prc'].rolling(window=20).mean()
-            df['MA60'] = df['cur_prc'].rolling(window=60).mean()
-            df = df.dropna()
-            
-            if df.empty:
-                return 0
+            # 이동평균은 캐시에 미리 계산된 값 + 오늘 가격
+            ma10 = chart.moving_average(10, current_price)
+            ma20 = chart.moving_average(20, current_price)
+            ma60 = chart.moving_average(60, current_price)
             
-            latest = df.iloc[-1]
             score = 0
             
             # MA10 > MA20 +2점
-            if latest['MA10'] > latest['MA20']:
+            if ma10 > ma20:
                 score += 2
             
             # MA20 > MA60 +1점
-            if latest['MA20'] > latest['MA60']:
+            if ma20 > ma60:
                 score += 1
             
             # 현재가 > MA10 +1점
-            if current_price > latest['MA10']:
+            if current_price > ma10:
                 score += 1
             
             # MA20 상승(3일 전 대비) +1점
-            if len(df) >= 3 and latest['MA20'] > df.iloc[-3]['MA20']:
+            if len(chart) >= 61 and ma20 > chart.past_moving_average(20):
                 score += 1
             
             # MA60 상승(3일 전 대비) +1점
-            if len(df) >= 3 and latest['MA60'] > df.iloc[-3]['MA60']:
+            if len(chart) >= 61 and ma60 > chart.past_moving_average(60):
                 score += 1
             
-            # 10일 고점 돌파 체크
-            if len(df) >= 10:
-                high_10d = df.iloc[-10:]['cur_prc'].max()
-                if current_price > high_10d:
-                    score += 2
+            # 10일 고점 돌파 체크 (어제까지 9일 종가 고점 대비)
+            if len(chart) >= 68 and current_price > chart.recent_high():
+                score += 2
             
             return score
             
@@ -275,15 +170,13 @@ class VolumeScanner:
                 'stk_cd': stock_code,
             }
             
-            self.acquire_api_rate_limit()
-            
-            response = requests.post(url, headers=headers, json=data)
+            response = await self.transport.post(url, headers=headers, json_data=data)
             
-            if response.status_code != 200:
-                logger.warning(f"체결강도 조회 실패: {response.status_code} - {stock_code}")
+            if not response.ok:
+                logger.warning(f"체결강도 조회 실패: {response.status} - {stock_code}")
                 return 1.0
             
-            result = response.json()
+            result = response.data
             if result.get("return_code") != 0:
                 logger.warning(f"체결강도 API 오류: {result.get('return_msg')} - {stock_code}")
                 return 1.0
@@ -301,171 +194,234 @@ class VolumeScanner:
             logger.error(f"체결강도 조회 중 오류: {e} - {stock_code}")
             return 1.0
     
-    async def scan_volume_candidates(self) -> List[VolumeCandidate]:
-        """거래량 급증 후보 종목 스캔"""
+    def get_market_condition(self) -> Optional[Dict]:
+        """최근 거래일 KOSPI 시장상황 (KOSPI 데이터가 없으면 None)"""
+        try:
+            return current_regime()
+        except Exception as e:
+            logger.warning(f"KOSPI 시장상황 조회 실패: {e}")
+            return None
+    
+    def _prefilter_ranking_item(self, item: Dict) -> Optional[Dict]:
+        """거래량 순위 항목 파싱 + 1차 필터 (통과하면 종목 정보 dict, 아니면 None)"""
+        # 기본 데이터 파싱
+        stock_code = item.get("stk_cd", "").replace("_AL", "")  # _AL 접미사 제거
+        stock_name = item.get("stk_nm", "")
+        current_price = abs(int(item.get("cur_prc", 0)))
+        volume_ratio = float(item.get("sdnin_rt", "0").replace("+", "").replace("%", ""))
+        price_change = float(item.get("flu_rt", 0))
+        
+        # 거래량 및 거래대금 계산
+        prev_qty = int(item.get("prev_trde_qty", 0))
+        now_qty = int(item.get("now_trde_qty", 0))
+        one_min_qty = now_qty - prev_qty
+        trade_value = one_min_qty * current_price
+        
+        # 🚀 전일 거래량 돌파 감지 (1차 필터)
+        is_breakout = self.check_volume_breakout(stock_code, now_qty, prev_qty)
+        if not is_breakout:
+            return None  # 돌파하지 않은 종목은 스킵
+        
+        # 🚨 거래량 상한선 체크 (극단적 급증 제외)
+        if volume_ratio > self.max_volume_ratio:
+            logger.info(f"[{stock_name}({stock_code})] 거래량 상한선 초과 - 거래량비율: {volume_ratio:.1f}% (상한선: {self.max_volume_ratio:.1f}%)")
+            return None  # 너무 극단적인 거래량 급증은 제외
+        
+        # 🚨 거래대금 상한선 체크 (새로 추가)
+        if trade_value > self.max_trade_value:
+            logger.info(f"[{stock_name}({stock_code})] 거래대금 상한선 초과 - 거래대금: {trade_value:,}원 (상한선: {self.max_trade_value:,}원)")
+            return None  # 너무 큰 거래대금은 제외
+        
+        # 🚨 주가 상한선 체크 (새로 추가)
+        if current_price > self.max_stock_price:
+            logger.info(f"[{stock_name}({stock_code})] 주가 상한선 초과 - 현재가: {current_price:,}원 (상한선: {self.max_stock_price:,}원)")
+            return None  # 너무 높은 주가는 제외
+        
+        # 🚨 주가 하한선 체크 (새로 추가)
+        if current_price < self.min_stock_price:
+            logger.info(f"[{stock_name}({stock_code})] 주가 하한선 초과 - 현재가: {current_price:,}원 (하한선: {self.min_stock_price:,}원)")
+            return None  # 너무 낮은 주가는 제외
+        
+        # 2차 필터: 추가 조건 체크 (등락률, 거래대금 등)
+        if (price_change < self.min_price_change or 
+            trade_value < self.min_trade_value):
+            logger.info(f"[{stock_name}({stock_code})] 2차 필터 탈락 - 등락률: {price_change:.2f}%, 거래대금: {trade_value:,}원")
+            return None
+        
+        # 이미 처리된 종목인지 확인 (쿨다운 기간 체크)
+        if stock_code in self.processed_stocks:
+            last_check = self.last_breakout_check.get(stock_code)
+            if last_check and (datetime.now() - last_check).seconds < self.breakout_cooldown:
+                logger.debug(f"[{stock_name}({stock_code})] 쿨다운 중 - 마지막 처리: {last_check.strftime('%H:%M:%S')}")
+                return None
+            else:
+                # 쿨다운이 지났으면 다시 처리 가능
+                logger.info(f"[{stock_name}({stock_code})] 쿨다운 완료 - 재처리 시작")
+        
+        # 이미 보유 중인 종목은 후보에서 제외
+        if hasattr(self, 'order_manager') and self.order_manager:
+            current_holdings = self.order_manager.get_current_holdings()
+            if stock_code in current_holdings:
+                logger.info(f"[{stock_name}({stock_code})] 이미 보유 중이므로 후보에서 제외")
+                return None
+        
+        logger.info(f"[{stock_name}({stock_code})] 1차 필터 통과 - 거래량비율: {volume_ratio:.1f}%, 거래대금: {trade_value:,}원")
+        
+        return {
+            'stock_code': stock_code,
+            'stock_name': stock_name,
+            'current_price': current_price,
+            'volume_ratio': volume_ratio,
+            'price_change': price_change,
+            'trade_value': trade_value,
+            'is_breakout': is_breakout,
+        }
+    
+    async def _fetch_execution_strength(self, row: Dict) -> Tuple[Dict, float]:
+        """1차 필터 통과 종목의 체결강도 조회"""
+        return row, await self.get_execution_strength(row['stock_code'])
+    
+    def _select_candidate(self, row: Dict, execution_strength: float, market_regime: str) -> Optional[VolumeCandidate]:
+        """체결강도 조건 확인 + 점수 계산 -> 매수 후보 (조건 불만족이면 None)"""
+        stock_code = row['stock_code']
+        stock_name = row['stock_name']
+        current_price = row['current_price']
+        volume_ratio = row['volume_ratio']
+        price_change = row['price_change']
+        trade_value = row['trade_value']
+        is_breakout = row['is_breakout']
+        
+        if execution_strength < self.min_execution_strength:
+            logger.info(f"[{stock_name}({stock_code})] 체결강도 조건 불만족 - 체결강도: {execution_strength:.1f}% (기준: {self.min_execution_strength:.1f}%)")
+            return None
+        
+        # 추세 판단
+        if price_change >= 0.05:  # 5% 이상 상승
+            ma_trend = "급등추세"
+        elif price_change >= 0.02:  # 2% 이상 상승
+            ma_trend = "상승추세"
+        else:
+            ma_trend = "보합추세"
+        
+        # 최적 범위 점수 계산 (분석 결과 기반)
+        # 기본 점수는 체결강도 정규화 (최대 40점)
+        max_execution_strength = 200  # 목표 최대 체결강도
+        min_execution_strength = 110  # 최소 체결강도 (필터 조건)
+        normalized_strength = min(1.0, (execution_strength - min_execution_strength) / (max_execution_strength - min_execution_strength))
+        score = normalized_strength * 40  # 최대 40점
+        
+        # 거래량비율이 최적 범위에 있으면 +20점 (100% 이상이므로 100%~180% 범위)
+        if (100.0 <= volume_ratio <= self.optimal_volume_ratio_range[1]):
+            score += 20
+            logger.info(f"[{stock_name}({stock_code})] 최적 거래량비율 범위! +20점")
+        
+        # 거래대금이 최적 범위에 있으면 +30점 (상한선 81억원 고려하여 10억~80억 범위)
+        optimal_trade_value_max = min(self.optimal_trade_value_range[1], self.max_trade_value)
+        if (self.optimal_trade_value_range[0] <= trade_value <= optimal_trade_value_max):
+            score += 30
+            logger.info(f"[{stock_name}({stock_code})] 최적 거래대금 범위! +30점")
+        
+        # 두 조건 모두 만족하면 추가 보너스 +10점
+        if ((100.0 <= volume_ratio <= self.optimal_volume_ratio_range[1]) and
+            (self.optimal_trade_value_range[0] <= trade_value <= optimal_trade_value_max)):
+            score += 10
+            logger.info(f"[{stock_name}({stock_code})] 최적 조건 모두 만족! +10점 보너스")
+        
+        candidate = VolumeCandidate(
+            stock_code=stock_code,
+            stock_name=stock_name,
+            current_price=current_price,
+            volume_ratio=volume_ratio,
+            price_change=price_change,
+            trade_value=trade_value,
+            score=score,  # 최적화된 점수 사용
+            timestamp=datetime.now(),
+            is_breakout=is_breakout,
+            ma_trend=ma_trend,
+            execution_strength=execution_strength,
+            market_regime=market_regime
+        )
+        
+        logger.info(f"★★ 매수 후보 선정 ★★ {stock_name}({stock_code})")
+        logger.info(f"   현재가: {current_price:,}원")
+        logger.info(f"   거래량비율: {volume_ratio:.1f}% (최적범위: {self.optimal_volume_ratio_range[0]:.1f}~{self.optimal_volume_ratio_range[1]:.1f}%)")
+        logger.info(f"   등락률: {price_change:.2f}%")
+        logger.info(f"   거래대금: {trade_value:,}원 (최적범위: {self.optimal_trade_value_range[0]/1e8:.1f}~{self.optimal_trade_value_range[1]/1e8:.1f}억원)")
+        logger.info(f"   체결강도: {execution_strength:.1f}%")
+        logger.info(f"   종합점수: {score:.1f}점")
+        logger.info(f"   시가상승: {'예' if is_breakout else '아니오'}")
+        logger.info(f"   추세: {ma_trend}")
+        
+        # 처리된 종목으로 등록 (쿨다운 기간 적용)
+        self.processed_stocks.add(stock_code)
+        self.last_breakout_check[stock_code] = datetime.now()
+        
+        # 데이터베이스에 자동매매 후보 저장
+        candidate_data = {
+            'candidate_time': datetime.now(),
+            'current_price': current_price,
+            'price_change': price_change,
+            'trade_value': trade_value,
+            'execution_strength': execution_strength,
+            'volume_ratio': volume_ratio,
+            'ma_trend': ma_trend,
+            'status': 'ACTIVE'
+        }
+        self.db.save_auto_trading_candidate(stock_code, candidate_data)
+        
+        return candidate
+    
+    async def scan_volume_candidates(self, snapshot=None) -> List[VolumeCandidate]:
+        """거래량 급증 후보 종목 스캔 (snapshot 이 없으면 공용 스냅샷 조회)"""
         try:
             logger.info("거래량 급증 종목 스캔 시작...")
             
-            # 거래량 순위 조회
-            volume_data = await self.get_volume_ranking()
+            # 거래량 순위 (공용 시장 스냅샷)
+            if snapshot is not None:
+                volume_data = list(snapshot.volume_ranking)
+            else:
+                volume_data = await self.get_volume_ranking()
             if not volume_data:
                 logger.warning("거래량 데이터를 가져올 수 없습니다.")
                 return []
             
-            candidates = []
+            # 시장상황은 스캔당 한 번만 조회
+            market = self.get_market_condition()
+            market_regime = market['label'] if market else ""
+            if market:
+                logger.info(f"시장상황: {format_regime(market)}")
+                if self.market_regime_filter and market['regime'] == REGIME_BEAR:
+                    logger.info("하락장 - 신규 매수 후보 선정 생략")
+                    self.candidates = []
+                    return []
             
-            for item in volume_data:
+            # 1차 필터 (API 호출 없음)
+            rows = []
+            for rank, item in enumerate(volume_data):
                 try:
-                    # 기본 데이터 파싱
-                    stock_code = item.get("stk_cd", "").replace("_AL", "")  # _AL 접미사 제거
-                    stock_name = item.get("stk_nm", "")
-                    current_price = abs(int(item.get("cur_prc", 0)))
-                    volume_ratio = float(item.get("sdnin_rt", "0").replace("+", "").replace("%", ""))
-                    price_change = float(item.get("flu_rt", 0))
-                    
-                    # 거래량 및 거래대금 계산
-                    prev_qty = int(item.get("prev_trde_qty", 0))
-                    now_qty = int(item.get("now_trde_qty", 0))
-                    one_min_qty = now_qty - prev_qty
-                    trade_value = one_min_qty * current_price
-                    
-                    # 🚀 전일 거래량 돌파 감지 (1차 필터)
-                    is_breakout = self.check_volume_breakout(stock_code, now_qty, prev_qty)
-                    if not is_breakout:
-                        continue  # 돌파하지 않은 종목은 스킵
-                    
-                    # 🚨 거래량 상한선 체크 (극단적 급증 제외)
-                    if volume_ratio > self.max_volume_ratio:
-                        logger.info(f"[{stock_name}({stock_code})] 거래량 상한선 초과 - 거래량비율: {volume_ratio:.1f}% (상한선: {self.max_volume_ratio:.1f}%)")
-                        continue  # 너무 극단적인 거래량 급증은 제외
-                    
-                    # 🚨 거래대금 상한선 체크 (새로 추가)
-                    if trade_value > self.max_trade_value:
-                        logger.info(f"[{stock_name}({stock_code})] 거래대금 상한선 초과 - 거래대금: {trade_value:,}원 (상한선: {self.max_trade_value:,}원)")
-                        continue  # 너무 큰 거래대금은 제외
-                    
-                    # 🚨 주가 상한선 체크 (새로 추가)
-                    if current_price > self.max_stock_price:
-                        logger.info(f"[{stock_name}({stock_code})] 주가 상한선 초과 - 현재가: {current_price:,}원 (상한선: {self.max_stock_price:,}원)")
-                        continue  # 너무 높은 주가는 제외
-                    
-                    # 🚨 주가 하한선 체크 (새로 추가)
-                    if current_price < self.min_stock_price:
-                        logger.info(f"[{stock_name}({stock_code})] 주가 하한선 초과 - 현재가: {current_price:,}원 (하한선: {self.min_stock_price:,}원)")
-                        continue  # 너무 낮은 주가는 제외
-                    
-                    # 2차 필터: 추가 조건 체크 (등락률, 거래대금 등)
-                    if (price_change < self.min_price_change or 
-                        trade_value < self.min_trade_value):
-                        logger.info(f"[{stock_name}({stock_code})] 2차 필터 탈락 - 등락률: {price_change:.2f}%, 거래대금: {trade_value:,}원")
-                        continue
-                    
-                    # 이미 처리된 종목인지 확인 (쿨다운 기간 체크)
-                    if stock_code in self.processed_stocks:
-                        last_check = self.last_breakout_check.get(stock_code)
-                        if last_check and (datetime.now() - last_check).seconds < self.breakout_cooldown:
-                            logger.debug(f"[{stock_name}({stock_code})] 쿨다운 중 - 마지막 처리: {last_check.strftime('%H:%M:%S')}")
-                            continue
-                        else:
-                            # 쿨다운이 지났으면 다시 처리 가능
-                            logger.info(f"[{stock_name}({stock_code})] 쿨다운 완료 - 재처리 시작")
-                    
-                    # 이미 보유 중인 종목은 후보에서 제외
-                    if hasattr(self, 'order_manager') and self.order_manager:
-                        current_holdings = self.order_manager.get_current_holdings()
-                        if stock_code in current_holdings:
-                            logger.info(f"[{stock_name}({stock_code})] 이미 보유 중이므로 후보에서 제외")
-                            continue
-                    
-                    logger.info(f"[{stock_name}({stock_code})] 1차 필터 통과 - 거래량비율: {volume_ratio:.1f}%, 거래대금: {trade_value:,}원")
-                    
-                    # 2차 필터: 체결강도 조건 체크
-                    execution_strength = await self.get_execution_strength(stock_code)
-                    
-                    if execution_strength >= self.min_execution_strength:
-                        # 추세 판단
-                        if price_change >= 0.05:  # 5% 이상 상승
-                            ma_trend = "급등추세"
-                        elif price_change >= 0.02:  # 2% 이상 상승
-                            ma_trend = "상승추세"
-                        else:
-                            ma_trend = "보합추세"
-                        
-                        # 최적 범위 점수 계산 (분석 결과 기반)
-                        # 기본 점수는 체결강도 정규화 (최대 40점)
-                        max_execution_strength = 200  # 목표 최대 체결강도
-                        min_execution_strength = 110  # 최소 체결강도 (필터 조건)
-                        normalized_strength = min(1.0, (execution_strength - min_execution_strength) / (max_execution_strength - min_execution_strength))
-                        score = normalized_strength * 40  # 최대 40점
-                        
-                        # 거래량비율이 최적 범위에 있으면 +20점 (100% 이상이므로 100%~180% 범위)
-                        if (100.0 <= volume_ratio <= self.optimal_volume_ratio_range[1]):
-                            score += 20
-                            logger.info(f"[{stock_name}({stock_code})] 최적 거래량비율 범위! +20점")
-                        
-                        # 거래대금이 최적 범위에 있으면 +30점 (상한선 81억원 고려하여 10억~80억 범위)
-                        optimal_trade_value_max = min(self.optimal_trade_value_range[1], self.max_trade_value)
-                        if (self.optimal_trade_value_range[0] <= trade_value <= optimal_trade_value_max):
-                            score += 30
-                            logger.info(f"[{stock_name}({stock_code})] 최적 거래대금 범위! +30점")
-                        
-                        # 두 조건 모두 만족하면 추가 보너스 +10점
-                        if ((100.0 <= volume_ratio <= self.optimal_volume_ratio_range[1]) and
-                            (self.optimal_trade_value_range[0] <= trade_value <= optimal_trade_value_max)):
-                            score += 10
-                            logger.info(f"[{stock_name}({stock_code})] 최적 조건 모두 만족! +10점 보너스")
-                        
-                        candidate = VolumeCandidate(
-                            stock_code=stock_code,
-                            stock_name=stock_name,
-                            current_price=current_price,
-                            volume_ratio=volume_ratio,
-                            price_change=price_change,
-                            trade_value=trade_value,
-                            score=score,  # 최적화된 점수 사용
-                            timestamp=datetime.now(),
-                            is_breakout=is_breakout,
-                            ma_trend=ma_trend,
-                            execution_strength=execution_strength
-                        )
-                        
-                        candidates.append(candidate)
-                        
-                        logger.info(f"★★ 매수 후보 선정 ★★ {stock_name}({stock_code})")
-                        logger.info(f"   현재가: {current_price:,}원")
-                        logger.info(f"   거래량비율: {volume_ratio:.1f}% (최적범위: {self.optimal_volume_ratio_range[0]:.1f}~{self.optimal_volume_ratio_range[1]:.1f}%)")
-                        logger.info(f"   등락률: {price_change:.2f}%")
-                        logger.info(f"   거래대금: {trade_value:,}원 (최적범위: {self.optimal_trade_value_range[0]/1e8:.1f}~{self.optimal_trade_value_range[1]/1e8:.1f}억원)")
-                        logger.info(f"   체결강도: {execution_strength:.1f}%")
-                        logger.info(f"   종합점수: {score:.1f}점")
-                        logger.info(f"   시가상승: {'예' if is_breakout else '아니오'}")
-                        logger.info(f"   추세: {ma_trend}")
-                        
-                        # 처리된 종목으로 등록 (쿨다운 기간 적용)
-                        self.processed_stocks.add(stock_code)
-                        self.last_breakout_check[stock_code] = datetime.now()
-                        
-                        # 데이터베이스에 자동매매 후보 저장
-                        candidate_data = {
-                            'candidate_time': datetime.now(),
-                            'current_price': current_price,
-                            'price_change': price_change,
-                            'trade_value': trade_value,
-                            'execution_strength': execution_strength,
-                            'volume_ratio': volume_ratio,
-                            'ma_trend': ma_trend,
-                            'status': 'ACTIVE'
-                        }
-                        self.db.save_auto_trading_candidate(stock_code, candidate_data)
-                    else:
-                        logger.info(f"[{stock_name}({stock_code})] 체결강도 조건 불만족 - 체결강도: {execution_strength:.1f}% (기준: {self.min_execution_strength:.1f}%)")
-                    
+                    row = self._prefilter_ranking_item(item)
+                    if row:
+                        row['rank'] = rank
+                        rows.append(row)
+                except Exception as e:
+                    logger.error(f"종목 데이터 처리 실패: {e}")
+            
+            # 2차 필터: 체결강도 조회를 동시에 요청 (전송 계층 속도 제한 안에서), 응답 순서대로 처리
+            candidates = []
+            tasks = [asyncio.ensure_future(self._fetch_execution_strength(row)) for row in rows]
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    row, execution_strength = await next_done
+                    candidate = self._select_candidate(row, execution_strength, market_regime)
+                    if candidate:
+                        candidates.append((row['rank'], candidate))
                 except Exception as e:
                     logger.error(f"종목 데이터 처리 실패: {e}")
                     continue
             
-            # 후보 목록 업데이트
-            self.candidates = candidates
+            # 후보 목록 업데이트 (거래량 순위 순서 유지)
+            candidates.sort(key=lambda pair: pair[0])
+            self.candidates = [candidate for _, candidate in candidates]
 
             # 🚨 후보 리스트에서 조건을 벗어난 종목 제거
             before_count = len(self.candidates)
@@ -549,14 +505,19 @@ class VolumeScanner:
         """지속적인 스캐닝 시작"""
         logger.info("거래량 스캐닝 시작...")
         
+        last_tick = 0
         while True:
             try:
+                # 공용 시장 스냅샷 구독 (조회 간격은 MarketSnapshotService 가 관리)
+                snapshot = await self.market_snapshot.next_snapshot(last_tick)
+                last_tick = snapshot.tick
+                
                 # 하루 단위 초기화 체크
                 if self.should_clear_daily_history():
                     self.clear_breakout_history()
                 
                 # 거래량 후보 스캔
-                candidates = await self.scan_volume_candidates()
+                candidates = await self.scan_volume_candidates(snapshot)
                 
                 # 자동매매 후보 등록
                 for candidate in candidates:
@@ -564,7 +525,7 @@ class VolumeScanner:
                         # 주문 매니저를 통한 자동매매 실행
                         if hasattr(self, 'order_manager') and self.order_manager:
                             try:
-                                order = self.order_manager.handle_volume_candidate(candidate)
+                                order = await self.order_manager.handle_volume_candidate(candidate)
                                 if order:
                                     logger.info(f"거래량 급증 자동매매 실행: {candidate.stock_code}")
                                 else:
@@ -579,12 +540,8 @@ class VolumeScanner:
                                 candidate.stock_name
                             )
                 
-                # 스캔 간격 대기
-                await asyncio.sleep(self.scan_interval)
-                
             except Exception as e:
                 logger.error(f"스캐닝 중 오류: {e}")
-                await asyncio.sleep(self.scan_interval)
     
     def get_candidates_summary(self) -> List[Dict]:
         """후보 종목 요약 반환"""
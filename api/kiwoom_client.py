@@ -7,10 +7,11 @@ Kiwoom API Client for Stock Manager
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import asyncio
+import aiohttp
 import requests
 import json
-import time
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timedelta
 
 try:
@@ -20,6 +21,8 @@ except ImportError:
     sys.path.append(os.path.join(os.path.dirname(__file__), "..", "utils"))
     from logger import get_logger
     from token_manager import TokenManager
+from api.kiwoom_transport import get_kiwoom_transport
+from api.rate_limiter import get_rate_limiter
 
 
 class KiwoomClient:
@@ -49,7 +52,9 @@ class KiwoomClient:
             "execution_strength": "/api/dostk/mrkcond"   # 체결강도 조회
         }
         
-        # 세션 관리
+        # 세션 관리 (동기 호출용, 이벤트 루프 안에서는 *_async 메서드가 공용 전송 계층 사용)
+        self.transport = get_kiwoom_transport(settings)
+        self.limiter = get_rate_limiter(settings)
         self.session = requests.Session()
         self.session.headers.update({
             'Content-Type': 'application/json;charset=UTF-8',
@@ -76,7 +81,7 @@ class KiwoomClient:
     
     def _make_request(self, method: str, endpoint: str, params: Dict = None, 
                      data: Dict = None, retry_count: int = 0, tr_type: str = "account_info", api_id: str = None) -> Optional[Dict]:
-        """API 요청 실행"""
+        """API 요청 실행 (동기 - 이벤트 루프 밖 스크립트 전용, 루프 안에서는 _make_request_async)"""
         url = self.base_url + endpoint
         
         try:
@@ -85,6 +90,9 @@ class KiwoomClient:
             self.logger.debug(f"API 요청: {method} {url}")
             self.logger.debug(f"TR ID: {headers.get('tr_id', 'N/A')}")
             
+            # 공용 토큰 버킷 (대기 시 블로킹, 이벤트 루프 안에서 호출하면 RuntimeError)
+            self.limiter.acquire_blocking(headers.get('api-id', ''))
+            
             if method.upper() == "GET":
                 response = self.session.get(url, headers=headers, params=params, timeout=30)
             elif method.upper() == "POST":
@@ -100,17 +108,17 @@ class KiwoomClient:
                 self.logger.debug(f"API 응답: {result}")
                 return result
             elif response.status_code == 429 and retry_count < 3:
-                # API 호출 제한, 지수 백오프로 재시도 (대기 시간 단축)
+                # API 호출 제한, 지수 백오프 - 공용 버킷을 멈춰서 다른 호출부도 함께 대기
                 wait_time = (2 ** retry_count) * 3  # 3초, 6초, 12초 (기존 10초, 20초, 40초에서 단축)
                 self.logger.warning(f"API 호출 제한 (429). {wait_time}초 후 재시도... (시도 {retry_count + 1}/3)")
-                time.sleep(wait_time)
-                return self._make_request(method, endpoint, params, data, retry_count + 1, tr_type)
+                self.limiter.pause(wait_time)
+                return self._make_request(method, endpoint, params, data, retry_count + 1, tr_type, api_id)
             elif response.status_code == 401 and retry_count < 2:
                 # 토큰 만료, 갱신 시도
                 self.logger.info("토큰이 만료되었습니다. 토큰을 갱신합니다...")
                 if self.token_manager.refresh_token(self.settings.ENVIRONMENT):
                     # 새 토큰으로 재시도
-                    return self._make_request(method, endpoint, params, data, retry_count + 1, tr_type)
+                    return self._make_request(method, endpoint, params, data, retry_count + 1, tr_type, api_id)
                 else:
                     self.logger.error("토큰 갱신에 실패했습니다.")
                     return None
@@ -126,17 +134,46 @@ class KiwoomClient:
             self.logger.error(f"잘못된 JSON 응답: {e}")
             return None
     
-    def get_account_info(self, account_no: str = None) -> Optional[Dict]:
-        """계좌 정보 조회"""
-        endpoint = self.api_endpoints["account_info"]
+    async def _make_request_async(self, method: str, endpoint: str, params: Dict = None, data: Dict = None,
+                                  tr_type: str = "account_info", api_id: str = None, priority: int = None) -> Optional[Dict]:
+        """API 요청 실행 (비동기, 공용 전송 계층 - 429 재시도/토큰 갱신은 전송 계층에서 처리)"""
+        url = self.base_url + endpoint
         
-        # 실제 키움증권 API 파라미터 (kt00018)
-        data = {
+        try:
+            headers = self._get_headers(tr_type=tr_type, api_id=api_id)
+            self.logger.debug(f"API 요청: {method} {url}")
+            
+            response = await self.transport.request(method.upper(), url, headers=headers, json_data=data, params=params,
+                                                    priority=priority)
+            self.logger.debug(f"응답 상태: {response.status}")
+            
+            if response.ok:
+                self.logger.debug(f"API 응답: {response.data}")
+                return response.data
+            self.logger.error(f"API 요청 실패: {response.status}")
+            self.logger.error(f"응답 내용: {response.text}")
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.error(f"네트워크 오류: {e}")
+            return None
+    
+    def _account_info_request(self) -> Dict:
+        """계좌 정보 조회 파라미터 (kt00018)"""
+        return {
             "qry_tp": "1",  # 조회구분
             "dmst_stex_tp": "KRX"  # 국내거래소구분
         }
-        
-        return self._make_request("POST", endpoint, data=data, tr_type="account_info")
+    
+    def get_account_info(self, account_no: str = None) -> Optional[Dict]:
+        """계좌 정보 조회"""
+        endpoint = self.api_endpoints["account_info"]
+        return self._make_request("POST", endpoint, data=self._account_info_request(), tr_type="account_info")
+    
+    async def get_account_info_async(self, account_no: str = None, priority: int = None) -> Optional[Dict]:
+        """계좌 정보 조회 (비동기, priority 는 api/rate_limiter.py PRIORITY_* - 기본은 계좌 조회)"""
+        endpoint = self.api_endpoints["account_info"]
+        return await self._make_request_async("POST", endpoint, data=self._account_info_request(), tr_type="account_info",
+                                              priority=priority)
     
     def get_stock_price(self, stock_code: str) -> Optional[Dict]:
         """주식 현재가 조회"""
@@ -148,11 +185,9 @@ class KiwoomClient:
         
         return self._make_request("POST", endpoint, data=data, tr_type="stock_price")
     
-    def place_order(self, stock_code: str, order_type: str, quantity: int, 
-                   price: int = 0, account_no: str = None) -> Optional[Dict]:
-        """주식 주문"""
-        endpoint = self.api_endpoints["order"]
-        
+    def _order_request(self, stock_code: str, order_type: str, quantity: int,
+                       price: int = 0, account_no: str = None) -> Tuple[Dict, str]:
+        """주식 주문 파라미터 -> (data, tr_type)"""
         # 계좌번호가 없으면 설정에서 가져오기
         if not account_no:
             account_no = self.settings.secrets.get(self.settings.ENVIRONMENT, {}).get("account_no", "00000000")
@@ -195,7 +230,19 @@ class KiwoomClient:
         
         order_method = "시장가" if trde_tp == "3" else "지정가"
         self.logger.info(f"주문 실행: {order_type} {stock_code} {quantity}주 @ {price}원 ({order_method})")
-        return self._make_request("POST", endpoint, data=data, tr_type=tr_type)
+        return data, tr_type
+    
+    def place_order(self, stock_code: str, order_type: str, quantity: int, 
+                   price: int = 0, account_no: str = None) -> Optional[Dict]:
+        """주식 주문"""
+        data, tr_type = self._order_request(stock_code, order_type, quantity, price, account_no)
+        return self._make_request("POST", self.api_endpoints["order"], data=data, tr_type=tr_type)
+    
+    async def place_order_async(self, stock_code: str, order_type: str, quantity: int,
+                                price: int = 0, account_no: str = None) -> Optional[Dict]:
+        """주식 주문 (비동기)"""
+        data, tr_type = self._order_request(stock_code, order_type, quantity, price, account_no)
+        return await self._make_request_async("POST", self.api_endpoints["order"], data=data, tr_type=tr_type)
     
     def get_order_status(self, order_no: str = "", account_no: str = None) -> Optional[Dict]:
         """주문 상태 조회"""
@@ -264,31 +311,42 @@ class KiwoomClient:
             self.logger.error(f"연결 테스트 중 오류: {e}")
             return False
     
+    def _parse_account_balance(self, info: Optional[Dict]) -> dict:
+        """계좌 정보 응답 -> 계좌 잔고(가용 현금 등)"""
+        if not info:
+            self.logger.warning("계좌 잔고 조회 실패: get_account_info 결과 없음 - 기본값 사용")
+            return {"available_cash": 10000000}  # 기본값 1000만원
+
+        # Kiwoom API 응답 구조에 따라 파싱 (예시)
+        try:
+            # 실제 응답 구조에 맞게 수정 필요
+            output = info.get("output", {})
+            available_cash = 0
+            if isinstance(output, dict):
+                available_cash = int(output.get("dnca_tot_amt", 10000000))  # 예: 가용현금 필드명
+            elif isinstance(output, list) and output:
+                available_cash = int(output[0].get("dnca_tot_amt", 10000000))
+            else:
+                available_cash = 10000000  # 기본값
+            return {"available_cash": available_cash}
+        except Exception as e:
+            self.logger.warning(f"계좌 잔고 파싱 실패: {e} - 기본값 사용")
+            return {"available_cash": 10000000}  # 기본값 1000만원
+    
     def get_account_balance(self, account_no: str = None) -> dict:
         """
         계좌 잔고(가용 현금 등) 조회
         """
         try:
-            info = self.get_account_info(account_no)
-            if not info:
-                self.logger.warning("계좌 잔고 조회 실패: get_account_info 결과 없음 - 기본값 사용")
-                return {"available_cash": 10000000}  # 기본값 1000만원
-
-            # Kiwoom API 응답 구조에 따라 파싱 (예시)
-            try:
-                # 실제 응답 구조에 맞게 수정 필요
-                output = info.get("output", {})
-                available_cash = 0
-                if isinstance(output, dict):
-                    available_cash = int(output.get("dnca_tot_amt", 10000000))  # 예: 가용현금 필드명
-                elif isinstance(output, list) and output:
-                    available_cash = int(output[0].get("dnca_tot_amt", 10000000))
-                else:
-                    available_cash = 10000000  # 기본값
-                return {"available_cash": available_cash}
-            except Exception as e:
-                self.logger.warning(f"계좌 잔고 파싱 실패: {e} - 기본값 사용")
-                return {"available_cash": 10000000}  # 기본값 1000만원
+            return self._parse_account_balance(self.get_account_info(account_no))
+        except Exception as e:
+            self.logger.warning(f"계좌 잔고 조회 중 오류: {e} - 기본값 사용")
+            return {"available_cash": 10000000}  # 기본값 1000만원
+    
+    async def get_account_balance_async(self, account_no: str = None, priority: int = None) -> dict:
+        """계좌 잔고(가용 현금 등) 조회 (비동기)"""
+        try:
+            return self._parse_account_balance(await self.get_account_info_async(account_no, priority))
         except Exception as e:
             self.logger.warning(f"계좌 잔고 조회 중 오류: {e} - 기본값 사용")
             return {"available_cash": 10000000}  # 기본값 1000만원
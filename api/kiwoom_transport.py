@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Kiwoom Transport - 키움 REST API 공용 비동기 전송 계층
+
+VolumeScanner / Strategy2Analyzer / KiwoomClient 가 이벤트 루프를 막지 않도록
+aiohttp keep-alive 커넥션 풀 하나로 모든 REST 호출을 보낸다.
+
+- 호출 속도 제한: api/rate_limiter.py 공용 토큰 버킷 (api-id 별 한도, 주문 > 매도 감시 > 계좌 > 스캔 우선순위)
+- 429: 전체 버킷을 멈추고(지수 백오프) 재시도, 401: 토큰 비동기 재발급 후 재시도
+- 세션은 이벤트 루프별로 만든다 (asyncio.run 을 여러 번 쓰는 스크립트/테스트 대응)
+"""
+
+import asyncio
+import json
+from dataclasses import dataclass
+from typing import Dict, Optional, Any
+
+import aiohttp
+
+from utils.logger import get_logger
+from api.rate_limiter import get_rate_limiter
+
+logger = get_logger("kiwoom_transport")
+
+POOL_SIZE = 10         # 동시 연결 수
+KEEPALIVE_TIMEOUT = 30 # 유휴 연결 유지 시간 (초)
+TIMEOUT = 30           # 요청 타임아웃 (초)
+MAX_RETRIES = 3        # 429 재시도 횟수
+BACKOFF_BASE = 3       # 429 대기 시간 = BACKOFF_BASE * 2^재시도 (3초, 6초, 12초)
+
+
+@dataclass
+class KiwoomResponse:
+    """REST 응답 (data 는 JSON 파싱 결과, 파싱 실패 시 None)"""
+    status: int
+    data: Optional[Dict[str, Any]]
+    text: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200 and self.data is not None
+
+
+class KiwoomTransport:
+    """aiohttp 커넥션 풀 + 공용 속도 제한 + 토큰 재발급"""
+
+    def __init__(self, settings, token_manager=None, limiter=None, pool_size=POOL_SIZE, timeout=TIMEOUT):
+        self.settings = settings
+        if token_manager is None:
+            from utils.token_manager import TokenManager
+            token_manager = TokenManager(settings)
+        self.token_manager = token_manager
+        self.limiter = limiter if limiter is not None else get_rate_limiter(settings)
+        self.pool_size = pool_size
+        self.timeout = timeout
+
+        self._loop = None
+        self._session = None
+        self._token_lock = None
+
+    def _bind_loop(self):
+        """현재 이벤트 루프용 세션/락 준비 (루프가 바뀌면 새로 만듦)"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop or self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=KEEPALIVE_TIMEOUT)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._token_lock = asyncio.Lock()
+            self._loop = loop
+        return self._session
+
+    async def close(self):
+        """커넥션 풀 종료"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def current_token(self) -> str:
+        return self.settings.get_api_config().get("token") or ""
+
+    async def refresh_token(self, expired_token: str = None) -> Optional[str]:
+        """
+        토큰 비동기 재발급 (동시에 여러 요청이 401 을 받아도 한 번만 발급)
+
+        Args:
+            expired_token: 401 을 받은 요청의 토큰 (이미 다른 요청이 갱신했으면 재발급 생략)
+        """
+        self._bind_loop()
+        async with self._token_lock:
+            token = self.current_token()
+            if expired_token is not None and token and token != expired_token:
+                return token
+            return await self.token_manager.refresh_token_async(self.settings.ENVIRONMENT, self)
+
+    async def request(self, method: str, url: str, headers: Dict[str, str] = None, json_data: Dict = None,
+                      params: Dict = None, priority: int = None, retry_auth: bool = True) -> KiwoomResponse:
+        """
+        REST 요청 (429 재시도 / 401 토큰 재발급 포함)
+
+        Args:
+            priority: api/rate_limiter.py PRIORITY_* (None 이면 headers 의 api-id 로 결정)
+
+        Raises:
+            aiohttp.ClientError, asyncio.TimeoutError: 네트워크 오류 (호출부에서 처리)
+        """
+        headers = dict(headers or {})
+        api_id = headers.get('api-id', '')
+        for attempt in range(MAX_RETRIES + 1):
+            await self.limiter.acquire(api_id, priority)
+            session = self._bind_loop()
+            async with session.request(method, url, headers=headers, json=json_data, params=params) as response:
+                text = await response.text()
+                status = response.status
+            try:
+                data = json.loads(text) if text else None
+            except json.JSONDecodeError:
+                data = None
+
+            if status == 429 and attempt < MAX_RETRIES:
+                wait_time = BACKOFF_BASE * (2 ** attempt)
+                logger.warning(f"API 호출 제한 (429). {wait_time}초 후 재시도... (시도 {attempt + 1}/{MAX_RETRIES})")
+                self.limiter.pause(wait_time)
+                continue
+            if status == 401 and retry_auth and 'authorization' in headers:
+                logger.info("토큰이 만료되었습니다. 토큰을 갱신합니다...")
+                expired = headers['authorization'].replace('Bearer ', '', 1)
+                token = await self.refresh_token(expired)
+                if token:
+                    headers['authorization'] = f'Bearer {token}'
+                    retry_auth = False
+                    continue
+                logger.error("토큰 갱신에 실패했습니다.")
+            return KiwoomResponse(status, data, text)
+        return KiwoomResponse(status, data, text)
+
+    async def post(self, url: str, headers: Dict[str, str] = None, json_data: Dict = None, **kwargs) -> KiwoomResponse:
+        return await self.request("POST", url, headers=headers, json_data=json_data, **kwargs)
+
+    async def get(self, url: str, headers: Dict[str, str] = None, params: Dict = None, **kwargs) -> KiwoomResponse:
+        return await self.request("GET", url, headers=headers, params=params, **kwargs)
+
+
+# 전역 전송 계층 인스턴스
+_transport_instance = None
+
+
+def get_kiwoom_transport(settings=None) -> KiwoomTransport:
+    """전역 KiwoomTransport (커넥션 풀/속도 제한 공유)"""
+    global _transport_instance
+    if _transport_instance is None:
+        if settings is None:
+            from config.settings import get_settings
+            settings = get_settings()
+        _transport_instance = KiwoomTransport(settings)
+    return _transport_instance
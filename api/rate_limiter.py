@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter - 키움 REST API 프로세스 공용 토큰 버킷
+
+모든 REST 호출(KiwoomTransport, 동기 KiwoomClient._make_request)이 같은 버킷을 쓴다.
+동기 경로(acquire_blocking)는 이벤트 루프 밖 스크립트 전용이고, 루프 안의 주문/계좌 조회는 전송 계층을 쓴다.
+
+- 전체 버킷: 초당 rate 건, 최대 burst 건 (어느 1초 구간에서도 rate + burst 건 이하)
+- api-id 버킷: 스캔용 조회(ka10023 등)가 전체 한도를 독식하지 않도록 api-id 별 초당 한도
+- 우선순위: 주문 > 매도 감시 > 계좌 조회 > 스캔. 토큰이 모자라면 대기 중인 요청 중
+  우선순위가 높은 것부터 (같은 우선순위는 먼저 온 순서) 토큰을 받는다.
+- 429 를 받으면 pause() 로 전체 버킷을 비워 모든 호출부가 함께 쉰다.
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+from typing import Dict, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger("rate_limiter")
+
+# 우선순위 (작을수록 먼저)
+PRIORITY_ORDER = 0    # 매수/매도 주문
+PRIORITY_SELL = 1     # 보유 종목 매도 감시
+PRIORITY_ACCOUNT = 2  # 계좌/잔고 조회
+PRIORITY_SCAN = 3     # 거래량 순위, 일봉, 체결강도 등 스캔 조회
+
+# api-id 별 기본 우선순위 (없으면 PRIORITY_SCAN)
+API_PRIORITIES = {
+    "kt10000": PRIORITY_ORDER,    # 주식 매수 주문
+    "kt10001": PRIORITY_ORDER,    # 주식 매도 주문
+    "kt00018": PRIORITY_ACCOUNT,  # 계좌 평가 잔고 내역
+}
+
+
+class TokenBucket:
+    """초당 rate 개씩 채워지고 최대 capacity 개까지 쌓이는 버킷 (tokens 는 음수 가능 = 대기 벌점)"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """토큰 1개가 생길 때까지 남은 시간 (refill 후 호출)"""
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """우선순위 대기열이 있는 비동기 토큰 버킷 (동기 호출용 acquire_blocking 포함)"""
+
+    def __init__(self, rate: float, burst: float = 1, api_budgets: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            rate: 전체 초당 호출 수
+            burst: 전체 버킷 크기
+            api_budgets: api-id -> 초당 호출 수 (버킷 크기 1)
+        """
+        self.bucket = TokenBucket(rate, burst)
+        self.api_buckets = {api_id: TokenBucket(budget, 1) for api_id, budget in (api_budgets or {}).items()}
+        self._lock = threading.Lock()
+        self._waiters = []  # (priority, seq, api_id, future)
+        self._seq = itertools.count()
+        self._loop = None
+        self._timer = None
+
+    def _buckets(self, api_id: str):
+        api_bucket = self.api_buckets.get(api_id)
+        return (self.bucket, api_bucket) if api_bucket else (self.bucket,)
+
+    def _try_take(self, api_id: str, now: float) -> float:
+        """토큰을 가져가면 0, 아니면 기다려야 할 시간 (self._lock 안에서 호출)"""
+        buckets = self._buckets(api_id)
+        for bucket in buckets:
+            bucket.refill(now)
+        wait = max(bucket.wait_time() for bucket in buckets)
+        if wait == 0:
+            for bucket in buckets:
+                bucket.tokens -= 1
+        return wait
+
+    @staticmethod
+    def priority_for(api_id: str) -> int:
+        return API_PRIORITIES.get(api_id, PRIORITY_SCAN)
+
+    async def acquire(self, api_id: str = "", priority: Optional[int] = None):
+        """토큰 1개 획득까지 대기 (이벤트 루프는 막지 않음)"""
+        if priority is None:
+            priority = self.priority_for(api_id)
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # asyncio.run 이 바뀌면 이전 루프의 대기열은 버림
+            self._loop, self._waiters, self._timer = loop, [], None
+        future = loop.create_future()
+        self._waiters.append((priority, next(self._seq), api_id, future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            self._dispatch()
+            raise
+
+    def _dispatch(self):
+        """우선순위 순서로 토큰 배분, 남은 대기자가 있으면 다음 토큰 시각에 다시 실행"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._waiters = sorted(w for w in self._waiters if not w[3].done())
+        next_wait = None
+        with self._lock:
+            now = time.monotonic()
+            self.bucket.refill(now)
+            remaining = []
+            for waiter in self._waiters:
+                # api-id 한도에 걸린 대기자는 건너뛰고 다음 우선순위에 전체 토큰을 넘김
+                if self.bucket.tokens >= 1 and self._try_take(waiter[2], now) == 0:
+                    waiter[3].set_result(None)
+                else:
+                    remaining.append(waiter)
+            for waiter in remaining:
+                wait = max(bucket.wait_time() for bucket in self._buckets(waiter[2]))
+                next_wait = wait if next_wait is None else min(next_wait, wait)
+        self._waiters = remaining
+        if remaining:
+            self._timer = self._loop.call_later(max(next_wait, 0.001), self._dispatch)
+
+    def acquire_blocking(self, api_id: str = ""):
+        """
+        동기 호출용 (time.sleep 으로 대기 - 이벤트 루프 밖 스크립트에서만 사용)
+
+        Raises:
+            RuntimeError: 실행 중인 이벤트 루프 안에서 호출 (루프 전체가 멈추므로 acquire / *_async 사용)
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("이벤트 루프 안에서 동기 API 호출 - 비동기 메서드(*_async)를 사용하세요")
+        while True:
+            with self._lock:
+                wait = self._try_take(api_id, time.monotonic())
+            if wait == 0:
+                return
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """429 응답 후 전체 호출을 seconds 동안 멈춤"""
+        with self._lock:
+            now = time.monotonic()
+            self.bucket.refill(now)
+            self.bucket.tokens = min(self.bucket.tokens, 1 - seconds * self.bucket.rate)
+        logger.warning(f"API 호출 제한 - 전체 호출 {seconds:.1f}초 중지")
+
+
+# 전역 Rate Limiter 인스턴스
+_rate_limiter_instance = None
+
+
+def get_rate_limiter(settings=None) -> RateLimiter:
+    """전역 RateLimiter (settings.API_RATE_LIMIT 설정)"""
+    global _rate_limiter_instance
+    if _rate_limiter_instance is None:
+        if settings is None:
+            from config.settings import get_settings
+            settings = get_settings()
+        config = settings.API_RATE_LIMIT
+        _rate_limiter_instance = RateLimiter(config["rate"], config["burst"], config["api_budgets"])
+    return _rate_limiter_instance
@@ -165,6 +165,18 @@ class Settings:
             "daily_chart": "ka10081"    # 일봉 차트
         }
         
+        # REST API 호출 제한 (api/rate_limiter.py, 프로세스 전체 공유)
+        # 전체 초당 4건 + 버킷 1건 -> 어느 1초 구간에서도 5건 이하
+        self.API_RATE_LIMIT = {
+            "rate": 4,
+            "burst": 1,
+            "api_budgets": {            # api-id 별 초당 한도 (스캔 조회가 주문/계좌 조회 몫을 독식하지 않도록)
+                "ka10023": 0.5,         # 거래량 급증 순위
+                "ka10046": 2,           # 체결강도
+                "ka10081": 2,           # 일봉 차트
+            },
+        }
+        
         # TR IDs for different environments (모의투자 vs 실제거래)
         self.TR_IDS = {
             "simulation": {
@@ -236,6 +248,7 @@ class Settings:
         self.VOLUME_SCANNING = {
             "enabled": True,
             "scan_interval": 30,  # 스캔 간격 (30초)
+            "snapshot_interval": 30,  # 거래량 순위 스냅샷 조회 간격 (초, 모든 전략이 같은 스냅샷을 구독)
             "min_volume_ratio": 0.2,  # 거래량비율 하한선: 0.2% (기존 1.0%에서 완화)
             "max_volume_ratio": 1.9,  # 거래량비율 상한선: 1.9% (기존 2.0%에서 조정)
             "min_trade_value": 180_000_000,  # 최소 거래대금: 1.8억원 (기존 1억원에서 상향)
@@ -250,6 +263,7 @@ class Settings:
             "optimal_trade_value_range": [1_000_000_000, 20_000_000_000],  # 최적 거래대금 범위 (10억~200억)
             "max_stock_price": 50000,  # 최대 주가: 5만원 미만 (새로 추가)
             "min_stock_price": 1000,    # 최소 주가: 1천원 이상 (새로 추가)
+            "market_regime_filter": False,  # 하락장(KOSPI 20일선 -1% 하회)에서 신규 후보 선정 생략
             
             # 🎯 전략 2 최종 버전: 핵심 조건 + 추가 확인 조건
             "strategy2_enabled": True,  # 전략 2 활성화
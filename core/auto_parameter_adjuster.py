@@ -1,8 +1,10 @@
 import random
 import glob
 import os
-import pandas as pd
 from core.gradual_rise_backtest import GradualRiseBacktest
+from core.feature_cache import get_feature_cache
+from core.feature_store import get_feature_store
+from database.backtest_store import get_backtest_store
 import datetime
 
 # === CONFIG ===
@@ -24,7 +26,8 @@ class AutoParameterAdjuster:
     """파라미터 자동 완화 루프"""
     
     def __init__(self):
-        self.backtest = GradualRiseBacktest()
+        # 반복마다 바뀌는 건 파라미터뿐이므로 Feature 는 캐시 재사용
+        self.backtest = GradualRiseBacktest(feature_cache=get_feature_cache(), feature_store=get_feature_store())
         self.iteration_results = []
         self.current_params = self.backtest.parameters.copy()
         
@@ -84,8 +87,8 @@ class AutoParameterAdjuster:
         
         return adjusted_params
     
-    def run_iteration(self, iteration, params):
-        """한 번의 반복 실행"""
+    def run_iteration(self, iteration, params, metrics=None):
+        """한 번의 반복 실행 (metrics 가 주어지면 배치 결과 사용)"""
         print(f"\n=== [반복 {iteration}] 파라미터 자동 완화 ===")
         print(f"현재 파라미터:")
         for key, value in params.items():
@@ -93,8 +96,9 @@ class AutoParameterAdjuster:
                 print(f"  {key}: {value:.4f}")
         
         # 백테스트 실행
-        self.backtest.parameters.update(params)
-        metrics, trades = self.backtest.run_backtest(stock_codes=TEST_CODES, date_range=TEST_RANGE, verbose=False)
+        if metrics is None:
+            self.backtest.parameters.update(params)
+            metrics, trades = self.backtest.run_backtest(stock_codes=TEST_CODES, date_range=TEST_RANGE, verbose=False)
         
         # 결과 기록
         result = {
@@ -118,11 +122,16 @@ class AutoParameterAdjuster:
         print("=== 파라미터 자동 완화 루프 시작 ===")
         print(f"목표 신호 수: {TARGET_SIGNALS}, 최소 신호 수: {MIN_SIGNALS}")
         
-        current_params = self.backtest.parameters.copy()
+        # 완화 단계는 결과와 무관하게 정해지므로 전체 단계를 미리 만들어 한 번에 평가
+        schedule = [self.backtest.parameters.copy()]
+        for _ in range(MAX_ITERATIONS - 1):
+            schedule.append(self.adjust_parameters(schedule[-1], PARAMETER_RELAX_RATIO))
+        table = self.backtest.run_backtest_batch(schedule, stock_codes=TEST_CODES, date_range=TEST_RANGE, verbose=False)
         
-        for iteration in range(1, MAX_ITERATIONS + 1):
-            # 현재 파라미터로 테스트
-            result = self.run_iteration(iteration, current_params)
+        for iteration, (current_params, row) in enumerate(zip(schedule, table.to_dict('records')), start=1):
+            # 현재 파라미터로 테스트 (거래가 없으면 빈 지표)
+            metrics = row if row['total_trades'] > 0 else {}
+            result = self.run_iteration(iteration, current_params, metrics)
             self.iteration_results.append(result)
             
             signals = result['total_trades']
@@ -136,10 +145,9 @@ class AutoParameterAdjuster:
             if signals < MIN_SIGNALS:
                 print(f"⚠️  경고: 신호 수가 너무 적습니다 ({signals} < {MIN_SIGNALS})")
             
-            # 파라미터 완화
+            # 파라미터 완화 (다음 단계)
             if iteration < MAX_ITERATIONS:
                 print(f"파라미터 완화 중... (신호 수: {signals} < 목표: {TARGET_SIGNALS})")
-                current_params = self.adjust_parameters(current_params, PARAMETER_RELAX_RATIO)
             else:
                 print(f"최대 반복 횟수 도달 ({MAX_ITERATIONS})")
         
@@ -178,12 +186,13 @@ class AutoParameterAdjuster:
             values = [r['params'].get(param, 0) for r in self.iteration_results]
             print(f"  {param}: {values}")
         
-        # CSV 저장
-        results_df = pd.DataFrame(self.iteration_results)
-        file_dt = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-        csv_name = f'auto_parameter_adjustment_{file_dt}.csv'
-        results_df.to_csv(csv_name, index=False)
-        print(f"\n📁 결과가 '{csv_name}'에 저장되었습니다.")
+        # 백테스트 결과 저장소에 반복별 run 저장 (database/backtest_results.db)
+        experiment = f"auto_parameter_adjustment_{datetime.datetime.now():%Y%m%d_%H%M%S}"
+        store = get_backtest_store()
+        for result in self.iteration_results:
+            metrics = {k: v for k, v in result.items() if k != 'params'}
+            store.save_run(None, metrics, result['params'], experiment=experiment, date_range=TEST_RANGE)
+        print(f"\n📁 결과가 백테스트 결과 저장소에 저장되었습니다. (experiment '{experiment}')")
 
 def main():
     """메인 실행 함수"""
@@ -0,0 +1,264 @@
+"""
+Backtest Benchmark - 백테스트 파이프라인 단계별 성능 측정
+
+core/synthetic_data.py 로 (종목 수 x 거래일 수) 규모의 1분봉을 생성한 뒤
+run_backtest 와 같은 순서로 단계별 시간/최대 메모리를 측정하고 JSON 으로 저장한다.
+커밋 간 JSON 을 비교해서 일정 비율 이상 느려진 단계를 회귀로 표시한다.
+
+단계:
+    store     CSV -> 컬럼형 저장소 변환 (매 반복마다 새로 변환)
+    load      저장소에서 1분봉 로드
+    features  Feature 계산
+    filters   패턴 필터
+    orb       ORB 진입점 탐색 (필터 결과와 무관하게 전체 거래일 기준 = 모두 통과했을 때의 상한)
+    simulate  거래 시뮬레이션
+    metrics   성과 지표
+
+사용법:
+    python -m core.backtest_benchmark --stocks 20 --days 60
+    python -m core.backtest_benchmark --compare base.json new.json
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+import subprocess
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from core.gradual_rise_backtest import GradualRiseBacktest
+from core.synthetic_data import generate_dataset
+
+# === CONFIG ===
+N_STOCKS = 20
+N_DAYS = 60
+SEED = 0
+REPEAT = 3                  # 단계별 시간은 반복 중 최소값 사용
+RESULT_DIR = 'benchmark_results'
+REGRESSION_THRESHOLD = 0.10  # 기준 대비 10% 이상 느려지면 회귀
+MIN_COMPARE_SECONDS = 0.01   # 이보다 짧은 단계는 측정 오차가 커서 회귀 판정 제외
+
+STAGES = ['store', 'load', 'features', 'filters', 'orb', 'simulate', 'metrics']
+
+
+def _git_commit():
+    """현재 커밋 (git 이 없으면 None)"""
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _max_rss_mb():
+    """프로세스 최대 RSS (MB, 지원하지 않는 OS 는 None)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 는 KB, macOS 는 byte 단위
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def run_stages(backtest, trace_memory=False):
+    """
+    파이프라인 1회 실행
+
+    Returns:
+        ({단계: 초}, {단계: 최대 메모리 MB}, {건수})
+    """
+    timings, peaks = {}, {}
+
+    def stage(name, fn):
+        if trace_memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        # load_data/apply_filters 진행 로그는 측정에서 제외
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = fn()
+        timings[name] = time.perf_counter() - start
+        if trace_memory:
+            peaks[name] = (tracemalloc.get_traced_memory()[1] - base) / (1024 * 1024)
+        return result
+
+    shutil.rmtree(backtest.store.store_path, ignore_errors=True)
+    stage('store', lambda: backtest.store.ensure(backtest._select_files()))
+    data = stage('load', backtest.load_data)
+    features = stage('features', lambda: backtest.calculate_features(data))
+    filtered = stage('filters', lambda: backtest.apply_filters(features))
+    entries = stage('orb', lambda: backtest.find_orb_entries(features))
+    trades = stage('simulate', lambda: backtest.simulate_trades(entries))
+    stage('metrics', lambda: backtest.calculate_metrics(trades))
+
+    counts = {
+        'rows': len(data),
+        'feature_days': len(features),
+        'signals': len(filtered),
+        'entries': len(entries),
+        'trades': len(trades),
+    }
+    return timings, peaks, counts
+
+
+def run_benchmark(n_stocks=N_STOCKS, n_days=N_DAYS, seed=SEED, repeat=REPEAT, work_dir=None):
+    """
+    합성 데이터 생성 후 단계별 시간/메모리 측정
+
+    Args:
+        work_dir: 데이터 생성 디렉토리 (None 이면 임시 디렉토리 생성 후 삭제)
+    Returns:
+        결과 dict (JSON 저장 가능)
+    """
+    cleanup = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix='backtest_bench_')
+    try:
+        generate_dataset(work_dir, n_stocks, n_days, seed)
+        # KOSPI_PATH/minute_data 가 상대경로라 생성 디렉토리 기준으로 실행
+        with contextlib.chdir(work_dir):
+            backtest = GradualRiseBacktest('minute_data')
+            runs = []
+            for _ in range(repeat):
+                timings, _, counts = run_stages(backtest)
+                runs.append(timings)
+            # 메모리 측정은 tracemalloc 오버헤드가 시간에 섞이지 않게 따로 1회
+            tracemalloc.start()
+            try:
+                _, peaks, _ = run_stages(backtest, trace_memory=True)
+            finally:
+                tracemalloc.stop()
+    finally:
+        if cleanup:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    stages = {
+        name: {
+            'seconds': min(run[name] for run in runs),
+            'runs': [run[name] for run in runs],
+            'peak_mb': peaks[name],
+        }
+        for name in STAGES
+    }
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'n_stocks': n_stocks,
+            'n_days': n_days,
+            'seed': seed,
+            'repeat': repeat,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+        },
+        'counts': counts,
+        'stages': stages,
+        'total_seconds': sum(s['seconds'] for s in stages.values()),
+        'peak_mb': max(s['peak_mb'] for s in stages.values()),
+        'max_rss_mb': _max_rss_mb(),
+    }
+
+
+def write_result(result, result_dir=RESULT_DIR):
+    """결과 JSON 저장 -> 파일 경로"""
+    os.makedirs(result_dir, exist_ok=True)
+    meta = result['meta']
+    stamp = meta['timestamp'].replace(':', '').replace('-', '')
+    name = f"bench_{meta['n_stocks']}x{meta['n_days']}_{meta['commit'] or 'nogit'}_{stamp}.json"
+    path = os.path.join(result_dir, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def compare_results(base, new, threshold=REGRESSION_THRESHOLD):
+    """
+    두 결과의 단계별 시간 비교
+
+    Returns:
+        [{'stage', 'base', 'new', 'ratio', 'regression'}, ...]
+    """
+    rows = []
+    for name in STAGES + ['total']:
+        if name == 'total':
+            base_sec, new_sec = base['total_seconds'], new['total_seconds']
+        elif name in base['stages'] and name in new['stages']:
+            base_sec, new_sec = base['stages'][name]['seconds'], new['stages'][name]['seconds']
+        else:
+            continue
+        ratio = new_sec / base_sec if base_sec > 0 else float('inf')
+        rows.append({
+            'stage': name,
+            'base': base_sec,
+            'new': new_sec,
+            'ratio': ratio,
+            'regression': max(base_sec, new_sec) >= MIN_COMPARE_SECONDS and ratio > 1 + threshold,
+        })
+    return rows
+
+
+def print_result(result):
+    """단계별 결과 출력"""
+    meta = result['meta']
+    print(f"=== 백테스트 벤치마크: {meta['n_stocks']} 종목 x {meta['n_days']} 거래일 "
+          f"(commit {meta['commit']}, {meta['repeat']}회 중 최소) ===")
+    print(f"{'단계':<10}{'시간(초)':>12}{'최대 메모리(MB)':>18}")
+    for name in STAGES:
+        s = result['stages'][name]
+        print(f"{name:<10}{s['seconds']:>12.4f}{s['peak_mb']:>18.1f}")
+    print(f"{'total':<10}{result['total_seconds']:>12.4f}{result['peak_mb']:>18.1f}")
+    print(f"건수: {result['counts']}")
+    if result['max_rss_mb'] is not None:
+        print(f"최대 RSS: {result['max_rss_mb']:.1f} MB")
+
+
+def print_comparison(rows):
+    """비교 결과 출력"""
+    print(f"{'단계':<10}{'기준(초)':>12}{'신규(초)':>12}{'비율':>8}")
+    for row in rows:
+        flag = '  <- 회귀' if row['regression'] else ''
+        print(f"{row['stage']:<10}{row['base']:>12.4f}{row['new']:>12.4f}{row['ratio']:>8.2f}{flag}")
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='백테스트 파이프라인 벤치마크')
+    parser.add_argument('--stocks', type=int, default=N_STOCKS, help='합성 종목 수')
+    parser.add_argument('--days', type=int, default=N_DAYS, help='합성 거래일 수')
+    parser.add_argument('--seed', type=int, default=SEED, help='난수 시드')
+    parser.add_argument('--repeat', type=int, default=REPEAT, help='반복 횟수')
+    parser.add_argument('--output', type=str, default=RESULT_DIR, help='결과 JSON 디렉토리')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'), help='두 결과 JSON 비교')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD, help='회귀 판정 비율')
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], encoding='utf-8') as f:
+            base = json.load(f)
+        with open(args.compare[1], encoding='utf-8') as f:
+            new = json.load(f)
+        rows = compare_results(base, new, args.threshold)
+        print_comparison(rows)
+        return 1 if any(row['regression'] for row in rows) else 0
+
+    result = run_benchmark(args.stocks, args.days, args.seed, args.repeat)
+    print_result(result)
+    print(f"\n결과가 '{write_result(result, args.output)}'에 저장되었습니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,17 +16,26 @@ import pandas as pd
 import numpy as np
 from glob import glob
 from utils.indicators import calc_vwap, calc_rsi
+from core.file_pool import map_files
+from core.cost_model import KRXCostModel, apply_costs
+from core.streaming_metrics import return_summary
+from database.backtest_store import get_backtest_store
 
-minute_files = glob('minute_data/*.csv')
-results = []
+# === CONFIG ===
+MINUTE_GLOB = 'minute_data/*.csv'
+N_WORKERS = None  # 프로세스 풀 워커 수 (None 이면 CPU 수, 1 이면 순차 실행)
+COST_MODEL = KRXCostModel()  # net_return 계산용 거래비용 모델 (core/cost_model.py, None 이면 생략)
 
-for file in minute_files:
+
+def process_file(file):
+    """종목 CSV 하나 백테스트 (워커 실행 단위) -> 거래 dict 리스트"""
+    results = []
     df = pd.read_csv(file, parse_dates=['datetime'])
     df['datetime'] = pd.to_datetime(df['datetime'], errors='coerce')
     df = df.dropna(subset=['datetime', 'close', 'high', 'low', 'volume'])
     df = df.sort_values('datetime').reset_index(drop=True)
     if len(df) < 100:
-        continue
+        return results
 
     stock_code = file.split('/')[-1].replace('.csv','')
 
@@ -39,7 +48,7 @@ for file in minute_files:
     buy_window = df[(df['datetime'].dt.time >= pd.to_datetime('10:15').time()) &
                     (df['datetime'].dt.time <= pd.to_datetime('10:45').time())]
     if buy_window.empty:
-        continue
+        return results
 
     # 10~11시 고가, 종가, 거래량 등
     ten = df[(df['datetime'].dt.time >= pd.to_datetime('10:00').time()) &
@@ -65,6 +74,7 @@ for file in minute_files:
             # ▼▼▼ 개선된 청산 및 수익/리스크 기록 ▼▼▼
             sell_price = np.nan
             sell_time = None
+            sell_volume = 0
             sell_reason = ''
             max_price = buy_price
             min_price = buy_price
@@ -80,21 +90,25 @@ for file in minute_files:
                 if price < srow['vwap'] * 0.997:
                     sell_price = price
                     sell_time = srow['datetime']
+                    sell_volume = srow['volume']
                     sell_reason = 'VWAP Break'
                     break
                 elif srow['rsi'] >= 75:
                     sell_price = price
                     sell_time = srow['datetime']
+                    sell_volume = srow['volume']
                     sell_reason = 'RSI Overheat'
                     break
                 elif (high - buy_price) / buy_price >= 0.03:
                     sell_price = high
                     sell_time = srow['datetime']
+                    sell_volume = srow['volume']
                     sell_reason = 'Target Profit'
                     break
                 elif srow['datetime'].time() >= pd.to_datetime('15:00').time():
                     sell_price = price
                     sell_time = srow['datetime']
+                    sell_volume = srow['volume']
                     sell_reason = 'End of Day'
                     break
 
@@ -109,6 +123,8 @@ for file in minute_files:
                     'buy_price': buy_price,
                     'sell_time': sell_time,
                     'sell_price': sell_price,
+                    'buy_volume': row['volume'],
+                    'sell_volume': sell_volume,
                     'return': ret,
                     'sell_reason': sell_reason,
                     'close_pos_10_11': close_pos_10_11,
@@ -119,10 +135,33 @@ for file in minute_files:
                 })
                 break  # 1일 1매수
             # ▲▲▲ 개선된 청산 및 리스크 기록 ▲▲▲
+    return results
+
+
+def run_backtest(files, workers=N_WORKERS):
+    """파일별 백테스트를 프로세스 풀로 실행하고 파일 순서대로 병합"""
+    results = []
+    for _, trades in map_files(process_file, files, workers):
+        results.extend(trades)
+    return results
+
+
+def main():
+    """메인 실행 함수"""
+    results = run_backtest(glob(MINUTE_GLOB))
+
+    # 결과 집계 및 저장
+    results_df = pd.DataFrame(results)
+    if COST_MODEL is not None:
+        results_df = apply_costs(results_df, COST_MODEL)
+    print(results_df.describe())
+    print("\n--- Sell Reason Distribution ---")
+    print(results_df['sell_reason'].value_counts(normalize=True))
+    results_df.to_csv('backtest_gradual_riser_combined.csv', index=False, encoding='utf-8-sig')
+    if len(results_df) > 0:
+        run_id = get_backtest_store().save_run(results_df, return_summary(results_df), strategy='gradual_riser')
+        print(f"백테스트 결과 저장소 run {run_id}")
+
 
-# 결과 집계 및 저장
-results_df = pd.DataFrame(results)
-print(results_df.describe())
-print("\n--- Sell Reason Distribution ---")
-print(results_df['sell_reason'].value_counts(normalize=True))
-results_df.to_csv('backtest_gradual_riser_combined.csv', index=False, encoding='utf-8-sig') 
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Cost Model - 백테스트 공용 체결가/거래비용 모델
+
+모든 함수는 거래 배열을 받아 한 번의 배열 연산으로 계산한다 (거래 수만큼 파이썬 루프 없음).
+
+- FlatCostModel: 고정 비율 슬리피지/수수료 (기존 simulate_trades 0.1%/0.1% 와 동일한 값)
+- KRXCostModel: KRX 호가단위 반올림, 매도 거래세, 증권사 수수료 구간, 봉 거래량 대비 주문 비중 슬리피지
+
+청산 사유 코드 (EXIT_TP/EXIT_SL/EXIT_CLOSE) 는 core/orb_simulator.py 와 공용.
+"""
+
+import numpy as np
+
+EXIT_TP, EXIT_SL, EXIT_CLOSE = 0, 1, 2
+
+COMMISSION = 0.001  # 0.1% (FlatCostModel 기본값)
+SLIPPAGE = 0.001    # 0.1%
+
+# KRX 호가가격단위 (2023.01 개정, 유가증권/코스닥 공통): (가격 하한, 호가단위)
+TICK_TABLE = ((0, 1), (2_000, 5), (5_000, 10), (20_000, 50), (50_000, 100), (200_000, 500), (500_000, 1_000))
+SELL_TAX = 0.0015                    # 증권거래세 + 농특세 (매도 금액 기준, 2025년)
+COMMISSION_TIERS = ((0, 0.00015),)   # (거래 금액 하한, 수수료율) - 키움 온라인 기본 0.015%
+IMPACT_COEF = 0.1                    # 슬리피지 = IMPACT_COEF * sqrt(주문 수량 / 봉 거래량)
+MAX_SLIPPAGE = 0.01                  # 슬리피지 상한 (거래량 0 봉 포함)
+ORDER_VALUE = 500_000                # 수량 없는 백테스트의 주문 금액 (RISK_MANAGEMENT max_per_stock)
+
+_TICK_BOUNDS = np.array([bound for bound, _ in TICK_TABLE[1:]], dtype=np.float64)
+_TICK_SIZES = np.array([tick for _, tick in TICK_TABLE], dtype=np.float64)
+
+
+def tick_size(price):
+    """가격별 KRX 호가단위"""
+    return _TICK_SIZES[np.searchsorted(_TICK_BOUNDS, np.asarray(price, dtype=np.float64), side='right')]
+
+
+def round_to_tick(price, up):
+    """호가단위로 올림(up=True, 매수 체결가) 또는 내림(매도 체결가)"""
+    price = np.asarray(price, dtype=np.float64)
+    tick = tick_size(price)
+    # 이미 호가단위인 가격이 부동소수 오차로 한 틱 밀리지 않도록 여유를 둠
+    if up:
+        return np.ceil(price / tick - 1e-9) * tick
+    return np.floor(price / tick + 1e-9) * tick
+
+
+def tiered_rate(amount, tiers=COMMISSION_TIERS):
+    """거래 금액 구간별 수수료율"""
+    bounds = np.array([bound for bound, _ in tiers[1:]], dtype=np.float64)
+    rates = np.array([rate for _, rate in tiers], dtype=np.float64)
+    return rates[np.searchsorted(bounds, np.asarray(amount, dtype=np.float64), side='right')]
+
+
+class FlatCostModel:
+    """고정 비율 슬리피지/수수료 (TP/SL 기준가에 슬리피지를 먼저 반영하는 기존 방식)"""
+
+    def __init__(self, slippage=SLIPPAGE, commission=COMMISSION):
+        self.slippage = slippage
+        self.commission = commission
+
+    def exit_levels(self, raw_tp, raw_sl):
+        """봉 고가/저가와 비교할 익절/손절 기준가 (= 체결가)"""
+        return raw_tp * (1 - self.slippage), raw_sl * (1 - self.slippage)
+
+    def entry_fill(self, price, volume=None, quantity=None):
+        """매수 체결가"""
+        return price * (1 + self.slippage)
+
+    def exit_fill(self, price, exit_code, volume=None, quantity=None):
+        """매도 체결가 (TP/SL 은 exit_levels 에서 이미 반영)"""
+        return np.where(exit_code == EXIT_CLOSE, price * (1 - self.slippage), price)
+
+    def net_return(self, entry_fill, exit_fill, quantity=None):
+        """수수료 반영 수익률 (진입+청산)"""
+        return (exit_fill / entry_fill) - 1 - 2 * self.commission
+
+
+class KRXCostModel:
+    """
+    KRX 실거래 비용 모델
+
+    - 익절은 호가단위로 올린 지정가 매도 (슬리피지 없음), 손절/종가 청산/진입은 시장가
+    - 시장가 슬리피지 = min(IMPACT_COEF * sqrt(주문 수량 / 봉 거래량), MAX_SLIPPAGE), 체결가는 불리한 쪽 호가
+    - 수수료는 매수/매도 금액 구간별 요율, 거래세는 매도 금액에만
+    """
+
+    def __init__(self, sell_tax=SELL_TAX, commission_tiers=COMMISSION_TIERS, impact_coef=IMPACT_COEF,
+                 max_slippage=MAX_SLIPPAGE, order_value=ORDER_VALUE):
+        self.sell_tax = sell_tax
+        self.commission_tiers = commission_tiers
+        self.impact_coef = impact_coef
+        self.max_slippage = max_slippage
+        self.order_value = order_value
+
+    def quantity(self, price, quantity=None):
+        """주문 수량 (없으면 order_value 로 살 수 있는 수량, 최소 1주)"""
+        if quantity is not None:
+            return np.asarray(quantity, dtype=np.float64)
+        return np.maximum(np.floor(self.order_value / np.asarray(price, dtype=np.float64)), 1)
+
+    def slippage(self, price, volume, quantity=None):
+        """봉 거래량 대비 주문 비중 슬리피지 (volume 이 없으면 0)"""
+        if volume is None:
+            return np.zeros(np.shape(price))
+        volume = np.asarray(volume, dtype=np.float64)
+        with np.errstate(divide='ignore'):
+            participation = self.quantity(price, quantity) / volume
+        return np.minimum(self.impact_coef * np.sqrt(participation), self.max_slippage)
+
+    def exit_levels(self, raw_tp, raw_sl):
+        return round_to_tick(raw_tp, up=True), round_to_tick(raw_sl, up=False)
+
+    def entry_fill(self, price, volume=None, quantity=None):
+        return round_to_tick(price * (1 + self.slippage(price, volume, quantity)), up=True)
+
+    def exit_fill(self, price, exit_code, volume=None, quantity=None):
+        market = round_to_tick(price * (1 - self.slippage(price, volume, quantity)), up=False)
+        return np.where(exit_code == EXIT_TP, price, market)
+
+    def net_return(self, entry_fill, exit_fill, quantity=None):
+        qty = self.quantity(entry_fill, quantity)
+        buy_cost = entry_fill * (1 + tiered_rate(entry_fill * qty, self.commission_tiers))
+        sell_value = exit_fill * (1 - tiered_rate(exit_fill * qty, self.commission_tiers) - self.sell_tax)
+        return sell_value / buy_cost - 1
+
+
+def apply_costs(trades_df, cost_model, buy_price='buy_price', sell_price='sell_price',
+                buy_volume='buy_volume', sell_volume='sell_volume'):
+    """
+    체결가 기준 거래 내역(시장가 진입/청산)에 비용 반영 -> net_return 컬럼 추가
+
+    파일 단위 스크립트(backtest_gradual_riser*.py) 결과처럼 청산 사유 코드가 없는 거래는 모두 시장가로 본다.
+    """
+    if len(trades_df) == 0:
+        return trades_df
+    volume = trades_df[buy_volume].to_numpy() if buy_volume in trades_df else None
+    entry = cost_model.entry_fill(trades_df[buy_price].to_numpy(dtype=np.float64), volume)
+    volume = trades_df[sell_volume].to_numpy() if sell_volume in trades_df else None
+    exit_ = cost_model.exit_fill(trades_df[sell_price].to_numpy(dtype=np.float64), EXIT_CLOSE, volume)
+    trades_df['net_return'] = cost_model.net_return(entry, exit_)
+    return trades_df
@@ -0,0 +1,139 @@
+"""
+Feature Cache - 최적화 루프용 Feature 영구 캐시
+
+Optuna trial 마다 바뀌는 것은 apply_filters 임계값과 TP/SL/ORB 파라미터뿐이므로
+calculate_features 결과는 (종목 집합, 기간, 데이터 파일 mtime/size, Feature 코드 버전) 이
+같으면 재사용한다. 디스크(pickle)와 프로세스 메모리에 두 단계로 보관하고,
+둘 다 크기 기준 LRU 로 정리한다.
+"""
+
+import os
+import glob
+import json
+import pickle
+import hashlib
+from collections import OrderedDict
+
+from core.feature_engine import FEATURE_VERSION
+
+CACHE_DIRNAME = "feature_cache"
+DEFAULT_MAX_DISK_BYTES = 2 * 1024 ** 3    # 디스크 2GB
+DEFAULT_MAX_MEMORY_BYTES = 512 * 1024 ** 2  # 메모리 512MB
+CACHE_FORMAT = 2  # 캐시 항목 구조가 바뀌면 올린다 (2: (features, BarArray))
+
+_feature_caches = {}
+
+
+def file_fingerprint(path):
+    """파일 경로/mtime/size (없으면 None)"""
+    if not os.path.exists(path):
+        return [os.path.basename(path), None, None]
+    stat = os.stat(path)
+    return [os.path.basename(path), stat.st_mtime_ns, stat.st_size]
+
+
+class FeatureCache:
+    """Feature DataFrame 디스크 + 메모리 LRU 캐시"""
+
+    def __init__(self, cache_dir, max_disk_bytes=DEFAULT_MAX_DISK_BYTES,
+                 max_memory_bytes=DEFAULT_MAX_MEMORY_BYTES):
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self._memory = OrderedDict()  # key -> (features, nbytes)
+        self._memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, data_files, date_range=None, extra_files=()):
+        """데이터 지문 -> 캐시 키"""
+        payload = {
+            'feature_version': FEATURE_VERSION,
+            'format': CACHE_FORMAT,
+            'data_files': sorted(file_fingerprint(f) for f in data_files),
+            'date_range': [str(d) for d in date_range] if date_range is not None else None,
+            'extra_files': [file_fingerprint(f) for f in extra_files],
+        }
+        raw = json.dumps(payload, sort_keys=True).encode('utf-8')
+        return hashlib.sha1(raw).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def _remember(self, key, features, nbytes):
+        if key in self._memory:
+            self._memory_bytes -= self._memory.pop(key)[1]
+        self._memory[key] = (features, nbytes)
+        self._memory_bytes += nbytes
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, (_, evicted) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted
+
+    def get(self, key):
+        """캐시 조회 (없으면 None)"""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key][0]
+
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+            features = pickle.loads(raw)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self.misses += 1
+            return None
+
+        os.utime(path)  # LRU 기준 시각 갱신
+        self._remember(key, features, len(raw))
+        self.hits += 1
+        return features
+
+    def put(self, key, features):
+        """캐시 저장 후 용량 초과분 정리"""
+        raw = pickle.dumps(features, protocol=pickle.HIGHEST_PROTOCOL)
+        self._remember(key, features, len(raw))
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = self._path(key) + f".{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(raw)
+            os.replace(tmp_path, self._path(key))
+            self._evict_disk()
+        except OSError as e:
+            print(f"Feature 캐시 저장 실패: {e}")
+
+    def _evict_disk(self):
+        """오래 안 쓴 파일부터 삭제해서 max_disk_bytes 이하로 유지"""
+        entries = []
+        for path in glob.glob(os.path.join(self.cache_dir, "*.pkl")):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
+
+    def clear(self):
+        """메모리/디스크 캐시 전체 삭제"""
+        self._memory.clear()
+        self._memory_bytes = 0
+        for path in glob.glob(os.path.join(self.cache_dir, "*.pkl")):
+            os.remove(path)
+
+
+def get_feature_cache(data_path="minute_data"):
+    """data_path 별 전역 Feature 캐시 인스턴스 반환"""
+    cache_dir = os.path.join(data_path, CACHE_DIRNAME)
+    if cache_dir not in _feature_caches:
+        _feature_caches[cache_dir] = FeatureCache(cache_dir)
+    return _feature_caches[cache_dir]
@@ -0,0 +1,245 @@
+"""
+Feature Engine - 완만 상승 백테스트 Feature 일괄 계산
+
+GradualRiseBacktest.calculate_features 의 (종목, 거래일) 단위 파이썬 루프를 대체한다.
+모든 거래일의 첫 N분을 (거래일 x 분 x OHLCV) 3차원 배열로 펼친 뒤
+기존 Feature 컬럼을 배열 연산으로 한 번에 계산한다. 컬럼/값은 기존 구현과 동일.
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_collection.minute_store import ordinal_dates, widen
+from utils.indicators import rsi_averages, macd, bollinger, stochastic, vwap
+
+# Feature 계산 로직이 바뀌면 올린다 (캐시 무효화 기준)
+FEATURE_VERSION = 1
+
+MIN_DAY_BARS = 30      # 최소 30분 데이터 필요
+FEATURE_MINUTES = 15   # 첫 15분으로 Feature 계산
+
+FEATURE_COLUMNS = [
+    'stock_code', 'date', 'open_price',
+    # 기본 가격
+    'r_1', 'cum_r_15', 'opening_gap',
+    # 거래량
+    'volume_15min', 'volume_5min', 'volume_10min', 'v_ratio_15', 'v_ratio_5',
+    'volume_sma_5', 'volume_sma_10',
+    # 기술적 지표
+    'rsi_15', 'macd_line', 'macd_signal', 'macd_histogram', 'bb_position', 'bb_width',
+    'k_percent', 'd_percent', 'momentum_5', 'momentum_10', 'trend_strength',
+    # 변동성/리스크
+    'max_drawdown_15', 'volatility_15', 'atr_15', 'slope_15', 'hl_score', 'vwap_gap',
+    # 시간대별
+    'is_opening', 'is_lunch', 'is_closing', 'time_minutes',
+    # 시장상황
+    'kospi_return_15', 'kospi_volatility_15',
+    # Feature 조합
+    'price_volume_momentum', 'rsi_volume_interaction', 'bb_volume_interaction',
+]
+
+
+def sort_minute_bars(df):
+    """(stock_code, datetime) 순 안정 정렬 + 종목별 직전 봉 종가(prev_close) 추가"""
+    codes, _ = pd.factorize(df['stock_code'], sort=True)
+    dt_ns = df['datetime'].values.astype('datetime64[ns]').astype(np.int64)
+    order = np.lexsort((dt_ns, codes))
+    df = df.take(order)
+    codes = codes[order]
+
+    close = df['close'].to_numpy(dtype=np.float64)
+    prev_close = np.full(len(df), np.nan)
+    if len(df) > 1:
+        same_stock = codes[1:] == codes[:-1]
+        prev_close[1:] = np.where(same_stock, close[:-1], np.nan)
+    df['prev_close'] = prev_close
+    return df, codes, dt_ns[order]
+
+
+def day_boundaries(codes, dt_ns):
+    """정렬된 1분봉에서 (종목, 거래일) 구간의 시작/끝 row"""
+    n = len(codes)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    day_ord = dt_ns // (86400 * 10**9)
+    change = np.flatnonzero((codes[1:] != codes[:-1]) | (day_ord[1:] != day_ord[:-1])) + 1
+    starts = np.r_[0, change].astype(np.int64)
+    ends = np.r_[change, n].astype(np.int64)
+    return starts, ends
+
+
+def _python_fallback(values, fallback):
+    """파이썬 int 기본값만 들어간 컬럼은 기존 구현처럼 int64 로 유지"""
+    if len(values) and fallback.all():
+        return values.astype(np.int64)
+    return values
+
+
+def kospi_lookup(dates, kospi_df):
+    """거래일별 KOSPI 수익률/변동성 (없으면 0)"""
+    kospi = kospi_df.drop_duplicates('date', keep='last').set_index('date')
+    pos = kospi.index.get_indexer(pd.Index(dates, dtype=object))
+    found = pos >= 0
+    ret = np.zeros(len(dates))
+    vol = np.zeros(len(dates))
+    ret[found] = kospi['kospi_return'].to_numpy(dtype=np.float64)[pos[found]]
+    vol[found] = kospi['kospi_volatility'].to_numpy(dtype=np.float64)[pos[found]]
+    return _python_fallback(ret, ~found), _python_fallback(vol, ~found)
+
+
+def compute_features(df, kospi_df):
+    """
+    1분봉 -> 거래일별 Feature DataFrame
+
+    Args:
+        df: load_data 결과 (공용 1분봉 스키마: stock_code, datetime, day, open/high/low/close/volume)
+        kospi_df: date(datetime.date), kospi_return, kospi_volatility 컬럼
+    Returns:
+        (features_df, sorted_df, starts, ends)
+        features_df 의 각 row 는 sorted_df.iloc[starts[i]:ends[i]] 거래일에 대응
+    """
+    df, codes, dt_ns = sort_minute_bars(df)
+    starts, ends = day_boundaries(codes, dt_ns)
+    keep = (ends - starts) >= MIN_DAY_BARS
+    starts, ends = starts[keep], ends[keep]
+    if len(starts) == 0:
+        return pd.DataFrame(), df, starts, ends
+
+    W = FEATURE_MINUTES
+    idx = starts[:, None] + np.arange(W)
+    o = widen(df['open'].to_numpy()[idx])
+    h = widen(df['high'].to_numpy()[idx])
+    l = widen(df['low'].to_numpy()[idx])
+    c = widen(df['close'].to_numpy()[idx])
+    v = widen(df['volume'].to_numpy()[idx])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # === 1. 기본 가격 Feature ===
+        open_price = o[:, 0]
+        close_15min = c[:, W - 1]
+        prev_close = df['prev_close'].to_numpy()[starts]
+        gap_ok = ~np.isnan(prev_close) & (prev_close != 0)
+        opening_gap = _python_fallback(np.where(gap_ok, open_price / prev_close - 1, 0), ~gap_ok)
+        r_1 = (c[:, 0] / open_price) - 1
+        cum_r_15 = (close_15min / open_price) - 1
+
+        # === 2. 거래량 Feature ===
+        volume_15min = v.sum(axis=1)
+        volume_5min = v[:, :5].sum(axis=1)
+        volume_10min = v[:, :10].sum(axis=1)
+        volume_sma_5 = v[:, W - 5:].mean(axis=1)
+        volume_sma_10 = v[:, W - 10:].mean(axis=1)
+        sma10_ok = volume_sma_10 > 0
+        sma5_ok = volume_sma_5 > 0
+        v_ratio_15 = _python_fallback(np.where(sma10_ok, volume_15min / (volume_sma_10 * 15), 1), ~sma10_ok)
+        v_ratio_5 = _python_fallback(np.where(sma5_ok, volume_5min / (volume_sma_5 * 5), 1), ~sma5_ok)
+
+        # === 3. 기술적 지표 ===
+        # 지표는 utils/indicators.py 배치형으로 계산 (실시간 증분형과 같은 값)
+        # RSI (14기간, 하락 없는 구간은 기존 정의대로 rs=0)
+        avg_gain, avg_loss = (a[:, -1] for a in rsi_averages(c, 14))
+        rs = np.where(avg_loss != 0, avg_gain / avg_loss, 0)
+        rsi_15 = 100 - (100 / (1 + rs))
+
+        # MACD(26)/볼린저(20)는 15분 구간에서 워밍업이 끝나지 않아 기존 구현과 동일하게 NaN
+        macd_line, macd_signal, macd_histogram = (a[:, -1] for a in macd(c))
+        bb_middle, bb_upper, bb_lower = (a[:, -1] for a in bollinger(c, 20))
+        bb_position = np.where(bb_upper != bb_lower, (close_15min - bb_lower) / (bb_upper - bb_lower), 0.5)
+        bb_width = (bb_upper - bb_lower) / bb_middle
+
+        # 스토캐스틱 (14기간, 종가 기준)
+        k_percent = stochastic(c, c, c, 14)[0][:, -1]
+        k_percent = _python_fallback(k_percent, c[:, -14:].max(axis=1) == c[:, -14:].min(axis=1))
+        d_percent = k_percent  # 단순화
+
+        # 모멘텀 지표
+        momentum_5 = (close_15min / c[:, -5]) - 1
+        momentum_10 = (close_15min / c[:, -10]) - 1
+
+        # 추세 강도 (선형회귀 상관계수, scipy.stats.linregress 와 동일한 정의)
+        x = np.arange(W, dtype=np.float64)
+        xc = x - x.mean()
+        yc = c - c.mean(axis=1, keepdims=True)
+        ssxm = (xc @ xc) / W
+        ssxym = (yc @ xc) / W
+        ssym = np.einsum('ij,ij->i', yc, yc) / W
+        r_value = np.clip(ssxym / np.sqrt(ssxm * ssym), -1.0, 1.0)
+        r_value = np.where(ssym == 0, np.where(ssxym == 0, np.nan, 0.0), r_value)
+        trend_strength = np.abs(r_value)
+
+        # === 4. 변동성/리스크 지표 ===
+        high_15min = h.max(axis=1)
+        low_15min = l.min(axis=1)
+        max_drawdown_15 = (low_15min / high_15min) - 1
+        volatility_15 = high_15min - low_15min
+        atr_15 = (h - l).mean(axis=1)
+
+        # === 5. 시간대별 특성 ===
+        tod_15 = (dt_ns[starts + W - 1] // 10**9) % 86400
+        time_minutes = tod_15 // 3600 * 60 + (tod_15 % 3600) // 60
+        is_opening = ((540 <= time_minutes) & (time_minutes <= 570)).astype(np.int64)
+        is_lunch = ((690 <= time_minutes) & (time_minutes <= 780)).astype(np.int64)
+        is_closing = ((900 <= time_minutes) & (time_minutes <= 930)).astype(np.int64)
+
+        # === 6. 가격 패턴 ===
+        # Higher-Low Score: close[i] > 직전 5분 SMA (i=5..14) 개수 / 11
+        sma_5_prev = sum(c[:, k:k + W - 5] for k in range(5)) / 5
+        hl_score = np.sum(c[:, 5:] > sma_5_prev, axis=1) / 11
+        vwap_15 = vwap(c, v)[:, -1]
+        vwap_gap = (close_15min - vwap_15) / vwap_15
+        slope_15 = (yc @ xc) / (xc @ xc)
+
+        # === 7. 시장상황 Feature ===
+        dates = ordinal_dates(df['day'].to_numpy()[starts])
+        kospi_return_15, kospi_volatility_15 = kospi_lookup(dates, kospi_df)
+
+        # === 8. Feature 조합/상호작용 ===
+        pvm_ok = ~np.isnan(momentum_5) & ~np.isnan(v_ratio_5)
+        rvi_ok = ~np.isnan(rsi_15) & ~np.isnan(v_ratio_15)
+        bvi_ok = ~np.isnan(bb_position) & ~np.isnan(v_ratio_15)
+        price_volume_momentum = _python_fallback(np.where(pvm_ok, momentum_5 * v_ratio_5, 0), ~pvm_ok)
+        rsi_volume_interaction = _python_fallback(np.where(rvi_ok, rsi_15 * v_ratio_15, 0), ~rvi_ok)
+        bb_volume_interaction = _python_fallback(np.where(bvi_ok, bb_position * v_ratio_15, 0), ~bvi_ok)
+
+    features = pd.DataFrame({
+        'stock_code': df['stock_code'].to_numpy()[starts],
+        'date': dates,
+        'open_price': open_price,
+        'r_1': r_1,
+        'cum_r_15': cum_r_15,
+        'opening_gap': opening_gap,
+        'volume_15min': volume_15min,
+        'volume_5min': volume_5min,
+        'volume_10min': volume_10min,
+        'v_ratio_15': v_ratio_15,
+        'v_ratio_5': v_ratio_5,
+        'volume_sma_5': volume_sma_5,
+        'volume_sma_10': volume_sma_10,
+        'rsi_15': rsi_15,
+        'macd_line': macd_line,
+        'macd_signal': macd_signal,
+        'macd_histogram': macd_histogram,
+        'bb_position': bb_position,
+        'bb_width': bb_width,
+        'k_percent': k_percent,
+        'd_percent': d_percent,
+        'momentum_5': momentum_5,
+        'momentum_10': momentum_10,
+        'trend_strength': trend_strength,
+        'max_drawdown_15': max_drawdown_15,
+        'volatility_15': volatility_15,
+        'atr_15': atr_15,
+        'slope_15': slope_15,
+        'hl_score': hl_score,
+        'vwap_gap': vwap_gap,
+        'is_opening': is_opening,
+        'is_lunch': is_lunch,
+        'is_closing': is_closing,
+        'time_minutes': time_minutes,
+        'kospi_return_15': kospi_return_15,
+        'kospi_volatility_15': kospi_volatility_15,
+        'price_volume_momentum': price_volume_momentum,
+        'rsi_volume_interaction': rsi_volume_interaction,
+        'bb_volume_interaction': bb_volume_interaction,
+    }, columns=FEATURE_COLUMNS)
+    return features, df, starts, ends
@@ -0,0 +1,173 @@
+"""
+Feature Store - (종목, 거래일) 단위 Feature 테이블 증분 갱신
+
+매일 장 마감 후 1분봉이 추가되면 전체 거래일을 다시 계산하지 않고
+새로 생겼거나 봉 개수가 바뀐 거래일만 Feature 를 계산해서 기존 테이블에 합친다.
+
+변경 감지:
+- 1분봉 저장소(MinuteBarStore) 원본 CSV mtime/size 가 그대로면 저장된 테이블 그대로 사용
+- 바뀌었으면 거래일별 봉 개수를 비교해서 달라진 거래일 + 그 다음 거래일(opening_gap 이 전일 종가에 의존)만 재계산
+- KOSPI 파일이 바뀌면 kospi_return_15/kospi_volatility_15 컬럼만 다시 조인
+
+저장 구조:
+    <data_path>/feature_store/<stock_code>.pkl   # {'meta': {...}, 'features': DataFrame}
+"""
+
+import os
+import sys
+import glob
+import pickle
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from core.feature_engine import FEATURE_VERSION, compute_features, kospi_lookup
+from core.feature_cache import file_fingerprint
+from data_collection.minute_store import EPOCH, code_from_path
+
+STORE_DIRNAME = "feature_store"
+
+_feature_stores = {}
+
+
+def _day_str(day_ordinal):
+    return str(EPOCH + timedelta(days=int(day_ordinal)))
+
+
+class FeatureStore:
+    """종목별 Feature 테이블 (거래일 단위 증분 갱신)"""
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+
+    def _path(self, stock_code):
+        return os.path.join(self.store_dir, f"{stock_code}.pkl")
+
+    def read(self, stock_code):
+        """저장된 {'meta', 'features'} (없거나 버전이 다르면 None)"""
+        try:
+            with open(self._path(stock_code), 'rb') as f:
+                entry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        if entry['meta'].get('feature_version') != FEATURE_VERSION:
+            return None
+        return entry
+
+    def _write(self, stock_code, entry):
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp_path = self._path(stock_code) + f".{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._path(stock_code))
+
+    def update(self, bar_store, stock_code, kospi_df, kospi_fingerprint):
+        """
+        종목 하나의 Feature 테이블을 최신 1분봉에 맞춰 갱신
+
+        Args:
+            bar_store: MinuteBarStore (해당 종목 파티션이 최신이어야 함)
+        Returns:
+            (전체 거래일 Feature DataFrame, 재계산한 거래일 수)
+        """
+        entry = self.read(stock_code)
+        bar_meta = bar_store.read_meta(stock_code)
+        source = [bar_meta['source_mtime_ns'], bar_meta['source_size']]
+
+        if entry is not None and entry['meta']['source'] == source:
+            if entry['meta']['kospi'] == kospi_fingerprint:
+                return entry['features'], 0
+            # 1분봉은 그대로, KOSPI 만 갱신된 경우
+            features = entry['features']
+            if len(features):
+                features['kospi_return_15'], features['kospi_volatility_15'] = kospi_lookup(
+                    features['date'].to_numpy(), kospi_df)
+            entry['meta']['kospi'] = kospi_fingerprint
+            self._write(stock_code, entry)
+            return features, 0
+
+        days, counts = bar_store.day_counts(stock_code)
+        old_counts = entry['meta']['day_counts'] if entry is not None else {}
+        old_features = entry['features'] if entry is not None else pd.DataFrame()
+
+        changed = np.array([old_counts.get(int(d)) != int(n) for d, n in zip(days, counts)], dtype=bool)
+        # 다음 거래일 opening_gap 은 변경된 거래일 종가에 의존
+        changed[1:] |= changed[:-1]
+
+        new_features = pd.DataFrame()
+        if changed.any():
+            first = int(np.argmax(changed))
+            # 첫 재계산 거래일의 전일 종가가 필요하므로 하루 앞에서부터 로드
+            lo = max(first - 1, 0)
+            bars = bar_store.load(stock_code, (_day_str(days[lo]), _day_str(days[-1])))
+            new_features = compute_features(bars, kospi_df)[0]
+            if len(new_features):
+                recompute = {EPOCH + timedelta(days=int(d)) for d in days[changed]}
+                new_features = new_features[new_features['date'].isin(recompute)]
+
+        if len(old_features):
+            current = {EPOCH + timedelta(days=int(d)) for d in days[~changed]}
+            old_features = old_features[old_features['date'].isin(current)]
+            if len(old_features) and entry['meta']['kospi'] != kospi_fingerprint:
+                old_features = old_features.copy()
+                old_features['kospi_return_15'], old_features['kospi_volatility_15'] = kospi_lookup(
+                    old_features['date'].to_numpy(), kospi_df)
+        frames = [f for f in (old_features, new_features) if len(f)]
+        if frames:
+            features = pd.concat(frames, ignore_index=True)
+            features = features.sort_values('date', kind='stable').reset_index(drop=True)
+        else:
+            features = pd.DataFrame()
+
+        self._write(stock_code, {
+            'meta': {
+                'feature_version': FEATURE_VERSION,
+                'source': source,
+                'kospi': kospi_fingerprint,
+                'day_counts': {int(d): int(n) for d, n in zip(days, counts)},
+            },
+            'features': features,
+        })
+        return features, int(changed.sum())
+
+    def load(self, bar_store, stock_codes, kospi_df, kospi_fingerprint, date_range=None, verbose=True):
+        """여러 종목 갱신 후 (종목, 거래일) 순 Feature 반환"""
+        frames = []
+        recomputed = 0
+        for stock_code in sorted(stock_codes):
+            features, n_days = self.update(bar_store, stock_code, kospi_df, kospi_fingerprint)
+            recomputed += n_days
+            if len(features) == 0:
+                continue
+            if date_range is not None:
+                start, end = pd.to_datetime(date_range[0]).date(), pd.to_datetime(date_range[1]).date()
+                features = features[(features['date'] >= start) & (features['date'] <= end)]
+            frames.append(features)
+        if verbose:
+            print(f"Feature 증분 갱신: {len(stock_codes)} 종목, 재계산 {recomputed} 거래일")
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+
+def get_feature_store(data_path="minute_data"):
+    """data_path 별 전역 Feature 테이블 인스턴스 반환"""
+    store_dir = os.path.join(data_path, STORE_DIRNAME)
+    if store_dir not in _feature_stores:
+        _feature_stores[store_dir] = FeatureStore(store_dir)
+    return _feature_stores[store_dir]
+
+
+def update_directory(data_path="minute_data"):
+    """야간 배치: minute_data 전체 Feature 테이블 갱신"""
+    from core.gradual_rise_backtest import GradualRiseBacktest, KOSPI_PATH
+    backtest = GradualRiseBacktest(data_path, feature_store=get_feature_store(data_path))
+    csv_files = sorted(glob.glob(os.path.join(data_path, "*_1min.csv")))
+    backtest.store.ensure(csv_files)
+    backtest.feature_store.load(backtest.store, [code_from_path(f) for f in csv_files],
+                                backtest.load_kospi(), file_fingerprint(KOSPI_PATH))
+
+
+if __name__ == "__main__":
+    update_directory(sys.argv[1] if len(sys.argv) > 1 else "minute_data")
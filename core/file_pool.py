@@ -0,0 +1,50 @@
+"""
+File Pool - 파일 단위 독립 분석 스크립트용 프로세스 풀 드라이버
+
+종목 CSV 하나씩 처리하는 스크립트(backtest_gradual_riser*.py, analyze_gradual_risers.py)가
+같이 사용한다. 파일 목록을 정렬한 뒤 chunk 단위로 워커에 나눠 주고
+결과는 파일 순서대로 돌려주므로 워커 수와 관계없이 병합 결과가 같다.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from tqdm import tqdm
+
+CHUNKS_PER_WORKER = 4  # 워커당 chunk 수 (파일별 처리 시간 편차 흡수용)
+
+
+def default_workers():
+    """기본 워커 수 (CPU 수)"""
+    return os.cpu_count() or 1
+
+
+def map_files(fn, files, workers=None, desc="Processing files"):
+    """
+    files 각각에 fn 적용 (프로세스 풀, 결과는 정렬된 파일 순서)
+
+    Args:
+        fn: 모듈 최상위 함수 (워커로 pickle 전달)
+        workers: 워커 수 (None 이면 CPU 수, 1 이면 현재 프로세스에서 순차 실행)
+    Returns:
+        [(file, fn(file)), ...]
+    """
+    files = sorted(files)
+    workers = min(workers or default_workers(), max(len(files), 1))
+    if workers <= 1:
+        return [(f, fn(f)) for f in tqdm(files, desc=desc)]
+
+    chunksize = max(1, len(files) // (workers * CHUNKS_PER_WORKER))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(tqdm(executor.map(fn, files, chunksize=chunksize), total=len(files), desc=desc))
+    return list(zip(files, results))
+
+
+def merge_counts(total, part):
+    """워커별 카운터 dict 누적 (숫자는 합산, 리스트는 이어 붙임)"""
+    for key, value in part.items():
+        if isinstance(value, list):
+            total.setdefault(key, []).extend(value)
+        else:
+            total[key] = total.get(key, 0) + value
+    return total
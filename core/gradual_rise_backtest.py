@@ -2,8 +2,19 @@ import pandas as pd
 import numpy as np
 import os
 import glob
+import itertools
 from datetime import datetime, timedelta
 import warnings
+from data_collection.minute_store import (MinuteBarStore, default_store_path, code_from_path, read_minute_csv,
+                                          ordinal_dates, widen, resample_frame)
+from core.feature_engine import compute_features, sort_minute_bars, day_boundaries, MIN_DAY_BARS
+from core.feature_cache import file_fingerprint
+from core.feature_store import get_feature_store
+from core.orb_simulator import BarArray, EXIT_REASONS, find_entries, scan_exits, simulate_batch
+from core.streaming_metrics import OnlineMetrics
+from core.portfolio_backtest import PortfolioBacktest, portfolio_metrics, INITIAL_CAPITAL
+from data_collection.market_regime import KOSPI_PATH, get_market_regime
+from database.backtest_store import get_backtest_store
 warnings.filterwarnings('ignore')
 
 # === CONFIG: 주요 파라미터/구간/종목 수 조정 ===
@@ -21,6 +32,39 @@ DEFAULT_PARAMETERS = {
 # 테스트/최적화 구간
 TRAIN_RANGE = ('2024-11-01', '2024-11-30')
 TEST_RANGE = ('2025-06-01', '2025-06-30')
+STREAM_CHUNK_STOCKS = 50  # 스트리밍 모드에서 한 번에 메모리에 올리는 종목 수
+METRIC_COLUMNS = ['total_trades', 'win_rate', 'avg_return', 'std_return', 'sharpe_ratio', 'max_drawdown',
+                  'total_return', 'expectancy', 'best_trade', 'worst_trade']
+
+
+def _to_date(value):
+    return pd.to_datetime(value).date()
+
+
+def _contains(outer_range, date_range):
+    """outer_range 가 date_range 를 포함하면 True (outer_range 가 None 이면 False)"""
+    if outer_range is None:
+        return False
+    return _to_date(outer_range[0]) <= _to_date(date_range[0]) and _to_date(date_range[1]) <= _to_date(outer_range[1])
+
+
+def slice_features(features, date_range):
+    """Feature DataFrame 에서 기간 [start, end] 거래일만 선택"""
+    if len(features) == 0:
+        return features
+    start, end = _to_date(date_range[0]), _to_date(date_range[1])
+    dates = features['date']
+    return features[(dates >= start) & (dates <= end)].reset_index(drop=True)
+
+
+def expand_param_grid(param_grid):
+    """{'tp_pct': [0.05, 0.08], ...} -> 조합 dict 리스트 (리스트는 그대로 반환)"""
+    if isinstance(param_grid, dict):
+        keys = list(param_grid)
+        values = [v if isinstance(v, (list, tuple, np.ndarray)) else [v] for v in param_grid.values()]
+        return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+    return [dict(p) for p in param_grid]
+
 
 class GradualRiseBacktest:
     """
@@ -38,38 +82,54 @@ class GradualRiseBacktest:
     5. 기술적 지표 활용 (RSI, 볼린저 밴드, 모멘텀 등)
     """
     
-    def __init__(self, data_path="minute_data"):
+    def __init__(self, data_path="minute_data", store_path=None, use_store=True, feature_cache=None,
+                 feature_range=None, feature_store=None, cost_model=None):
         self.data_path = data_path
         self.results = []
         self.parameters = DEFAULT_PARAMETERS.copy()
+        # 컬럼형 1분봉 저장소 (최초 1회 CSV 변환 후 memory-map 으로 재사용)
+        self.use_store = use_store
+        self.store = MinuteBarStore(store_path or default_store_path(data_path))
+        # Feature 캐시 (None 이면 매번 계산, core/feature_cache.py)
+        self.feature_cache = feature_cache
+        # 지정하면 이 구간 Feature 를 한 번 계산해 두고 하위 기간은 잘라서 사용 (walk-forward)
+        self.feature_range = feature_range
+        # (종목, 거래일) Feature 테이블 증분 갱신 (None 이면 전체 재계산, core/feature_store.py)
+        self.feature_store = feature_store
+        # 체결가/거래비용 모델 (None 이면 슬리피지/수수료 0.1% 고정, core/cost_model.py)
+        self.cost_model = cost_model
+        # 마지막으로 로드한 Feature 의 bar_start/bar_end 가 가리키는 1분봉 연속 배열
+        self.bars = None
+    
+    def _select_files(self, stock_codes=None):
+        """대상 종목 1분봉 CSV 목록"""
+        csv_files = glob.glob(os.path.join(self.data_path, "*_1min.csv"))
+        if stock_codes:
+            csv_files = [f for f in csv_files if any(code in f for code in stock_codes)]
+        return csv_files
     
     def load_data(self, stock_codes=None, date_range=None):
-        """1분봉 데이터 로드 (기간 필터링 지원)"""
+        """1분봉 데이터 로드 (기간 필터링 지원, 컬럼형 저장소 우선, data_collection/minute_store.py 공용 스키마)"""
         print("데이터 로딩 중...")
         
         all_data = []
-        import pandas as pd
-        csv_files = glob.glob(os.path.join(self.data_path, "*_1min.csv"))
-        
-        if stock_codes:
-            csv_files = [f for f in csv_files if any(code in f for code in stock_codes)]
+        csv_files = self._select_files(stock_codes)
+        # 종목 카테고리를 맞춰야 concat 후에도 stock_code 가 category 로 유지됨
+        categories = sorted({code_from_path(f) for f in csv_files})
         
         for file_path in csv_files:
             try:
                 stock_code = os.path.basename(file_path).split('_')[0]
-                df = pd.read_csv(file_path)
-                df['stock_code'] = stock_code
-                df['datetime'] = pd.to_datetime(df['datetime'])
-                df['date'] = df['datetime'].dt.date
-                df['time'] = df['datetime'].dt.time
-                
-                # 거래일별로 정렬
-                df = df.sort_values(['date', 'time'])
-                
-                # 기간 필터링
-                if date_range is not None:
-                    start, end = date_range
-                    df = df[(df['date'] >= pd.to_datetime(start).date()) & (df['date'] <= pd.to_datetime(end).date())]
+                df = None
+                if self.use_store:
+                    try:
+                        # 없거나 CSV 가 바뀐 종목만 다시 변환, 나머지는 종목/기간 조건으로 바로 슬라이스
+                        self.store.ensure([file_path])
+                        df = self.store.load(stock_code, date_range, categories)
+                    except OSError as e:
+                        print(f"저장소 사용 불가, CSV 로드 - {file_path}: {e}")
+                if df is None:
+                    df = read_minute_csv(file_path, date_range, categories)
                 
                 all_data.append(df)
                 print(f"로드 완료: {stock_code} ({len(df)} rows)")
@@ -86,233 +146,108 @@ class GradualRiseBacktest:
         
         return self.data
     
-    def calculate_features(self, df):
-        """Feature Engineering (대폭 개선: 기술적 지표, 거래량 패턴, 시간대별 특성 등 추가)"""
-        import pandas as pd
-        import numpy as np
-        from scipy import stats
+    def load_bars(self, timeframe, stock_codes=None, date_range=None):
+        """N분봉 로드 (저장소에 미리 집계된 TIMEFRAMES 봉, 저장소를 못 쓰면 1분봉에서 집계)"""
+        all_data = []
+        csv_files = self._select_files(stock_codes)
+        categories = sorted({code_from_path(f) for f in csv_files})
         
-        # KOSPI 일별 데이터 로드
-        kospi_path = os.path.join('data_collection', 'market_data', 'KOSPI_daily.csv')
-        kospi_df = pd.read_csv(kospi_path)
-        kospi_df['date'] = pd.to_datetime(kospi_df['date']).dt.date
-        kospi_df = kospi_df.sort_values('date')
-        kospi_df['prev_close'] = kospi_df['close'].shift(1)
-        kospi_df['kospi_return'] = (kospi_df['close'] / kospi_df['prev_close']) - 1
-        kospi_df['kospi_volatility'] = (kospi_df['high'] - kospi_df['low']) / kospi_df['prev_close']
-        kospi_map = kospi_df.set_index('date')[['kospi_return', 'kospi_volatility']].to_dict('index')
-
-        # === opening_gap 계산을 위한 prev_close 컬럼 추가 ===
-        df = df.sort_values(['stock_code', 'date', 'time'])
-        df['prev_close'] = df.groupby('stock_code')['close'].shift(1)
-
-        features = []
-        
-        for (stock_code, date), day_df in df.groupby(['stock_code', 'date']):
-            if len(day_df) < 30:  # 최소 30분 데이터 필요
+        for file_path in csv_files:
+            stock_code = code_from_path(file_path)
+            try:
+                bars = None
+                if self.use_store:
+                    try:
+                        self.store.ensure([file_path])
+                        bars = self.store.load_bars(stock_code, timeframe, date_range, categories)
+                    except OSError as e:
+                        print(f"저장소 사용 불가, CSV 로드 - {file_path}: {e}")
+                if bars is None:
+                    df = read_minute_csv(file_path, date_range, categories)
+                    bars = resample_frame(df.dropna(subset=['open', 'high', 'low', 'close', 'volume']), timeframe)
+                all_data.append(bars)
+            except Exception as e:
+                print(f"에러 - {file_path}: {e}")
                 continue
-                
-            # 기본 정보
-            open_price = day_df.iloc[0]['open']
-            close_1min = day_df.iloc[0]['close']
-            prev_close = day_df.iloc[0]['prev_close']
-            if pd.notnull(prev_close) and prev_close != 0:
-                opening_gap = (open_price / prev_close) - 1
-            else:
-                opening_gap = 0
-            
-            # === 1. 기본 가격 Feature ===
-            r_1 = (close_1min / open_price) - 1  # 첫 1분 수익률
-            
-            if len(day_df) >= 15:
-                close_15min = day_df.iloc[14]['close']
-                cum_r_15 = (close_15min / open_price) - 1  # 15분 누적 수익률
-            else:
-                cum_r_15 = np.nan
-            
-            # === 2. 거래량 Feature (개선) ===
-            volume_15min = day_df.iloc[:15]['volume'].sum()
-            volume_5min = day_df.iloc[:5]['volume'].sum()
-            volume_10min = day_df.iloc[:10]['volume'].sum()
-            
-            # 거래량 이동평균
-            volume_sma_5 = day_df.iloc[:15]['volume'].rolling(5).mean().iloc[-1]
-            volume_sma_10 = day_df.iloc[:15]['volume'].rolling(10).mean().iloc[-1]
-            
-            # 거래량 비율 (전일 대비 추정)
-            v_ratio_15 = volume_15min / (volume_sma_10 * 15) if volume_sma_10 > 0 else 1
-            v_ratio_5 = volume_5min / (volume_sma_5 * 5) if volume_sma_5 > 0 else 1
-            
-            # === 3. 기술적 지표 (RSI, MACD, 볼린저 밴드 등) ===
-            if len(day_df) >= 15:
-                closes = day_df.iloc[:15]['close'].values
-                volumes = day_df.iloc[:15]['volume'].values
-                
-                # RSI (14기간)
-                if len(closes) >= 14:
-                    delta = np.diff(closes)
-                    gain = np.where(delta > 0, delta, 0)
-                    loss = np.where(delta < 0, -delta, 0)
-                    avg_gain = np.mean(gain[-14:])
-                    avg_loss = np.mean(loss[-14:])
-                    rs = avg_gain / avg_loss if avg_loss != 0 else 0
-                    rsi_15 = 100 - (100 / (1 + rs))
-                else:
-                    rsi_15 = np.nan
-                
-                # MACD (12, 26, 9)
-                if len(closes) >= 26:
-                    ema_12 = pd.Series(closes).ewm(span=12).mean().iloc[-1]
-                    ema_26 = pd.Series(closes).ewm(span=26).mean().iloc[-1]
-                    macd_line = ema_12 - ema_26
-                    macd_signal = pd.Series([macd_line]).ewm(span=9).mean().iloc[-1]
-                    macd_histogram = macd_line - macd_signal
-                else:
-                    macd_line = macd_signal = macd_histogram = np.nan
-                
-                # 볼린저 밴드 (20기간, 2표준편차)
-                if len(closes) >= 20:
-                    sma_20 = np.mean(closes[-20:])
-                    std_20 = np.std(closes[-20:])
-                    bb_upper = sma_20 + (2 * std_20)
-                    bb_lower = sma_20 - (2 * std_20)
-                    bb_position = (close_15min - bb_lower) / (bb_upper - bb_lower) if bb_upper != bb_lower else 0.5
-                    bb_width = (bb_upper - bb_lower) / sma_20
-                else:
-                    bb_position = bb_width = np.nan
-                
-                # 스토캐스틱 (14기간)
-                if len(closes) >= 14:
-                    high_14 = np.max(closes[-14:])
-                    low_14 = np.min(closes[-14:])
-                    k_percent = 100 * (close_15min - low_14) / (high_14 - low_14) if high_14 != low_14 else 50
-                    d_percent = k_percent  # 단순화
-                else:
-                    k_percent = d_percent = np.nan
-                
-                # 모멘텀 지표
-                momentum_5 = (close_15min / closes[-5]) - 1 if len(closes) >= 5 else np.nan
-                momentum_10 = (close_15min / closes[-10]) - 1 if len(closes) >= 10 else np.nan
-                
-                # 추세 강도
-                if len(closes) >= 10:
-                    x = np.arange(len(closes))
-                    slope, intercept, r_value, p_value, std_err = stats.linregress(x, closes)
-                    trend_strength = abs(r_value)
-                else:
-                    trend_strength = np.nan
-                
-            else:
-                rsi_15 = macd_line = macd_signal = macd_histogram = np.nan
-                bb_position = bb_width = k_percent = d_percent = np.nan
-                momentum_5 = momentum_10 = trend_strength = np.nan
-            
-            # === 4. 변동성/리스크 지표 ===
-            high_15min = day_df.iloc[:15]['high'].max()
-            low_15min = day_df.iloc[:15]['low'].min()
-            max_drawdown_15 = (low_15min / high_15min) - 1
-            volatility_15 = high_15min - low_15min
-            atr_15 = np.mean([high - low for high, low in zip(day_df.iloc[:15]['high'], day_df.iloc[:15]['low'])])
-            
-            # === 5. 시간대별 특성 ===
-            time_15min = day_df.iloc[14]['time']
-            time_minutes = time_15min.hour * 60 + time_15min.minute
-            
-            # 장 시작 시간대 (9:00-9:30)
-            is_opening = 1 if 540 <= time_minutes <= 570 else 0
-            # 점심 시간대 (11:30-13:00)
-            is_lunch = 1 if 690 <= time_minutes <= 780 else 0
-            # 장 마감 시간대 (15:00-15:30)
-            is_closing = 1 if 900 <= time_minutes <= 930 else 0
-            
-            # === 6. 가격 패턴 ===
-            if len(day_df) >= 15:
-                # Higher-Low Score
-                sma_5 = pd.Series(closes).rolling(5).mean().values
-                hl_score = np.sum(closes[4:] > sma_5[3:-1]) / 11 if len(sma_5) >= 11 else np.nan
-                
-                # VWAP Gap
-                vwap_15 = (day_df.iloc[:15]['close'] * day_df.iloc[:15]['volume']).sum() / volume_15min
-                vwap_gap = (close_15min - vwap_15) / vwap_15
-                
-                # 선형 회귀 기울기
-                x = np.arange(15)
-                y = day_df.iloc[:15]['close'].values
-                slope_15 = np.polyfit(x, y, 1)[0]
-            else:
-                hl_score = vwap_gap = opening_gap = slope_15 = np.nan
-            
-            # === 7. 시장상황 Feature ===
-            kospi_return_15 = 0
-            kospi_volatility_15 = 0
-            if date in kospi_map:
-                kospi_return_15 = kospi_map[date]['kospi_return']
-                kospi_volatility_15 = kospi_map[date]['kospi_volatility']
-            
-            # === 8. Feature 조합/상호작용 ===
-            price_volume_momentum = momentum_5 * v_ratio_5 if not np.isnan(momentum_5) and not np.isnan(v_ratio_5) else 0
-            rsi_volume_interaction = rsi_15 * v_ratio_15 if not np.isnan(rsi_15) and not np.isnan(v_ratio_15) else 0
-            bb_volume_interaction = bb_position * v_ratio_15 if not np.isnan(bb_position) and not np.isnan(v_ratio_15) else 0
-            
-            features.append({
-                'stock_code': stock_code,
-                'date': date,
-                'open_price': open_price,
-                
-                # 기본 가격
-                'r_1': r_1,
-                'cum_r_15': cum_r_15,
-                'opening_gap': opening_gap,
-                
-                # 거래량
-                'volume_15min': volume_15min,
-                'volume_5min': volume_5min,
-                'volume_10min': volume_10min,
-                'v_ratio_15': v_ratio_15,
-                'v_ratio_5': v_ratio_5,
-                'volume_sma_5': volume_sma_5,
-                'volume_sma_10': volume_sma_10,
-                
-                # 기술적 지표
-                'rsi_15': rsi_15,
-                'macd_line': macd_line,
-                'macd_signal': macd_signal,
-                'macd_histogram': macd_histogram,
-                'bb_position': bb_position,
-                'bb_width': bb_width,
-                'k_percent': k_percent,
-                'd_percent': d_percent,
-                'momentum_5': momentum_5,
-                'momentum_10': momentum_10,
-                'trend_strength': trend_strength,
-                
-                # 변동성/리스크
-                'max_drawdown_15': max_drawdown_15,
-                'volatility_15': volatility_15,
-                'atr_15': atr_15,
-                'slope_15': slope_15,
-                'hl_score': hl_score,
-                'vwap_gap': vwap_gap,
-                
-                # 시간대별
-                'is_opening': is_opening,
-                'is_lunch': is_lunch,
-                'is_closing': is_closing,
-                'time_minutes': time_minutes,
-                
-                # 시장상황
-                'kospi_return_15': kospi_return_15,
-                'kospi_volatility_15': kospi_volatility_15,
-                
-                # Feature 조합
-                'price_volume_momentum': price_volume_momentum,
-                'rsi_volume_interaction': rsi_volume_interaction,
-                'bb_volume_interaction': bb_volume_interaction,
-                
-                'day_data': day_df
-            })
         
-        return pd.DataFrame(features)
+        if not all_data:
+            raise ValueError("로드된 데이터가 없습니다.")
+        return pd.concat(all_data, ignore_index=True)
+    
+    def load_kospi(self):
+        """KOSPI 일별 수익률/변동성 (프로세스 전역 시장상황 배열, data_collection/market_regime.py)"""
+        regime = get_market_regime(KOSPI_PATH)
+        if regime is None:
+            raise FileNotFoundError(KOSPI_PATH)
+        return regime.frame
+    
+    def calculate_features(self, df):
+        """Feature Engineering (거래일 x 분 배열로 전체 거래일 일괄 계산, core/feature_engine.py)"""
+        # KOSPI 일별 데이터 로드
+        kospi_df = self.load_kospi()
+        
+        features, sorted_df, starts, ends = compute_features(df, kospi_df)
+        if len(features) == 0:
+            return features
+        
+        # ORB 진입/청산 시뮬레이션용 거래일 구간 (self.bars offset)
+        self.bars = BarArray.from_frame(sorted_df)
+        features['bar_start'] = starts
+        features['bar_end'] = ends
+        return features
+    
+    def calculate_features_incremental(self, stock_codes=None, date_range=None):
+        """Feature 테이블에서 새로 생기거나 바뀐 거래일만 계산하고 나머지는 저장된 값 사용"""
+        csv_files = self._select_files(stock_codes)
+        self.store.ensure(csv_files)
+        features = self.feature_store.load(self.store, [code_from_path(f) for f in csv_files],
+                                           self.load_kospi(), file_fingerprint(KOSPI_PATH), date_range)
+        if len(features) == 0:
+            return features
+        
+        # ORB 진입/청산 시뮬레이션용 거래일 구간 (봉은 저장소 memory-map 에서 로드)
+        data = self.load_data(stock_codes, date_range=date_range)
+        sorted_df, codes, dt_ns = sort_minute_bars(data)
+        starts, ends = day_boundaries(codes, dt_ns)
+        keep = (ends - starts) >= MIN_DAY_BARS
+        starts, ends = starts[keep], ends[keep]
+        days = pd.MultiIndex.from_arrays([sorted_df['stock_code'].to_numpy()[starts],
+                                          ordinal_dates(sorted_df['day'].to_numpy()[starts])])
+        pos = days.get_indexer(pd.MultiIndex.from_arrays([features['stock_code'], features['date']]))
+        if (pos < 0).any():
+            raise KeyError("Feature 거래일에 해당하는 1분봉이 없습니다.")
+        self.bars = BarArray.from_frame(sorted_df)
+        features['bar_start'] = starts[pos]
+        features['bar_end'] = ends[pos]
+        return features
+    
+    def load_features(self, stock_codes=None, date_range=None):
+        """Feature 로드 (캐시에 있으면 데이터 로드/계산 생략)"""
+        if date_range is not None and _contains(self.feature_range, date_range):
+            # 겹치는 기간끼리 전체 구간 Feature 공유 (거래일 단위라 기간별 계산과 동일, 구간 첫날 opening_gap 만 전일 기준)
+            return slice_features(self._load_features(stock_codes, self.feature_range), date_range)
+        return self._load_features(stock_codes, date_range)
+    
+    def _load_features(self, stock_codes=None, date_range=None):
+        key = None
+        if self.feature_cache is not None:
+            key = self.feature_cache.make_key(self._select_files(stock_codes), date_range, extra_files=[KOSPI_PATH])
+            cached = self.feature_cache.get(key)
+            if cached is not None:
+                features, self.bars = cached
+                return features
+        
+        features = self._compute_features(stock_codes, date_range)
+        if key is not None:
+            self.feature_cache.put(key, (features, self.bars))
+        return features
+    
+    def _compute_features(self, stock_codes=None, date_range=None):
+        """Feature 계산 (Feature 테이블이 있으면 증분, 없으면 1분봉 로드 후 전체 계산)"""
+        if self.feature_store is not None and self.use_store:
+            return self.calculate_features_incremental(stock_codes, date_range)
+        data = self.load_data(stock_codes, date_range=date_range)
+        return self.calculate_features(data)
     
     def apply_filters(self, features_df):
         """패턴 필터 적용 (대폭 개선: 새로운 feature 활용, 동적 파라미터)"""
@@ -454,108 +389,120 @@ class GradualRiseBacktest:
         
         return filtered
     
+    def filter_mask_matrix(self, features_df, param_sets):
+        """
+        apply_filters 조건을 여러 파라미터 세트에 대해 한 번에 평가
+
+        Returns:
+            (거래일 수 x 파라미터 세트 수) bool 행렬. 각 열은 해당 세트로 apply_filters 를
+            실행했을 때 남는 거래일과 같다.
+        """
+        n_sets = len(param_sets)
+
+        def col(name):
+            return features_df[name].to_numpy(dtype=np.float64)[:, None]
+
+        def thr(key, default=np.nan):
+            return np.array([p.get(key, default) for p in param_sets], dtype=np.float64)[None, :]
+
+        def has(*keys):
+            return np.array([all(k in p for k in keys) for p in param_sets])[None, :]
+
+        mask = np.ones((len(features_df), n_sets), dtype=bool)
+        with np.errstate(invalid='ignore'):
+            # === 1. 기본 필터 ===
+            mask &= ~(col('r_1') >= thr('theta_spike'))
+            mask &= col('r_1') >= thr('theta_spike_low')
+            mask &= col('cum_r_15') >= thr('theta_15m')
+            mask &= col('max_drawdown_15') >= -thr('theta_pull')
+
+            # === 2. 거래량 필터 (키가 없으면 생략) ===
+            mask &= (col('v_ratio_15') >= thr('theta_vol')) | ~has('theta_vol')
+            mask &= (col('v_ratio_15') >= thr('volume_ratio_min')) | ~has('volume_ratio_min')
+
+            # === 3. 기술적 지표 필터 (키가 없으면 기본 범위) ===
+            rsi_set = has('rsi_min', 'rsi_max')
+            rsi_min = np.where(rsi_set, thr('rsi_min'), 20)
+            rsi_max = np.where(rsi_set, thr('rsi_max'), 80)
+            mask &= (col('rsi_15') >= rsi_min) & (col('rsi_15') <= rsi_max)
+            bb_set = has('bb_position_min', 'bb_position_max')
+            bb_min = np.where(bb_set, thr('bb_position_min'), 0.1)
+            bb_max = np.where(bb_set, thr('bb_position_max'), 0.9)
+            mask &= (col('bb_position') >= bb_min) & (col('bb_position') <= bb_max)
+            mask &= col('momentum_5') > thr('momentum_threshold', 0)
+
+            # === 4. 시간대별 필터 ===
+            time_score = (col('is_opening') * thr('time_opening_weight') +
+                          col('is_lunch') * thr('time_lunch_weight', 0.5) +
+                          col('is_closing') * thr('time_closing_weight', 0.5))
+            mask &= np.where(has('time_opening_weight'), time_score > 0.5, col('is_opening') == 1)
+
+            # === 5. 시장상황 필터 ===
+            mask &= col('kospi_return_15') > thr('kospi_return_min', -0.02)
+            mask &= (col('kospi_volatility_15') < thr('kospi_volatility_max')) | ~has('kospi_volatility_max')
+
+            # === 6. Feature 조합 필터 ===
+            mask &= col('price_volume_momentum') > thr('price_volume_momentum_threshold', 0)
+            mask &= col('rsi_volume_interaction') > thr('rsi_volume_interaction_threshold', 0)
+            mask &= ((col('bb_volume_interaction') > thr('bb_volume_interaction_threshold')) |
+                     ~has('bb_volume_interaction_threshold'))
+        return mask
+
     def find_orb_entries(self, filtered_df):
-        """ORB 진입점 찾기"""
-        entries = []
-        
-        for _, row in filtered_df.iterrows():
-            day_df = row['day_data']
-            
-            # ORB High 계산 (첫 5분 고가)
-            orb_high = day_df.iloc[:self.parameters['orb_delay_min']]['high'].max()
-            
-            # ORB 돌파 지점 찾기 (5분 이후 ~ 30분)
-            entry_window = day_df.iloc[self.parameters['orb_delay_min']:self.parameters['orb_max_min']]
-            
-            for idx, bar in entry_window.iterrows():
-                if bar['high'] > orb_high:
-                    # 진입가: 다음 봉 시가 (보수적)
-                    entry_price = bar['open']
-                    entry_time = bar['datetime']
-                    
-                    # TP/SL 계산
-                    tp_price = entry_price * (1 + self.parameters['tp_pct'])
-                    sl_price = entry_price * (1 - self.parameters['sl_pct'])
-                    
-                    entries.append({
-                        'stock_code': row['stock_code'],
-                        'date': row['date'],
-                        'entry_time': entry_time,
-                        'entry_price': entry_price,
-                        'tp_price': tp_price,
-                        'sl_price': sl_price,
-                        'orb_high': orb_high,
-                        'features': row
-                    })
-                    break  # 첫 번째 돌파에서 진입
-        
-        return pd.DataFrame(entries)
-    
+        """ORB 진입점 찾기 (거래일 x 분 행렬에서 첫 돌파 위치 일괄 탐색)"""
+        if len(filtered_df) == 0:
+            return pd.DataFrame([])
+
+        bars = self.bars.day_bars(filtered_df['bar_start'].to_numpy(), filtered_df['bar_end'].to_numpy())
+        # ORB High = 첫 orb_delay_min 분 고가, orb_delay_min ~ orb_max_min 구간 첫 돌파 봉 시가에 진입
+        entry_pos, orb_high = find_entries(bars, np.arange(len(filtered_df)),
+                                           self.parameters['orb_delay_min'], self.parameters['orb_max_min'])
+        hit = np.flatnonzero(entry_pos >= 0)
+        if len(hit) == 0:
+            return pd.DataFrame([])
+
+        entry_price = widen(bars.open[hit, entry_pos[hit]])
+        return pd.DataFrame({
+            'stock_code': filtered_df['stock_code'].to_numpy()[hit],
+            'date': filtered_df['date'].to_numpy()[hit],
+            'entry_time': bars.dt_ns[hit, entry_pos[hit]].astype('datetime64[ns]'),
+            'entry_price': entry_price,
+            'tp_price': entry_price * (1 + self.parameters['tp_pct']),
+            'sl_price': entry_price * (1 - self.parameters['sl_pct']),
+            'orb_high': widen(orb_high[hit]),
+            'bar_start': filtered_df['bar_start'].to_numpy()[hit],
+            'bar_end': filtered_df['bar_end'].to_numpy()[hit],
+        })
+
     def simulate_trades(self, entries_df):
-        """거래 시뮬레이션 (수수료/슬리피지 반영)"""
-        trades = []
-        commission = 0.001  # 0.1%
-        slippage = 0.001    # 0.1%
-        
-        for _, entry in entries_df.iterrows():
-            stock_code = entry['stock_code']
-            date = entry['date']
-            entry_time = entry['entry_time']
-            
-            # 해당 일의 데이터 가져오기
-            day_data = entry['features']['day_data']
-            
-            # 진입 시점 이후 데이터
-            entry_idx = day_data[day_data['datetime'] >= entry_time].index[0]
-            remaining_data = day_data.loc[entry_idx:]
-            
-            # 진입/청산가에 슬리피지 반영
-            entry_price = entry['entry_price'] * (1 + slippage)
-            tp_price = entry['tp_price'] * (1 - slippage)
-            sl_price = entry['sl_price'] * (1 - slippage)
-            
-            # 청산 조건 확인
-            exit_price = None
-            exit_time = None
-            exit_reason = None
-            
-            for _, bar in remaining_data.iterrows():
-                # TP 도달
-                if bar['high'] >= tp_price:
-                    exit_price = tp_price
-                    exit_time = bar['datetime']
-                    exit_reason = 'TP'
-                    break
-                
-                # SL 도달
-                if bar['low'] <= sl_price:
-                    exit_price = sl_price
-                    exit_time = bar['datetime']
-                    exit_reason = 'SL'
-                    break
-            
-            # 종가 청산 (TP/SL 미도달)
-            if exit_price is None:
-                exit_price = remaining_data.iloc[-1]['close'] * (1 - slippage)
-                exit_time = remaining_data.iloc[-1]['datetime']
-                exit_reason = 'Close'
-            
-            # 수수료 반영 (진입+청산)
-            pnl = (exit_price / entry_price) - 1 - 2 * commission
-            
-            trades.append({
-                'stock_code': stock_code,
-                'date': date,
-                'entry_time': entry_time,
-                'exit_time': exit_time,
-                'entry_price': entry_price,
-                'exit_price': exit_price,
-                'pnl': pnl,
-                'exit_reason': exit_reason
-            })
-        
-        return pd.DataFrame(trades)
-    
+        """거래 시뮬레이션 (수수료/슬리피지 반영, self.cost_model)"""
+        if len(entries_df) == 0:
+            return pd.DataFrame([])
+
+        bars = self.bars.day_bars(entries_df['bar_start'].to_numpy(), entries_df['bar_end'].to_numpy())
+        rows = np.arange(len(entries_df))
+
+        # 진입 시점(entry_time) 이후 첫 봉부터 청산 조건 확인
+        entry_ns = entries_df['entry_time'].values.astype('datetime64[ns]').astype(np.int64)
+        entry_pos = ((bars.dt_ns < entry_ns[:, None]) & bars.valid).sum(axis=1)
+
+        result = scan_exits(bars, rows, entry_pos,
+                            entries_df['entry_price'].to_numpy(),
+                            entries_df['tp_price'].to_numpy(),
+                            entries_df['sl_price'].to_numpy(),
+                            cost_model=self.cost_model)
+
+        return pd.DataFrame({
+            'stock_code': entries_df['stock_code'].to_numpy(),
+            'date': entries_df['date'].to_numpy(),
+            'entry_time': entries_df['entry_time'].to_numpy(),
+            'exit_time': bars.dt_ns[rows, result['exit_pos']].astype('datetime64[ns]'),
+            'entry_price': result['entry_price'],
+            'exit_price': result['exit_price'],
+            'pnl': result['pnl'],
+            'exit_reason': EXIT_REASONS[result['exit_code']],
+        })
+
     def calculate_metrics(self, trades_df):
         """성과 지표 계산"""
         if len(trades_df) == 0:
@@ -580,12 +527,10 @@ class GradualRiseBacktest:
         """전체 백테스트 실행 (기간 필터링 지원)"""
         if verbose:
             print("=== 완만 상승 패턴 백테스트 시작 ===")
-        # 1. 데이터 로드
-        data = self.load_data(stock_codes, date_range=date_range)
-        # 2. Feature 계산
+        # 1-2. 데이터 로드 + Feature 계산 (캐시 재사용)
         if verbose:
             print("\nFeature 계산 중...")
-        features = self.calculate_features(data)
+        features = self.load_features(stock_codes, date_range=date_range)
         if verbose:
             print(f"Feature 계산 완료: {len(features)} 일")
         # 3. 필터 적용
@@ -618,28 +563,145 @@ class GradualRiseBacktest:
             print("[경고] 거래 수가 30건 미만입니다. 파라미터/기간/종목 수를 확장하거나 조건을 완화하세요.")
         return metrics, trades
     
-    def run_train_test_split(self, stock_codes=None, train_range=None, test_range=None):
+    def run_portfolio_backtest(self, stock_codes=None, date_range=None, initial_capital=INITIAL_CAPITAL,
+                               risk=None, verbose=True):
+        """
+        자본/보유 종목 수 제한 포트폴리오 백테스트 (core/portfolio_backtest.py)
+
+        Args:
+            risk: RISK_MANAGEMENT 형식 dict (None 이면 실시간 매매 설정)
+        Returns:
+            (metrics, trades_df, equity_df)
+        """
+        features = self.load_features(stock_codes, date_range=date_range)
+        entries = self.find_orb_entries(self.apply_filters(features)) if len(features) else pd.DataFrame([])
+        if len(entries) == 0:
+            trades, equity = pd.DataFrame([]), pd.DataFrame(columns=['datetime', 'cash', 'market_value', 'equity'])
+        else:
+            trades, equity = PortfolioBacktest(self.bars, initial_capital, risk, self.cost_model).run(entries)
+        metrics = portfolio_metrics(trades, equity, initial_capital)
+        if verbose:
+            print("\n=== 포트폴리오 백테스트 결과 ===")
+            if not metrics:
+                print("거래가 없습니다.")
+            else:
+                print(f"진입 후보: {metrics['candidates']} 건 (체결 {metrics['total_trades']}, 거절 {metrics['rejected']})")
+                print(f"최종 자산: {metrics['final_equity']:,.0f}원 (수익률 {metrics['total_return']:.2%})")
+                print(f"최대 낙폭: {metrics['max_drawdown']:.2%}")
+        return metrics, trades, equity
+
+    def iter_trades(self, stock_codes=None, date_range=None, chunk_size=STREAM_CHUNK_STOCKS):
+        """
+        종목 chunk 단위 스트리밍 백테스트 (로드 -> Feature -> 필터 -> 진입 -> 거래)
+
+        chunk 하나의 1분봉/Feature 만 메모리에 두고 거래 DataFrame 을 차례로 반환한다.
+        종목코드 순으로 진행하므로 이어 붙이면 run_backtest 의 거래 순서와 같다.
+        """
+        codes = sorted({code_from_path(f) for f in self._select_files(stock_codes)})
+        for i in range(0, len(codes), chunk_size):
+            chunk = codes[i:i + chunk_size]
+            try:
+                features = self._compute_features(chunk, date_range)
+            except ValueError as e:
+                # 기간 내 데이터가 없는 chunk
+                print(f"chunk 건너뜀 {chunk[0]}~{chunk[-1]}: {e}")
+                continue
+            trades = self.simulate_trades(self.find_orb_entries(self.apply_filters(features)))
+            # 다음 chunk 로드 전에 이번 chunk 1분봉 해제
+            self.data = self.bars = None
+            yield trades
+
+    def run_backtest_streaming(self, stock_codes=None, date_range=None, chunk_size=STREAM_CHUNK_STOCKS,
+                               trades_path=None, verbose=True):
+        """
+        전체 종목 유니버스용 스트리밍 백테스트 (메모리는 chunk 크기로 제한)
+
+        Args:
+            trades_path: 지정하면 거래 내역을 chunk 마다 CSV 에 이어 쓴다 (전체 거래는 메모리에 두지 않음)
+        Returns:
+            성과 지표 dict (run_backtest 와 같은 키)
+        """
+        if verbose:
+            print(f"=== 스트리밍 백테스트 시작 (chunk {chunk_size} 종목) ===")
+        online = OnlineMetrics()
+        first = True
+        for trades in self.iter_trades(stock_codes, date_range, chunk_size):
+            online.update(trades)
+            if trades_path is not None and len(trades) > 0:
+                trades.to_csv(trades_path, mode='w' if first else 'a', header=first, index=False)
+                first = False
+            if verbose:
+                print(f"누적 거래: {online.count} 건")
+        metrics = online.result()
+        if verbose:
+            self.print_results(metrics, monthly_perf=online.monthly_pnl())
+        if online.count < 30:
+            print("[경고] 거래 수가 30건 미만입니다. 파라미터/기간/종목 수를 확장하거나 조건을 완화하세요.")
+        return metrics
+
+    def run_backtest_batch(self, param_grid, stock_codes=None, date_range=None, verbose=True):
+        """
+        여러 파라미터 세트를 한 번의 데이터 로드/Feature 계산으로 평가
+
+        Args:
+            param_grid: 파라미터 dict 리스트, 또는 {파라미터: 후보값 리스트} (전체 조합)
+                        각 세트는 self.parameters 에 덮어써서 사용
+        Returns:
+            파라미터 세트별 성과 지표 DataFrame (grid 파라미터 + signals + METRIC_COLUMNS)
+        """
+        overrides = expand_param_grid(param_grid)
+        param_sets = [{**self.parameters, **p} for p in overrides]
+        if verbose:
+            print(f"=== 배치 백테스트 시작: {len(param_sets)} 개 파라미터 세트 ===")
+
+        features = self.load_features(stock_codes, date_range=date_range)
+        if len(features) == 0:
+            masks = np.zeros((0, len(param_sets)), dtype=bool)
+            results = [{'pnl': np.zeros(0)} for _ in param_sets]
+        else:
+            masks = self.filter_mask_matrix(features, param_sets)
+            bars = self.bars.day_bars(features['bar_start'].to_numpy(), features['bar_end'].to_numpy())
+            rows = [np.flatnonzero(masks[:, j]) for j in range(len(param_sets))]
+            results = simulate_batch(bars, rows, param_sets, cost_model=self.cost_model)
+
+        records = []
+        for params, signals, result in zip(overrides, masks.sum(axis=0), results):
+            metrics = self.calculate_metrics(pd.DataFrame({'pnl': result['pnl']}))
+            record = dict(params)
+            record['signals'] = int(signals)
+            record.update({k: metrics.get(k, np.nan) for k in METRIC_COLUMNS})
+            record['total_trades'] = metrics.get('total_trades', 0)
+            records.append(record)
+        table = pd.DataFrame(records)
+        if verbose:
+            print(f"배치 백테스트 완료: Feature {len(features)} 일, 거래 발생 세트 {(table['total_trades'] > 0).sum()} 개")
+        return table
+
+    def run_train_test_split(self, stock_codes=None, train_range=None, test_range=None, verbose=True):
         """train/test 분리 백테스트 (과적합 방지)"""
-        print("\n=== [Train/Test Split] 백테스트 ===")
-        print(f"Train: {train_range}, Test: {test_range}")
-        print("[Train] 최적화 구간 결과:")
-        train_metrics, train_trades = self.run_backtest(stock_codes, train_range)
-        print("\n[Test] 검증 구간 결과:")
-        test_metrics, test_trades = self.run_backtest(stock_codes, test_range)
-        print("\n[비교] Train/Test 주요 지표:")
-        for k in ['total_trades','win_rate','avg_return','sharpe_ratio','total_return']:
-            tval = train_metrics.get(k, None)
-            sval = test_metrics.get(k, None)
-            print(f"{k}: Train={tval}, Test={sval}")
+        if verbose:
+            print("\n=== [Train/Test Split] 백테스트 ===")
+            print(f"Train: {train_range}, Test: {test_range}")
+            print("[Train] 최적화 구간 결과:")
+        train_metrics, train_trades = self.run_backtest(stock_codes, train_range, verbose=verbose)
+        if verbose:
+            print("\n[Test] 검증 구간 결과:")
+        test_metrics, test_trades = self.run_backtest(stock_codes, test_range, verbose=verbose)
+        if verbose:
+            print("\n[비교] Train/Test 주요 지표:")
+            for k in ['total_trades','win_rate','avg_return','sharpe_ratio','total_return']:
+                tval = train_metrics.get(k, None)
+                sval = test_metrics.get(k, None)
+                print(f"{k}: Train={tval}, Test={sval}")
         return (train_metrics, train_trades), (test_metrics, test_trades)
     
-    def print_results(self, metrics, trades_df):
-        """결과 출력"""
+    def print_results(self, metrics, trades_df=None, monthly_perf=None):
+        """결과 출력 (스트리밍 모드는 trades_df 대신 누적 월별 손익 monthly_perf 사용)"""
         print("\n" + "="*50)
         print("백테스트 결과")
         print("="*50)
         
-        if len(trades_df) == 0:
+        if not metrics:
             print("거래가 없습니다.")
             return
         
@@ -654,26 +716,27 @@ class GradualRiseBacktest:
         print(f"최저 수익: {metrics['worst_trade']:.2%}")
         
         # 월별 성과
-        if len(trades_df) > 0:
+        if monthly_perf is None and trades_df is not None and len(trades_df) > 0:
             trades_df['date'] = pd.to_datetime(trades_df['date'])
             trades_df['month'] = trades_df['date'].dt.to_period('M')
             monthly_perf = trades_df.groupby('month')['pnl'].sum()
+        if monthly_perf is not None:
             print(f"\n월별 성과:")
             for month, pnl in monthly_perf.items():
                 print(f"  {month}: {pnl:.2%}")
 
 def main():
     """메인 실행 함수"""
-    # 백테스트 인스턴스 생성
-    backtest = GradualRiseBacktest()
+    # 백테스트 인스턴스 생성 (Feature 는 새로 추가된 거래일만 계산)
+    backtest = GradualRiseBacktest(feature_store=get_feature_store())
     # 파라미터 설정 (필요시 조정)
     # backtest.parameters.update({...})  # config에서 조정
     # 백테스트 실행
     metrics, trades = backtest.run_backtest()
-    # 결과 저장
+    # 결과 저장 (database/backtest_results.db, analysis_visualizer.py 에서 조회)
     if len(trades) > 0:
-        trades.to_csv('gradual_rise_trades.csv', index=False)
-        print(f"\n거래 내역이 'gradual_rise_trades.csv'에 저장되었습니다.")
+        run_id = get_backtest_store().save_run(trades, metrics, backtest.parameters, strategy='gradual_rise')
+        print(f"\n거래 내역이 백테스트 결과 저장소에 저장되었습니다. (run {run_id})")
     # train/test 분리 예시 실행 (주석 해제시 동작)
     # backtest.run_train_test_split(stock_codes=None, train_range=TRAIN_RANGE, test_range=TEST_RANGE)
 
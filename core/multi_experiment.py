@@ -2,6 +2,7 @@ import random
 import glob
 import os
 import pandas as pd
+from datetime import datetime
 from parameter_optimizer import ParameterOptimizer
 
 # === CONFIG ===
@@ -11,6 +12,7 @@ N_STOCKS = 30      # 한 번에 사용할 전체 종목 수
 N_TRIALS = 50      # Optuna trial 수(실험 속도 고려)
 TRAIN_RANGE = ('2024-01-01', '2024-12-31')
 TEST_RANGE = ('2025-06-01', '2025-06-30')
+EXPERIMENT = f"multi_experiment_{datetime.now():%Y%m%d_%H%M%S}"  # 백테스트 결과 저장소 실험 이름
 
 # 종목 pool 준비
 glob_path = os.path.join('minute_data', '*_1min.csv')
@@ -32,11 +34,11 @@ for exp in range(N_EXPERIMENTS):
     # 최적화 (train set)
     optimizer = ParameterOptimizer()
     optimizer.data_path = 'minute_data'
-    # train set만 사용하도록 objective 함수 임시 patch
-    orig_objective = optimizer.objective
-    def patched_objective(trial):
-        # train set만 사용
-        params = {
+    # train set만 사용하도록 종목/탐색 범위/목표 함수 임시 patch (trial 은 배치로 평가)
+    optimizer.stock_codes = train_codes
+    optimizer.date_range = TRAIN_RANGE
+    def patched_suggest_params(trial):
+        return {
             'theta_spike': trial.suggest_float('theta_spike', 0.0, 0.20, step=0.002),
             'theta_spike_low': trial.suggest_float('theta_spike_low', 0.0, 0.10, step=0.001),
             'theta_15m': trial.suggest_float('theta_15m', 0.0, 0.15, step=0.002),
@@ -47,35 +49,37 @@ for exp in range(N_EXPERIMENTS):
             'orb_delay_min': trial.suggest_int('orb_delay_min', 2, 20),
             'orb_max_min': trial.suggest_int('orb_max_min', 10, 60)
         }
-        try:
-            from core.gradual_rise_backtest import GradualRiseBacktest
-            backtest = GradualRiseBacktest(optimizer.data_path)
-            backtest.parameters.update(params)
-            metrics, trades = backtest.run_backtest(stock_codes=train_codes, date_range=TRAIN_RANGE, verbose=False)
-            if len(trades) == 0:
-                return -2000
-            sharpe = metrics['sharpe_ratio']
-            win_rate = metrics['win_rate']
-            total_return = metrics['total_return']
-            objective_value = sharpe * 0.4 + win_rate * 0.3 + total_return * 0.3
-            if len(trades) < 10:
-                objective_value *= 0.2
-            return objective_value
-        except Exception as e:
-            print(f"Trial 에러: {e}")
+    def patched_score(metrics):
+        n_trades = metrics.get('total_trades', 0)
+        if n_trades == 0:
             return -2000
-    optimizer.objective = patched_objective
+        sharpe = metrics['sharpe_ratio']
+        win_rate = metrics['win_rate']
+        total_return = metrics['total_return']
+        objective_value = sharpe * 0.4 + win_rate * 0.3 + total_return * 0.3
+        if n_trades < 10:
+            objective_value *= 0.2
+        return objective_value
+    optimizer.suggest_params = patched_suggest_params
+    optimizer.score = patched_score
     best_params = optimizer.optimize(n_trials=N_TRIALS)
 
     # 검증 (test set)
     from core.gradual_rise_backtest import GradualRiseBacktest
-    backtest = GradualRiseBacktest('minute_data')
+    from core.feature_cache import get_feature_cache
+    from core.feature_store import get_feature_store
+    from database.backtest_store import get_backtest_store
+    backtest = GradualRiseBacktest('minute_data', feature_cache=get_feature_cache('minute_data'),
+                                   feature_store=get_feature_store('minute_data'))
     backtest.parameters.update(best_params)
     test_metrics, test_trades = backtest.run_backtest(stock_codes=test_codes, date_range=TEST_RANGE, verbose=False)
+    run_id = get_backtest_store().save_run(test_trades, test_metrics, backtest.parameters, experiment=EXPERIMENT,
+                                           date_range=TEST_RANGE)
 
     # 결과 기록
     result = {
         'exp': exp+1,
+        'run_id': run_id,
         'train_codes': train_codes,
         'test_codes': test_codes,
         'best_params': best_params,
@@ -88,9 +92,9 @@ for exp in range(N_EXPERIMENTS):
     results.append(result)
     print(f"[실험 {exp+1}] Test 성과: {test_metrics}")
 
-# 전체 결과 DataFrame/CSV 저장
+# 전체 결과 요약 (실험별 거래/지표는 백테스트 결과 저장소에 EXPERIMENT 로 저장됨)
 results_df = pd.DataFrame(results)
-results_df.to_csv('multi_experiment_results.csv', index=False)
+print(f"\n실험 결과가 백테스트 결과 저장소에 저장되었습니다. (experiment '{EXPERIMENT}')")
 print("\n=== 전체 실험 결과 요약 ===")
 print(results_df[['exp','test_total_trades','test_win_rate','test_avg_return','test_sharpe_ratio','test_total_return']])
 print("\n평균 Test 성과:")
@@ -0,0 +1,217 @@
+"""
+ORB Simulator - 배열 기반 ORB 진입/청산 시뮬레이션
+
+find_orb_entries/simulate_trades 의 iterrows 이중 루프를 대체한다.
+거래일별 OHLC 를 (거래일 x 분) 행렬로 만든 뒤
+1) ORB 구간 첫 고가 돌파 위치, 2) 진입 이후 첫 TP/SL 도달 위치를
+마스크 argmax 로 모든 거래일에 대해 한 번에 찾는다.
+여러 파라미터 조합을 한 번의 Feature 계산으로 평가할 수 있도록 batch 실행을 지원한다.
+"""
+
+import numpy as np
+import pandas as pd
+
+from core.cost_model import COMMISSION, SLIPPAGE, EXIT_TP, EXIT_SL, EXIT_CLOSE, FlatCostModel
+
+EXIT_REASONS = np.array(['TP', 'SL', 'Close'], dtype=object)
+
+
+class DayBars:
+    """거래일 x 분 OHLC(+거래량) 행렬 (짧은 거래일은 valid=False 로 채움)"""
+
+    def __init__(self, open_, high, low, close, dt_ns, starts, ends, volume=None):
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        self.lengths = ends - starts
+        width = int(self.lengths.max()) if len(starts) else 0
+        cols = np.arange(width)
+        self.valid = cols[None, :] < self.lengths[:, None]
+        idx = np.where(self.valid, starts[:, None] + cols[None, :], 0)
+        self.open = np.asarray(open_)[idx]
+        self.high = np.asarray(high)[idx]
+        self.low = np.asarray(low)[idx]
+        self.close = np.asarray(close)[idx]
+        self.dt_ns = np.asarray(dt_ns)[idx]
+        self.volume = np.asarray(volume)[idx] if volume is not None else None
+
+    @classmethod
+    def from_frame(cls, df, starts, ends):
+        """정렬된 1분봉 DataFrame + 거래일 구간"""
+        return BarArray.from_frame(df).day_bars(starts, ends)
+
+
+class BarArray:
+    """
+    (종목, 시간) 순 정렬된 1분봉 연속 배열
+
+    Feature row 는 거래일 DataFrame 대신 이 배열의 [bar_start, bar_end) offset 만 가진다.
+    """
+
+    def __init__(self, open_, high, low, close, dt_ns, volume=None):
+        self.open = np.asarray(open_)
+        self.high = np.asarray(high)
+        self.low = np.asarray(low)
+        self.close = np.asarray(close)
+        self.dt_ns = np.asarray(dt_ns, dtype=np.int64)
+        self.volume = np.asarray(volume) if volume is not None else None
+
+    def __len__(self):
+        return len(self.dt_ns)
+
+    @classmethod
+    def from_frame(cls, df):
+        """정렬된 1분봉 DataFrame"""
+        dt_ns = df['datetime'].values.astype('datetime64[ns]').astype(np.int64)
+        volume = df['volume'].to_numpy() if 'volume' in df else None
+        return cls(df['open'].to_numpy(), df['high'].to_numpy(), df['low'].to_numpy(),
+                   df['close'].to_numpy(), dt_ns, volume)
+
+    def day_bars(self, starts, ends):
+        """offset 구간 -> 거래일 x 분 행렬"""
+        return DayBars(self.open, self.high, self.low, self.close, self.dt_ns, starts, ends, self.volume)
+
+
+def _first_true(mask):
+    """행별 첫 True 위치 (없으면 -1)"""
+    if mask.shape[1] == 0:
+        return np.full(mask.shape[0], -1, dtype=np.int64)
+    pos = mask.argmax(axis=1)
+    return np.where(mask[np.arange(mask.shape[0]), pos], pos, -1)
+
+
+def find_entries(bars, rows, orb_delay_min, orb_max_min):
+    """
+    ORB 진입 위치 탐색
+
+    Returns:
+        entry_pos: 거래일 내 진입 봉 위치 (-1 이면 진입 없음)
+        orb_high: 첫 orb_delay_min 분 고가
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    high = bars.high[rows]
+    valid = bars.valid[rows]
+    if orb_delay_min <= 0 or high.shape[1] == 0:
+        # 빈 ORB 구간의 고가는 NaN -> 돌파 없음
+        return np.full(len(rows), -1, dtype=np.int64), np.full(len(rows), np.nan)
+
+    lowest = -np.inf if high.dtype.kind == 'f' else np.iinfo(high.dtype).min
+    orb_high = np.where(valid[:, :orb_delay_min], high[:, :orb_delay_min], lowest).max(axis=1)
+    window = (high[:, orb_delay_min:orb_max_min] > orb_high[:, None]) & valid[:, orb_delay_min:orb_max_min]
+    pos = _first_true(window)
+    entry_pos = np.where(pos >= 0, pos + orb_delay_min, -1)
+    return entry_pos, orb_high
+
+
+def scan_exits(bars, rows, entry_pos, raw_entry, raw_tp, raw_sl, slippage=SLIPPAGE, commission=COMMISSION,
+               cost_model=None):
+    """
+    진입 봉부터 첫 TP/SL 도달 위치 탐색 (같은 봉이면 TP 우선, 미도달 시 종가 청산)
+
+    Args:
+        rows/entry_pos: 진입한 거래일 index 와 진입 봉 위치
+        raw_entry/raw_tp/raw_sl: 슬리피지 반영 전 진입가/익절가/손절가
+        cost_model: core/cost_model.py 모델 (None 이면 slippage/commission 고정 비율)
+    Returns:
+        dict of arrays: exit_pos, entry_price, exit_price, exit_code, pnl
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    n = len(rows)
+    if cost_model is None:
+        cost_model = FlatCostModel(slippage, commission)
+
+    # 진입 체결가, 봉 고가/저가와 비교할 익절/손절 기준가
+    entry_volume = bars.volume[rows, entry_pos] if bars.volume is not None and n else None
+    entry_price = cost_model.entry_fill(raw_entry, entry_volume)
+    tp_price, sl_price = cost_model.exit_levels(raw_tp, raw_sl)
+
+    high = bars.high[rows]
+    low = bars.low[rows]
+    after = bars.valid[rows] & (np.arange(high.shape[1])[None, :] >= entry_pos[:, None])
+    tp_hit = after & (high >= tp_price[:, None])
+    sl_hit = after & (low <= sl_price[:, None])
+    exit_pos = _first_true(tp_hit | sl_hit)
+
+    last_pos = bars.lengths[rows] - 1
+    hit = exit_pos >= 0
+    exit_pos = np.where(hit, exit_pos, last_pos)
+    is_tp = hit & tp_hit[np.arange(n), exit_pos]
+    exit_code = np.where(hit, np.where(is_tp, EXIT_TP, EXIT_SL), EXIT_CLOSE)
+    level = np.where(exit_code == EXIT_TP, tp_price,
+                     np.where(exit_code == EXIT_SL, sl_price, bars.close[rows, last_pos]))
+    exit_volume = bars.volume[rows, exit_pos] if bars.volume is not None and n else None
+    exit_price = cost_model.exit_fill(level, exit_code, exit_volume)
+
+    # 수수료/세금 반영 (진입+청산)
+    pnl = cost_model.net_return(entry_price, exit_price)
+    return {
+        'exit_pos': exit_pos,
+        'entry_price': entry_price,
+        'exit_price': exit_price,
+        'exit_code': exit_code,
+        'pnl': pnl,
+    }
+
+
+def simulate_exits(bars, rows, entry_pos, tp_pct, sl_pct, slippage=SLIPPAGE, commission=COMMISSION,
+                   cost_model=None):
+    """
+    진입 위치(-1 포함)와 TP/SL 비율로 청산 시뮬레이션
+
+    Returns:
+        dict of arrays (진입한 거래일만): rows, entry_pos, raw_entry_price, tp_price, sl_price
+        + scan_exits 결과
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    entered = entry_pos >= 0
+    rows, entry_pos = rows[entered], entry_pos[entered]
+
+    raw_entry = bars.open[rows, entry_pos]
+    raw_tp = raw_entry * (1 + tp_pct)
+    raw_sl = raw_entry * (1 - sl_pct)
+    result = scan_exits(bars, rows, entry_pos, raw_entry, raw_tp, raw_sl,
+                        slippage=slippage, commission=commission, cost_model=cost_model)
+    result.update({
+        'rows': rows,
+        'entry_pos': entry_pos,
+        'raw_entry_price': raw_entry,
+        'tp_price': raw_tp,
+        'sl_price': raw_sl,
+    })
+    return result
+
+
+def simulate(bars, rows, params, slippage=SLIPPAGE, commission=COMMISSION, cost_model=None):
+    """파라미터 한 세트로 진입 + 청산"""
+    entry_pos, orb_high = find_entries(bars, rows, params['orb_delay_min'], params['orb_max_min'])
+    result = simulate_exits(bars, rows, entry_pos, params['tp_pct'], params['sl_pct'],
+                            slippage=slippage, commission=commission, cost_model=cost_model)
+    result['orb_high'] = orb_high[entry_pos >= 0]
+    return result
+
+
+def simulate_batch(bars, rows, param_sets, slippage=SLIPPAGE, commission=COMMISSION, cost_model=None):
+    """
+    여러 파라미터 세트를 같은 거래일 행렬로 평가
+
+    Args:
+        rows: 공통 거래일 index 배열, 또는 파라미터 세트별 index 배열 리스트 (필터 통과 거래일)
+        param_sets: tp_pct/sl_pct/orb_delay_min/orb_max_min 를 가진 dict 리스트
+    Returns:
+        파라미터 세트별 simulate() 결과 리스트
+    """
+    per_set = isinstance(rows, (list, tuple))
+    all_rows = np.arange(len(bars.lengths))
+    results = []
+    entry_cache = {}
+    for i, params in enumerate(param_sets):
+        set_rows = np.asarray(rows[i] if per_set else rows, dtype=np.int64)
+        # 진입 위치는 ORB 파라미터에만 의존 -> 전체 거래일에 대해 한 번 계산 후 재사용
+        orb_key = (params['orb_delay_min'], params['orb_max_min'])
+        if orb_key not in entry_cache:
+            entry_cache[orb_key] = find_entries(bars, all_rows, *orb_key)
+        entry_pos, orb_high = (a[set_rows] for a in entry_cache[orb_key])
+        result = simulate_exits(bars, set_rows, entry_pos, params['tp_pct'], params['sl_pct'],
+                                slippage=slippage, commission=commission, cost_model=cost_model)
+        result['orb_high'] = orb_high[entry_pos >= 0]
+        results.append(result)
+    return results
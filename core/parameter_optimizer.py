@@ -1,12 +1,17 @@
 import optuna
 import pandas as pd
 import numpy as np
-from core.gradual_rise_backtest import GradualRiseBacktest
+from core.gradual_rise_backtest import GradualRiseBacktest, DEFAULT_PARAMETERS
+from core.feature_cache import get_feature_cache, file_fingerprint
+from core.feature_engine import FEATURE_VERSION
+from core.feature_store import get_feature_store
+from database.backtest_store import get_backtest_store, param_hash
 import warnings
 import glob
 import os
+import sys
 import random
-import datetime
+import multiprocessing as mp
 warnings.filterwarnings('ignore')
 
 # === CONFIG: 실험 구간/파라미터/종목 수 조정 ===
@@ -14,14 +19,41 @@ TRAIN_RANGE = ('2024-01-01', '2024-12-31')
 TEST_RANGE = ('2025-06-01', '2025-06-30')
 N_TRIALS = 100
 N_STOCKS = 20
+N_JOBS = os.cpu_count() or 1  # 병렬 worker 프로세스 수 (1이면 단일 프로세스)
+STUDY_NAME = 'gradual_rise'  # 실제 study 이름은 STUDY_NAME + 입력 지문 (입력이 같을 때만 재개)
+STUDY_STORAGE = 'sqlite:///optuna_gradual_rise.db'  # 병렬 trial 공유 + 중단 후 재개
+BATCH_SIZE = 4  # 한 번에 ask 해서 run_backtest_batch 로 같이 평가할 trial 수 (클수록 TPE 가 오래된 결과로 샘플링)
 
 # === 1. minute_data에서 랜덤하게 20개 종목 추출 (실행 시 한 번만) ===
 csv_files = glob.glob(os.path.join("minute_data", "*_1min.csv"))
 all_codes = [os.path.basename(f).split('_')[0] for f in csv_files]
 random.seed(42)  # 재현성
-TEST_CODES = random.sample(all_codes, N_STOCKS)
+TEST_CODES = random.sample(all_codes, min(N_STOCKS, len(all_codes)))
 print("최적화에 사용할 종목:", TEST_CODES)
 
+def make_sampler(seed):
+    """
+    배치/병렬 평가용 TPE sampler
+
+    평가 중(ask 후 tell 전)인 trial 은 constant liar 로 최악값을 가정해서
+    같은 배치나 다른 worker 가 같은 지점을 반복해서 뽑지 않게 한다.
+    """
+    return optuna.samplers.TPESampler(seed=seed, constant_liar=True)
+
+class _SearchSpaceRecorder:
+    """suggest_params 가 요청하는 분포만 기록 (탐색 공간 지문용)"""
+
+    def __init__(self):
+        self.space = {}
+
+    def suggest_float(self, name, low, high, step=None, log=False):
+        self.space[name] = ['float', low, high, step, log]
+        return low
+
+    def suggest_int(self, name, low, high, step=1, log=False):
+        self.space[name] = ['int', low, high, step, log]
+        return low
+
 class ParameterOptimizer:
     """파라미터 최적화 클래스"""
     
@@ -29,9 +61,18 @@ class ParameterOptimizer:
         self.data_path = data_path
         self.best_params = None
         self.best_value = -np.inf
+        self.stock_codes = TEST_CODES
+        self.date_range = TRAIN_RANGE
+        self.feature_range = None  # walk-forward: 전체 구간 Feature 를 잘라서 재사용
         
-    def objective(self, trial):
-        """Optuna 목표 함수 (새로운 feature 파라미터 추가)"""
+    def _make_backtest(self):
+        """Feature 캐시를 공유하는 백테스트 인스턴스"""
+        return GradualRiseBacktest(self.data_path, feature_cache=get_feature_cache(self.data_path),
+                                   feature_store=get_feature_store(self.data_path),
+                                   feature_range=self.feature_range)
+    
+    def suggest_params(self, trial):
+        """trial 에서 파라미터 샘플링 (새로운 feature 파라미터 추가)"""
         # === 파라미터 탐색 범위 대폭 확장 (새로운 feature 포함) ===
         params = {
             # 기본 파라미터 (전략 목적에 맞게 조정)
@@ -71,46 +112,133 @@ class ParameterOptimizer:
             'bb_volume_interaction_threshold': trial.suggest_float('bb_volume_interaction_threshold', 0.1, 1.5, step=0.05)
         }
         
+        return params
+    
+    def score(self, metrics):
+        """성과 지표 -> 목표값 (Sharpe + WinRate + TotalReturn, 거래 수 패널티)"""
+        n_trades = metrics.get('total_trades', 0)
+        if n_trades == 0:
+            return -2000  # 거래가 없으면 더 강한 패널티
+        
+        objective_value = metrics['sharpe_ratio'] * 0.4 + metrics['win_rate'] * 0.3 + metrics['total_return'] * 0.3
+        
+        # 거래 수가 적으면 패널티
+        if n_trades < 10:
+            objective_value *= 0.2  # 거래 적으면 더 강한 패널티
+        elif n_trades < 20:
+            objective_value *= 0.8  # 적당한 거래 수면 약간의 패널티
+        return objective_value
+    
+    def _report(self, trial_number, metrics, objective_value):
+        """trial 결과 한 줄 출력"""
+        if metrics.get('total_trades', 0) > 0:
+            print(f"Trial {trial_number}: Sharpe={metrics['sharpe_ratio']:.3f}, WinRate={metrics['win_rate']:.2%}, "
+                  f"Return={metrics['total_return']:.2%}, Trades={metrics['total_trades']}, Obj={objective_value:.3f}")
+    
+    def objective(self, trial):
+        """Optuna 목표 함수 (trial 하나씩 평가)"""
+        params = self.suggest_params(trial)
         try:
-            # 백테스트 실행 (항상 동일한 test_codes 사용)
-            backtest = GradualRiseBacktest(self.data_path)
+            # 백테스트 실행 (항상 동일한 종목 사용, Feature 는 캐시 재사용)
+            backtest = self._make_backtest()
             backtest.parameters.update(params)
             # === train/test 분리: train 구간에서만 최적화 ===
-            metrics, trades = backtest.run_backtest(stock_codes=TEST_CODES, date_range=TRAIN_RANGE, verbose=False)
-            
-            if len(trades) == 0:
-                return -2000  # 거래가 없으면 더 강한 패널티
-            
-            # 목표 함수: Sharpe + WinRate + TotalReturn
-            sharpe = metrics['sharpe_ratio']
-            win_rate = metrics['win_rate']
-            total_return = metrics['total_return']
-            
-            objective_value = sharpe * 0.4 + win_rate * 0.3 + total_return * 0.3
-            
-            # 거래 수가 적으면 패널티
-            if len(trades) < 10:
-                objective_value *= 0.2  # 거래 적으면 더 강한 패널티
-            elif len(trades) < 20:
-                objective_value *= 0.8  # 적당한 거래 수면 약간의 패널티
-            
-            print(f"Trial {trial.number}: Sharpe={sharpe:.3f}, WinRate={win_rate:.2%}, "
-                  f"Return={total_return:.2%}, Trades={len(trades)}, Obj={objective_value:.3f}")
-            
+            metrics, trades = backtest.run_backtest(stock_codes=self.stock_codes, date_range=self.date_range, verbose=False)
+            objective_value = self.score(metrics)
+            self._report(trial.number, metrics, objective_value)
             return objective_value
             
         except Exception as e:
             print(f"Trial {trial.number} 에러: {e}")
             return -2000
     
-    def optimize(self, n_trials=N_TRIALS):
-        """파라미터 최적화 실행"""
+    def run_trials(self, study, n_trials, batch_size=BATCH_SIZE):
+        """trial 을 batch_size 개씩 ask 해서 run_backtest_batch 한 번으로 평가 후 tell"""
+        backtest = self._make_backtest()
+        done = 0
+        while done < n_trials:
+            trials = [study.ask() for _ in range(min(batch_size, n_trials - done))]
+            param_sets = [self.suggest_params(trial) for trial in trials]
+            try:
+                table = backtest.run_backtest_batch(param_sets, stock_codes=self.stock_codes,
+                                                    date_range=self.date_range, verbose=False)
+                rows = table.to_dict('records')
+            except Exception as e:
+                print(f"Trial {trials[0].number}-{trials[-1].number} 에러: {e}")
+                rows = [{}] * len(trials)
+            for trial, params, row in zip(trials, param_sets, rows):
+                trial.set_user_attr('params', params)  # 고정값 포함 전체 파라미터
+                objective_value = self.score(row)
+                self._report(trial.number, row, objective_value)
+                study.tell(trial, objective_value)
+            done += len(trials)
+    
+    def study_fingerprint(self):
+        """종목/기간/탐색 공간/기본 파라미터/1분봉 파일이 같으면 같은 값 (study 재개 기준)"""
+        recorder = _SearchSpaceRecorder()
+        self.suggest_params(recorder)
+        csv_files = glob.glob(os.path.join(self.data_path, "*_1min.csv"))
+        csv_files = [f for f in csv_files if any(code in f for code in self.stock_codes)]
+        return param_hash({
+            'stock_codes': sorted(self.stock_codes),
+            'date_range': [str(d) for d in self.date_range],
+            'search_space': recorder.space,
+            'default_parameters': DEFAULT_PARAMETERS,
+            'feature_version': FEATURE_VERSION,
+            'data_files': sorted(file_fingerprint(f) for f in csv_files),
+        })
+    
+    def preload(self):
+        """worker 생성 전에 Feature 를 한 번 계산해서 캐시에 올려둠 (fork 시 메모리 공유)"""
+        backtest = self._make_backtest()
+        features = backtest.load_features(self.stock_codes, date_range=self.date_range)
+        print(f"Feature 사전 로드 완료: {len(features)} 일")
+    
+    def optimize(self, n_trials=N_TRIALS, n_jobs=1, storage=None, study_name=None, batch_size=BATCH_SIZE, seed=42):
+        """
+        파라미터 최적화 실행 (n_jobs > 1 이면 프로세스 병렬, storage 지정 시 재개 가능)
+        
+        study_name 을 주지 않으면 STUDY_NAME + study_fingerprint() 를 사용하므로
+        종목/기간/탐색 공간/데이터가 바뀌면 이전 study 를 재개하지 않고 새로 시작한다.
+        """
         print("=== 파라미터 최적화 시작 ===")
+        if n_jobs > 1 and storage is None:
+            storage = STUDY_STORAGE
+        if study_name is None:
+            study_name = f"{STUDY_NAME}_{self.study_fingerprint()}"
+        if storage:
+            print(f"study: {study_name} ({storage})")
         study = optuna.create_study(
             direction='maximize',
-            sampler=optuna.samplers.TPESampler(seed=42)
+            sampler=make_sampler(seed),
+            storage=storage,
+            study_name=study_name if storage else None,
+            load_if_exists=True
         )
-        study.optimize(self.objective, n_trials=n_trials)
+        finished = len(study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,)))
+        remaining = n_trials - finished
+        if finished:
+            print(f"기존 study 재개: 완료 {finished} trial, 남은 {max(remaining, 0)} trial")
+        
+        if remaining > 0 and n_jobs > 1:
+            self.preload()
+            # fork 가능하면 부모의 Feature 캐시/memory-map 을 그대로 공유
+            ctx = mp.get_context('fork' if 'fork' in mp.get_all_start_methods() else 'spawn')
+            # 남은 trial 을 worker 별로 나눠서 할당
+            shares = [remaining // n_jobs + (1 if i < remaining % n_jobs else 0) for i in range(n_jobs)]
+            workers = [
+                ctx.Process(target=_optimize_worker,
+                            args=(self, storage, study_name, share, seed + i, batch_size))
+                for i, share in enumerate(shares) if share > 0
+            ]
+            for w in workers:
+                w.start()
+            for w in workers:
+                w.join()
+            study = optuna.load_study(study_name=study_name, storage=storage)
+        elif remaining > 0:
+            self.run_trials(study, remaining, batch_size)
+        
         self.best_params = study.best_params
         self.best_value = study.best_value
         print(f"\n최적 파라미터:")
@@ -122,26 +250,36 @@ class ParameterOptimizer:
     def validate_best_params(self, stock_codes=None):
         """최적 파라미터로 전체 검증 (train/test 분리)"""
         print("\n=== 최적 파라미터 검증 (train/test) ===")
-        backtest = GradualRiseBacktest(self.data_path)
+        backtest = self._make_backtest()
         backtest.parameters.update(self.best_params)
         # train/test 분리 실행
         (train_metrics, train_trades), (test_metrics, test_trades) = backtest.run_train_test_split(
             stock_codes=TEST_CODES, train_range=TRAIN_RANGE, test_range=TEST_RANGE)
-        # 결과 저장 (test 결과)
+        # 결과 저장 (test 결과, database/backtest_results.db)
         if len(test_trades) > 0:
-            run_time = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            file_dt = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-            test_trades['run_time'] = run_time
-            csv_name = f'optimized_trades_{file_dt}.csv'
-            test_trades.to_csv(csv_name, index=False)
-            print(f"최적화된 거래 내역이 '{csv_name}'에 저장되었습니다.")
+            run_id = get_backtest_store().save_run(test_trades, test_metrics, backtest.parameters,
+                                                   strategy='gradual_rise', experiment='optimizer_test',
+                                                   date_range=TEST_RANGE)
+            print(f"최적화된 거래 내역이 백테스트 결과 저장소에 저장되었습니다. (run {run_id})")
         return test_metrics, test_trades
 
+def _optimize_worker(optimizer, storage, study_name, n_trials, seed, batch_size=BATCH_SIZE):
+    """병렬 worker: 공유 storage 의 study 에 n_trials 개 trial 추가 (TPE 는 다른 worker 결과도 참조)"""
+    study = optuna.load_study(
+        study_name=study_name,
+        storage=storage,
+        sampler=make_sampler(seed)
+    )
+    optimizer.run_trials(study, n_trials, batch_size)
+
 def main():
-    """메인 실행 함수"""
+    """메인 실행 함수 (--walk-forward: 구간 이동 최적화, core/walk_forward.py)"""
+    if '--walk-forward' in sys.argv:
+        from core.walk_forward import main as walk_forward_main
+        return walk_forward_main()
     optimizer = ParameterOptimizer()
-    # 1. 파라미터 최적화
-    best_params = optimizer.optimize(n_trials=N_TRIALS)
+    # 1. 파라미터 최적화 (전체 코어 사용)
+    best_params = optimizer.optimize(n_trials=N_TRIALS, n_jobs=N_JOBS, storage=STUDY_STORAGE)
     # 2. 최적 파라미터로 전체 검증 (train/test)
     metrics, trades = optimizer.validate_best_params()
     # 3. 결과 요약
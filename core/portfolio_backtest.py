@@ -0,0 +1,193 @@
+"""
+Portfolio Backtest - 자본/보유 종목 수 제한을 반영한 이벤트 기반 포트폴리오 백테스트
+
+GradualRiseBacktest.simulate_trades 는 진입마다 독립 거래(무제한 자본/동시 보유)로 계산한다.
+여기서는 진입 후보들의 1분봉을 힙 k-way merge 로 하나의 시간순 이벤트 스트림으로 합치고,
+진입 시점의 현금/총자산으로 OrderManager 와 같은 규칙(orders/position_sizing.py)으로 수량을 정한 뒤
+보유 포지션을 매 봉 평가해서 자산 곡선을 만든다.
+
+- TP/SL/종가 청산 위치는 포트폴리오 상태와 무관하므로 scan_exits 로 미리 계산
+- 후보별 이벤트 스트림은 진입 봉 ~ 청산 봉 구간만 (진입 거절 시 스트림 제거)
+- 같은 시각 이벤트는 후보 순서 (진입 시각, 종목코드) 대로 처리
+"""
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from core.orb_simulator import EXIT_REASONS, scan_exits
+from orders.position_sizing import order_quantity, can_buy_new_stock, REJECT_MAX_POSITIONS
+
+INITIAL_CAPITAL = 10_000_000  # 초기 자본 (원)
+
+
+def default_risk():
+    """실시간 매매와 같은 리스크 설정 (Settings.RISK_MANAGEMENT)"""
+    from config.settings import get_settings
+    return dict(get_settings().RISK_MANAGEMENT)
+
+
+class PortfolioBacktest:
+    """진입 후보 -> 포트폴리오 거래 내역 + 자산 곡선"""
+
+    def __init__(self, bars, initial_capital=INITIAL_CAPITAL, risk=None, cost_model=None):
+        """
+        Args:
+            bars: BarArray (진입 후보의 bar_start/bar_end 가 가리키는 1분봉 배열)
+            risk: RISK_MANAGEMENT 형식 dict (None 이면 config/settings.py 값)
+            cost_model: core/cost_model.py 모델 (None 이면 simulate_trades 기본값)
+        """
+        self.bars = bars
+        self.initial_capital = initial_capital
+        self.risk = risk if risk is not None else default_risk()
+        self.cost_model = cost_model
+
+    def _exit_plan(self, entries_df):
+        """후보별 진입/청산 봉의 BarArray 위치, 체결가, 청산 사유 (simulate_trades 와 같은 규칙)"""
+        starts = entries_df['bar_start'].to_numpy()
+        day_bars = self.bars.day_bars(starts, entries_df['bar_end'].to_numpy())
+        rows = np.arange(len(entries_df))
+        entry_ns = entries_df['entry_time'].values.astype('datetime64[ns]').astype(np.int64)
+        entry_pos = ((day_bars.dt_ns < entry_ns[:, None]) & day_bars.valid).sum(axis=1)
+        result = scan_exits(day_bars, rows, entry_pos,
+                            entries_df['entry_price'].to_numpy(),
+                            entries_df['tp_price'].to_numpy(),
+                            entries_df['sl_price'].to_numpy(),
+                            cost_model=self.cost_model)
+        result['first'] = starts + entry_pos
+        result['last'] = starts + result['exit_pos']
+        return result
+
+    def run(self, entries_df):
+        """
+        이벤트 루프 실행
+
+        Args:
+            entries_df: find_orb_entries 결과 (stock_code, date, entry_time, entry_price, tp_price, sl_price,
+                        bar_start, bar_end)
+        Returns:
+            (trades_df, equity_df)
+            trades_df: 체결된 거래 (quantity, 원 단위 profit 포함), 거절된 후보는 reject_reason 만 기록
+            equity_df: datetime, cash, market_value, equity (이벤트가 있던 시각마다)
+        """
+        n = len(entries_df)
+        if n == 0:
+            return pd.DataFrame([]), pd.DataFrame(columns=['datetime', 'cash', 'market_value', 'equity'])
+        order = np.lexsort((entries_df['stock_code'].astype(str).to_numpy(),
+                            entries_df['entry_time'].values.astype('datetime64[ns]')))
+        entries_df = entries_df.iloc[order].reset_index(drop=True)
+        plan = self._exit_plan(entries_df)
+
+        # 루프에서는 numpy 스칼라 대신 파이썬 값 사용
+        dt = self.bars.dt_ns.tolist()
+        close = self.bars.close.tolist()
+        codes = entries_df['stock_code'].astype(str).tolist()
+        first = plan['first'].tolist()
+        last = plan['last'].tolist()
+        entry_price = plan['entry_price'].tolist()
+        pnl = plan['pnl'].tolist()
+
+        risk = self.risk
+        cash = float(self.initial_capital)
+        market_value = 0.0
+        held = {}                 # 종목코드 -> 보유 수량
+        quantity = [0] * n
+        mark = [0.0] * n          # 후보별 마지막 평가 가격
+        reject = [None] * n
+        eq_time, eq_cash, eq_value = [], [], []
+
+        heap = [(dt[first[i]], i, first[i]) for i in range(n)]
+        heapq.heapify(heap)
+        now = None
+        while heap:
+            t, i, k = heap[0]
+            if t != now:
+                if now is not None:
+                    eq_time.append(now)
+                    eq_cash.append(cash)
+                    eq_value.append(market_value)
+                now = t
+
+            if k == first[i]:
+                # 진입: 보유 종목 수 제한 -> 현금/총자산 기준 수량
+                code = codes[i]
+                held_qty = held.get(code, 0)
+                if held_qty == 0 and not can_buy_new_stock(risk, len(held)):
+                    qty, reason = 0, REJECT_MAX_POSITIONS
+                else:
+                    qty, reason = order_quantity(risk, cash, cash + market_value, entry_price[i], held_qty)
+                if qty == 0:
+                    reject[i] = reason
+                    heapq.heappop(heap)
+                    continue
+                quantity[i] = qty
+                held[code] = held_qty + qty
+                cash -= qty * entry_price[i]
+                market_value += qty * entry_price[i]
+                mark[i] = entry_price[i]
+
+            qty = quantity[i]
+            if k == last[i]:
+                # 청산: 수익률(pnl, 슬리피지/수수료 반영) 기준 정산
+                market_value -= qty * mark[i]
+                cash += qty * entry_price[i] * (1 + pnl[i])
+                code = codes[i]
+                held[code] -= qty
+                if held[code] == 0:
+                    del held[code]
+                    if not held:
+                        market_value = 0.0  # 부동소수 누적 오차 제거
+                heapq.heappop(heap)
+            else:
+                market_value += qty * (close[k] - mark[i])
+                mark[i] = close[k]
+                heapq.heapreplace(heap, (dt[k + 1], i, k + 1))
+        if now is not None:
+            eq_time.append(now)
+            eq_cash.append(cash)
+            eq_value.append(market_value)
+
+        trades = self._trades_frame(entries_df, plan, quantity, reject)
+        equity = pd.DataFrame({
+            'datetime': np.array(eq_time, dtype=np.int64).view('datetime64[ns]'),
+            'cash': eq_cash,
+            'market_value': eq_value,
+        })
+        equity['equity'] = equity['cash'] + equity['market_value']
+        return trades, equity
+
+    def _trades_frame(self, entries_df, plan, quantity, reject):
+        quantity = np.asarray(quantity, dtype=np.int64)
+        return pd.DataFrame({
+            'stock_code': entries_df['stock_code'].to_numpy(),
+            'date': entries_df['date'].to_numpy(),
+            'entry_time': entries_df['entry_time'].to_numpy(),
+            'exit_time': self.bars.dt_ns[plan['last']].astype('datetime64[ns]'),
+            'entry_price': plan['entry_price'],
+            'exit_price': plan['exit_price'],
+            'pnl': plan['pnl'],
+            'exit_reason': EXIT_REASONS[plan['exit_code']],
+            'quantity': quantity,
+            'profit': quantity * plan['entry_price'] * plan['pnl'],
+            'reject_reason': np.array(reject, dtype=object),
+        })
+
+
+def portfolio_metrics(trades_df, equity_df, initial_capital=INITIAL_CAPITAL):
+    """자산 곡선 기준 성과 지표 (거래가 없으면 {})"""
+    if len(trades_df) == 0:
+        return {}
+    filled = trades_df[trades_df['quantity'] > 0]
+    equity = np.r_[initial_capital, equity_df['equity'].to_numpy(dtype=np.float64)]
+    peak = np.maximum.accumulate(equity)
+    return {
+        'candidates': len(trades_df),
+        'total_trades': len(filled),
+        'rejected': int((trades_df['quantity'] == 0).sum()),
+        'win_rate': (filled['pnl'] > 0).mean() if len(filled) else np.nan,
+        'total_profit': filled['profit'].sum(),
+        'final_equity': equity[-1],
+        'total_return': equity[-1] / initial_capital - 1,
+        'max_drawdown': (equity / peak - 1).min(),
+    }
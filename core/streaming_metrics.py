@@ -0,0 +1,89 @@
+"""
+Streaming Metrics - 거래를 chunk 단위로 받아 성과 지표를 누적 계산
+
+GradualRiseBacktest.calculate_metrics 와 같은 지표를 전체 거래 DataFrame 없이 계산한다.
+평균/표준편차는 chunk 별 (건수, 평균, 편차제곱합) 을 병합하고 (Chan et al.),
+max_drawdown 은 누적 손익의 최저값을 이어서 추적하므로 거래 순서대로 넣으면 일괄 계산과 같다.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class OnlineMetrics:
+    """거래 손익 온라인 집계 (메모리는 월 수에만 비례)"""
+
+    def __init__(self):
+        self.count = 0
+        self.wins = 0
+        self.mean = 0.0
+        self.m2 = 0.0           # 평균 대비 편차 제곱합
+        self.total = 0.0
+        self.cum_pnl = 0.0      # 지금까지 누적 손익
+        self.min_cum_pnl = np.inf
+        self.best = -np.inf
+        self.worst = np.inf
+        self.monthly = {}       # Period('M') -> 손익 합계
+
+    def update(self, trades_df):
+        """거래 DataFrame(pnl, date) 한 chunk 반영"""
+        if len(trades_df) == 0:
+            return
+        pnl = trades_df['pnl'].to_numpy(dtype=np.float64)
+        n = len(pnl)
+        chunk_mean = pnl.mean()
+        chunk_m2 = ((pnl - chunk_mean) ** 2).sum()
+
+        total_count = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total_count
+        self.m2 += chunk_m2 + delta ** 2 * self.count * n / total_count
+        self.count = total_count
+        self.wins += int((pnl > 0).sum())
+        self.total += pnl.sum()
+
+        cum = self.cum_pnl + np.cumsum(pnl)
+        self.min_cum_pnl = min(self.min_cum_pnl, cum.min())
+        self.cum_pnl = cum[-1]
+        self.best = max(self.best, pnl.max())
+        self.worst = min(self.worst, pnl.min())
+
+        if 'date' in trades_df:
+            months = pd.to_datetime(trades_df['date']).dt.to_period('M')
+            for month, value in pd.Series(pnl, index=months.values).groupby(level=0).sum().items():
+                self.monthly[month] = self.monthly.get(month, 0.0) + value
+
+    def result(self):
+        """calculate_metrics 와 같은 키의 dict (거래가 없으면 {})"""
+        if self.count == 0:
+            return {}
+        std = np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+        return {
+            'total_trades': self.count,
+            'win_rate': self.wins / self.count,
+            'avg_return': self.mean,
+            'std_return': std,
+            'sharpe_ratio': self.mean / std if std > 0 else 0,
+            'max_drawdown': self.min_cum_pnl,
+            'total_return': self.total,
+            'expectancy': self.mean * self.count,
+            'best_trade': self.best,
+            'worst_trade': self.worst,
+        }
+
+    def monthly_pnl(self):
+        """월별 손익 Series (월 순)"""
+        return pd.Series(self.monthly, dtype=np.float64).sort_index()
+
+
+def return_summary(results_df):
+    """파일 단위 스크립트 거래(return, net_return 컬럼) 요약 지표"""
+    metrics = {
+        'total_trades': len(results_df),
+        'win_rate': (results_df['return'] > 0).mean(),
+        'avg_return': results_df['return'].mean(),
+        'total_return': results_df['return'].sum(),
+    }
+    if 'net_return' in results_df:
+        metrics['avg_net_return'] = results_df['net_return'].mean()
+    return metrics
@@ -0,0 +1,116 @@
+"""
+Synthetic Minute Data - 벤치마크/테스트용 1분봉 생성기
+
+(종목 수 x 거래일 수) 규모를 지정해서 키움 저장 포맷(최신순)과 같은 minute_data/*_1min.csv 와
+KOSPI 일봉 CSV 를 만든다. 같은 seed 면 항상 같은 데이터가 나오고,
+종목별 난수 시드가 (seed, 종목 번호) 로 고정이라 종목 수를 늘려도 앞 종목 데이터는 그대로다.
+
+생성 구조:
+    <root>/minute_data/<stock_code>_1min.csv
+    <root>/data_collection/market_data/KOSPI_daily.csv   # KOSPI_PATH 와 같은 상대경로
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# === CONFIG ===
+START_DATE = '2024-11-01'
+BARS_PER_DAY = 390          # 09:00 ~ 15:30
+SHORT_DAY_PROB = 0.05       # 거래정지 등으로 봉이 짧은 거래일 비율
+RISER_DAY_PROB = 0.3        # 장 초반 완만 상승 패턴 거래일 비율
+FIRST_CODE = 100000
+KOSPI_STREAM = 999_999     # KOSPI 난수 시드 (종목 번호와 겹치지 않게)
+
+
+def stock_code(stock_index):
+    """stock_index 번째 생성 종목 코드"""
+    return f"{FIRST_CODE + stock_index * 7:06d}"
+
+
+def stock_codes(n_stocks):
+    """생성 종목 코드 목록"""
+    return [stock_code(i) for i in range(n_stocks)]
+
+
+def generate_stock_bars(stock_index, n_days, seed=0, start=START_DATE):
+    """종목 하나의 1분봉 DataFrame (시간순)"""
+    rng = np.random.default_rng([seed, stock_index])
+    days = pd.bdate_range(start, periods=n_days)
+    lengths = np.where(rng.random(n_days) < SHORT_DAY_PROB,
+                       rng.integers(10, 60, n_days), BARS_PER_DAY)
+    offsets = np.concatenate([np.arange(n) for n in lengths])
+    day_index = np.repeat(np.arange(n_days), lengths)
+    n_bars = len(offsets)
+
+    # 거래일별 추세 + 장 초반 15분 상승 패턴
+    drift = rng.normal(0.0, 0.0004, n_days)
+    riser = rng.random(n_days) < RISER_DAY_PROB
+    returns = rng.normal(drift[day_index], 0.003)
+    returns += np.where(riser[day_index] & (offsets < 15), rng.normal(0.006, 0.002, n_days)[day_index], 0.0)
+    gaps = rng.normal(0.0, 0.01, n_days)
+
+    price0 = 5000.0 + 45000.0 * rng.random()
+    close = price0 * np.exp(np.cumsum(returns))
+    prev_close = np.r_[price0, close[:-1]]
+    open_ = np.where(offsets == 0, prev_close * (1 + gaps[day_index]), prev_close)
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0.0, 0.002, n_bars)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0.0, 0.002, n_bars)))
+
+    dt = (days.values[day_index] + np.timedelta64(9, 'h') + offsets.astype('timedelta64[m]'))
+    return pd.DataFrame({
+        'datetime': pd.to_datetime(dt),
+        'stock_code': int(stock_code(stock_index)),
+        'open': np.round(open_).astype(np.int64),
+        'high': np.round(high).astype(np.int64),
+        'low': np.round(low).astype(np.int64),
+        'close': np.round(close).astype(np.int64),
+        'volume': rng.integers(0, 50000, n_bars),
+    })
+
+
+def generate_kospi(n_days, seed=0, start=START_DATE):
+    """KOSPI 일봉 DataFrame"""
+    rng = np.random.default_rng([seed, KOSPI_STREAM])
+    days = pd.bdate_range(start, periods=n_days)
+    close = 2500.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, n_days)))
+    open_ = np.r_[2500.0, close[:-1]]
+    return pd.DataFrame({
+        'date': days.strftime('%Y-%m-%d'),
+        'open': np.round(open_, 2),
+        'high': np.round(np.maximum(open_, close) * (1 + rng.random(n_days) * 0.005), 2),
+        'low': np.round(np.minimum(open_, close) * (1 - rng.random(n_days) * 0.005), 2),
+        'close': np.round(close, 2),
+        'volume': rng.integers(300_000, 900_000, n_days),
+    })
+
+
+def generate_dataset(root, n_stocks, n_days, seed=0, start=START_DATE):
+    """
+    root 아래 minute_data/ 와 KOSPI CSV 생성
+
+    Returns:
+        생성한 1분봉 row 수
+    """
+    data_path = os.path.join(root, 'minute_data')
+    market_path = os.path.join(root, 'data_collection', 'market_data')
+    os.makedirs(data_path, exist_ok=True)
+    os.makedirs(market_path, exist_ok=True)
+
+    n_rows = 0
+    for i, code in enumerate(stock_codes(n_stocks)):
+        df = generate_stock_bars(i, n_days, seed, start)
+        # 키움 저장 포맷과 동일하게 최신순
+        df[::-1].to_csv(os.path.join(data_path, f'{code}_1min.csv'), index=False)
+        n_rows += len(df)
+    generate_kospi(n_days, seed, start).to_csv(os.path.join(market_path, 'KOSPI_daily.csv'), index=False)
+    return n_rows
+
+
+if __name__ == "__main__":
+    # python -m core.synthetic_data <root> <n_stocks> <n_days> [seed]
+    root, n_stocks, n_days = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+    print(f"생성 완료: {generate_dataset(root, n_stocks, n_days, seed)} rows")
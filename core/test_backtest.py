@@ -67,37 +67,36 @@ def test_parameter_sensitivity():
         {'theta_spike': 0.035, 'theta_15m': 0.008, 'tp_pct': 0.04, 'sl_pct': 0.02},
     ]
     
+    # 전체 조합을 한 번의 Feature 계산으로 평가
+    try:
+        table = backtest.run_backtest_batch(param_combinations, stock_codes=test_codes)
+    except Exception as e:
+        print(f"오류: {e}")
+        return
+    
     results = []
     
-    for i, params in enumerate(param_combinations):
+    for i, (params, row) in enumerate(zip(param_combinations, table.to_dict('records'))):
         print(f"\n--- 파라미터 조합 {i+1} ---")
         print(f"파라미터: {params}")
         
-        backtest.parameters.update(params)
-        
-        try:
-            metrics, trades = backtest.run_backtest(stock_codes=test_codes)
+        if row['total_trades'] > 0:
+            result = {
+                'params': params,
+                'total_trades': row['total_trades'],
+                'win_rate': row['win_rate'],
+                'avg_return': row['avg_return'],
+                'sharpe_ratio': row['sharpe_ratio'],
+                'total_return': row['total_return']
+            }
+            results.append(result)
             
-            if len(trades) > 0:
-                result = {
-                    'params': params,
-                    'total_trades': metrics['total_trades'],
-                    'win_rate': metrics['win_rate'],
-                    'avg_return': metrics['avg_return'],
-                    'sharpe_ratio': metrics['sharpe_ratio'],
-                    'total_return': metrics['total_return']
-                }
-                results.append(result)
-                
-                print(f"거래 수: {metrics['total_trades']}")
-                print(f"승률: {metrics['win_rate']:.2%}")
-                print(f"평균 수익률: {metrics['avg_return']:.2%}")
-                print(f"샤프 비율: {metrics['sharpe_ratio']:.3f}")
-            else:
-                print("거래 없음")
-                
-        except Exception as e:
-            print(f"오류: {e}")
+            print(f"거래 수: {row['total_trades']}")
+            print(f"승률: {row['win_rate']:.2%}")
+            print(f"평균 수익률: {row['avg_return']:.2%}")
+            print(f"샤프 비율: {row['sharpe_ratio']:.3f}")
+        else:
+            print("거래 없음")
     
     # 결과 비교
     if results:
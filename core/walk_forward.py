@@ -0,0 +1,209 @@
+"""
+Walk-Forward Optimizer - 구간 이동 파라미터 최적화/검증
+
+전체 데이터 기간을 (train N개월 -> test M개월) 구간으로 step 개월씩 밀면서
+fold 마다 train 구간 Optuna 최적화 후 바로 다음 test 구간으로 out-of-sample 검증한다.
+- fold 는 프로세스 병렬로 실행 (fork 시 부모가 미리 계산한 Feature 캐시 공유)
+- Feature 는 전체 기간을 한 번만 계산하고 fold 별 train/test 기간은 잘라서 사용
+- 결과: fold 별 지표 테이블 + 전체 test 구간 거래 내역 (out-of-sample)
+  -> 백테스트 결과 저장소(database/backtest_store.py)에 fold 별 run + 전체 out-of-sample run 으로 저장
+"""
+
+import os
+import json
+import datetime
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import optuna
+import pandas as pd
+
+from core.gradual_rise_backtest import GradualRiseBacktest
+from core.feature_cache import get_feature_cache
+from core.feature_store import get_feature_store
+from core.parameter_optimizer import ParameterOptimizer, TEST_CODES, BATCH_SIZE, make_sampler
+from data_collection.minute_store import EPOCH
+from database.backtest_store import get_backtest_store
+
+# === CONFIG ===
+TRAIN_MONTHS = 6   # train 구간 길이
+TEST_MONTHS = 1    # test 구간 길이
+STEP_MONTHS = 1    # 구간 이동 간격
+N_TRIALS = 100     # fold 별 Optuna trial 수
+N_JOBS = os.cpu_count() or 1  # 동시에 실행할 fold 수
+
+SUMMARY_KEYS = ['total_trades', 'win_rate', 'avg_return', 'sharpe_ratio', 'total_return']
+
+
+def make_folds(start, end, train_months=TRAIN_MONTHS, test_months=TEST_MONTHS, step_months=STEP_MONTHS):
+    """
+    [start, end] 기간을 walk-forward fold 로 분할
+
+    train 구간은 start 가 속한 달 1일부터 시작하고, 마지막 test 구간은 end 에서 자른다.
+    Returns:
+        [{'fold', 'train_range', 'test_range'}, ...] (기간은 'YYYY-MM-DD' 문자열, 양끝 포함)
+    """
+    start = pd.Timestamp(start).normalize()
+    end = pd.Timestamp(end).normalize()
+    folds = []
+    train_start = start.replace(day=1)
+    while True:
+        test_start = train_start + pd.DateOffset(months=train_months)
+        if test_start > end:
+            break
+        train_end = test_start - pd.Timedelta(days=1)
+        test_end = min(test_start + pd.DateOffset(months=test_months) - pd.Timedelta(days=1), end)
+        folds.append({
+            'fold': len(folds),
+            'train_range': (max(train_start, start).strftime('%Y-%m-%d'), train_end.strftime('%Y-%m-%d')),
+            'test_range': (test_start.strftime('%Y-%m-%d'), test_end.strftime('%Y-%m-%d')),
+        })
+        train_start += pd.DateOffset(months=step_months)
+    return folds
+
+
+def data_span(data_path="minute_data", stock_codes=None):
+    """저장소 메타데이터로 전체 데이터 기간 (첫 거래일, 마지막 거래일)"""
+    backtest = GradualRiseBacktest(data_path)
+    csv_files = backtest._select_files(stock_codes)
+    backtest.store.ensure(csv_files)
+    first_days, last_days = [], []
+    for csv_path in csv_files:
+        meta = backtest.store.read_meta(os.path.basename(csv_path).split('_')[0])
+        if meta and meta['first_day'] is not None:
+            first_days.append(meta['first_day'])
+            last_days.append(meta['last_day'])
+    if not first_days:
+        return None
+    return (EPOCH + datetime.timedelta(days=min(first_days)),
+            EPOCH + datetime.timedelta(days=max(last_days)))
+
+
+def run_fold(fold, data_path, stock_codes, feature_range, n_trials=N_TRIALS, batch_size=BATCH_SIZE):
+    """fold 하나: train 구간 최적화 -> 최적 파라미터로 train/test 백테스트"""
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    optimizer = ParameterOptimizer(data_path)
+    optimizer.stock_codes = stock_codes
+    optimizer.date_range = fold['train_range']
+    optimizer.feature_range = feature_range
+    study = optuna.create_study(direction='maximize',
+                                sampler=make_sampler(42 + fold['fold']))
+    optimizer.run_trials(study, n_trials, batch_size)
+
+    best_params = study.best_trial.user_attrs.get('params', study.best_params)
+    backtest = optimizer._make_backtest()
+    backtest.parameters.update(best_params)
+    (train_metrics, _), (test_metrics, test_trades) = backtest.run_train_test_split(
+        stock_codes, fold['train_range'], fold['test_range'], verbose=False)
+
+    record = {
+        'fold': fold['fold'],
+        'train_start': fold['train_range'][0],
+        'train_end': fold['train_range'][1],
+        'test_start': fold['test_range'][0],
+        'test_end': fold['test_range'][1],
+        'best_value': study.best_value,
+    }
+    for k in SUMMARY_KEYS:
+        record[f'train_{k}'] = train_metrics.get(k, 0)
+        record[f'test_{k}'] = test_metrics.get(k, 0)
+    record['best_params'] = json.dumps(best_params, sort_keys=True)
+    print(f"[Fold {fold['fold']}] Test {fold['test_range']}: 거래={record['test_total_trades']}, "
+          f"수익률={record['test_total_return']:.2%}, 목표값={study.best_value:.3f}")
+
+    if len(test_trades) > 0:
+        test_trades.insert(0, 'fold', fold['fold'])
+    return record, test_trades
+
+
+def run_walk_forward(data_path="minute_data", stock_codes=None, span=None, n_trials=N_TRIALS,
+                     n_jobs=N_JOBS, batch_size=BATCH_SIZE, train_months=TRAIN_MONTHS,
+                     test_months=TEST_MONTHS, step_months=STEP_MONTHS):
+    """
+    walk-forward 최적화 실행
+
+    Returns:
+        (fold 지표 DataFrame, out-of-sample 거래 DataFrame, 전체 out-of-sample 지표 dict)
+    """
+    stock_codes = stock_codes or TEST_CODES
+    span = span or data_span(data_path, stock_codes)
+    if span is None:
+        print("데이터가 없습니다.")
+        return pd.DataFrame(), pd.DataFrame(), {}
+    feature_range = (str(span[0]), str(span[1]))
+    folds = make_folds(span[0], span[1], train_months, test_months, step_months)
+    print(f"=== Walk-Forward: {feature_range[0]} ~ {feature_range[1]}, {len(folds)} fold "
+          f"(train {train_months}개월 / test {test_months}개월 / step {step_months}개월) ===")
+    if not folds:
+        return pd.DataFrame(), pd.DataFrame(), {}
+
+    # 전체 구간 Feature 를 부모 프로세스에서 한 번 계산 (worker 는 fork 메모리 또는 디스크 캐시 재사용)
+    backtest = GradualRiseBacktest(data_path, feature_cache=get_feature_cache(data_path),
+                                   feature_store=get_feature_store(data_path))
+    features = backtest.load_features(stock_codes, date_range=feature_range)
+    print(f"Feature 사전 로드 완료: {len(features)} 일")
+
+    args = [(fold, data_path, stock_codes, feature_range, n_trials, batch_size) for fold in folds]
+    if n_jobs > 1 and len(folds) > 1:
+        ctx = mp.get_context('fork' if 'fork' in mp.get_all_start_methods() else 'spawn')
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(folds)), mp_context=ctx) as executor:
+            futures = [executor.submit(run_fold, *a) for a in args]
+            results = [f.result() for f in futures]
+    else:
+        results = [run_fold(*a) for a in args]
+
+    fold_df = pd.DataFrame([record for record, _ in results])
+    oos_frames = [trades for _, trades in results if len(trades) > 0]
+    oos_trades = pd.concat(oos_frames, ignore_index=True) if oos_frames else pd.DataFrame()
+    oos_metrics = backtest.calculate_metrics(oos_trades)
+    return fold_df, oos_trades, oos_metrics
+
+
+def save_walk_forward(fold_df, oos_trades, oos_metrics, experiment, store=None):
+    """
+    walk-forward 결과를 백테스트 결과 저장소에 저장
+
+    fold 마다 run 1건 (최적 파라미터, test 구간 거래, train/test 지표) 을 저장하고,
+    전체 out-of-sample 지표는 fold run_id 목록을 파라미터로 갖는 run 1건으로 저장한다.
+    Returns:
+        (fold run_id 리스트, 전체 out-of-sample run_id)
+    """
+    store = store or get_backtest_store()
+    fold_run_ids = []
+    for record in fold_df.to_dict('records'):
+        if len(oos_trades) > 0:
+            trades = oos_trades[oos_trades['fold'] == record['fold']]
+        else:
+            trades = oos_trades
+        fold_run_ids.append(store.save_run(
+            trades, record, json.loads(record['best_params']), experiment=experiment,
+            date_range=(record['test_start'], record['test_end'])))
+    date_range = (fold_df['test_start'].min(), fold_df['test_end'].max())
+    oos_run_id = store.save_run(None, oos_metrics, {'fold_run_ids': fold_run_ids}, experiment=experiment,
+                                date_range=date_range)
+    return fold_run_ids, oos_run_id
+
+
+def main():
+    """메인 실행 함수"""
+    fold_df, oos_trades, oos_metrics = run_walk_forward()
+    if len(fold_df) == 0:
+        return
+    experiment = f"walk_forward_{datetime.datetime.now():%Y%m%d_%H%M%S}"
+    fold_run_ids, oos_run_id = save_walk_forward(fold_df, oos_trades, oos_metrics, experiment)
+    print(f"\nfold {len(fold_run_ids)}개 결과와 out-of-sample 결과(run {oos_run_id})가 "
+          f"백테스트 결과 저장소에 저장되었습니다. (experiment '{experiment}')")
+
+    print("\n=== Walk-Forward Out-of-Sample 결과 ===")
+    if oos_metrics:
+        print(f"총 거래: {oos_metrics['total_trades']}")
+        print(f"승률: {oos_metrics['win_rate']:.2%}")
+        print(f"평균 수익률: {oos_metrics['avg_return']:.2%}")
+        print(f"샤프 비율: {oos_metrics['sharpe_ratio']:.3f}")
+        print(f"총 수익률: {oos_metrics['total_return']:.2%}")
+    else:
+        print("거래가 없습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Daily Chart Cache - 스캐너용 일봉(ka10081) 캐시
+
+일봉은 장중에 오늘 봉만 바뀌므로 (종목, 기준일) 당 한 번만 조회해서 어제까지의 종가를 보관하고,
+오늘 봉은 거래량 순위 응답의 현재가로 채워 넣는다. VolumeScanner / Strategy2Analyzer 가 공용으로 사용.
+
+- 메모리 + 디스크(CACHE_DIR/<기준일>/<종목코드>.npz) 두 단계, 재시작해도 같은 날이면 API 호출 없음
+- 같은 종목을 동시에 요청하면 API 호출은 한 번 (진행 중인 조회를 공유)
+- 이동평균은 어제까지의 종가 합을 미리 계산해 두고 오늘 가격만 더해서 계산
+  (추세 비교용 며칠 전 이동평균, 최근 고점도 로드 시 한 번만 계산)
+"""
+
+import os
+import glob
+import shutil
+import asyncio
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+
+from utils.logger import get_logger
+from utils.indicators import sma
+
+logger = get_logger("daily_chart_cache")
+
+CACHE_DIR = os.path.join('data_collection', 'market_data', 'daily_chart_cache')
+CHART_BARS = 80                 # 조회 봉 수 (req_cnt)
+MA_PERIODS = (5, 10, 20, 60)    # 미리 계산하는 이동평균 기간
+MA_LOOKBACK = 2                 # 미리 계산하는 과거 이동평균 시점 (오늘 기준 몇 봉 전, 2 = 3일 전 봉)
+HIGH_BARS = 9                   # 미리 계산하는 최근 고점 봉 수 (오늘 포함 10일 고점)
+
+
+class DailyChart:
+    """기준일 전날까지의 일봉 종가 + 오늘 가격으로 계산하는 이동평균"""
+
+    def __init__(self, stock_code: str, base_dt: str, dates: np.ndarray, close: np.ndarray):
+        self.stock_code = stock_code
+        self.base_dt = base_dt
+        self.dates = dates
+        self.close = close
+        # 기간 n 이동평균 = (어제까지 n-1 개 종가 합 + 오늘 가격) / n
+        self._tail_sums = {n: float(close[len(close) - (n - 1):].sum())
+                           for n in MA_PERIODS if len(close) >= n - 1}
+        self._past_means = {n: self._past_mean(n, MA_LOOKBACK) for n in MA_PERIODS}
+        self._recent_high = float(close[-HIGH_BARS:].max()) if len(close) >= HIGH_BARS else float('nan')
+
+    def __len__(self):
+        return len(self.close)
+
+    def with_today(self, price: float) -> np.ndarray:
+        """오늘 가격을 마지막 봉으로 붙인 종가 배열"""
+        return np.append(self.close, float(price))
+
+    def moving_average(self, period: int, price: float) -> float:
+        """오늘 가격 포함 이동평균 (봉이 모자라면 NaN)"""
+        if period in self._tail_sums:
+            return (self._tail_sums[period] + float(price)) / period
+        if len(self.close) < period - 1:
+            return float('nan')
+        return float(sma(self.with_today(price), period)[-1])
+
+    def _past_mean(self, period: int, bars_ago: int) -> float:
+        end = len(self.close) + 1 - bars_ago  # 오늘 봉 인덱스 = len(close)
+        if bars_ago < 1 or end - period < 0:
+            return float('nan')
+        return float(self.close[end - period:end].mean())
+
+    def past_moving_average(self, period: int, bars_ago: int = MA_LOOKBACK) -> float:
+        """bars_ago 봉 전에 끝나는 이동평균 (어제까지의 종가만 사용, 봉이 모자라면 NaN)"""
+        if bars_ago == MA_LOOKBACK and period in self._past_means:
+            return self._past_means[period]
+        return self._past_mean(period, bars_ago)
+
+    def recent_high(self, bars: int = HIGH_BARS) -> float:
+        """어제까지 최근 bars 개 종가 최고가 (봉이 모자라면 NaN)"""
+        if bars == HIGH_BARS:
+            return self._recent_high
+        return float(self.close[-bars:].max()) if len(self.close) >= bars else float('nan')
+
+    def moving_averages(self, price: float) -> Dict[str, float]:
+        """MA5/MA10/MA20/MA60"""
+        return {f"MA{n}": self.moving_average(n, price) for n in MA_PERIODS}
+
+
+class DailyChartCache:
+    """(종목코드, 기준일) 별 일봉 캐시"""
+
+    def __init__(self, settings, transport=None, cache_dir=CACHE_DIR):
+        self.settings = settings
+        if transport is None:
+            from api.kiwoom_transport import get_kiwoom_transport
+            transport = get_kiwoom_transport(settings)
+        self.transport = transport
+        self.cache_dir = cache_dir
+        self._base_dt = None
+        self._memory: Dict[str, DailyChart] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    def _path(self, stock_code: str, base_dt: str) -> str:
+        return os.path.join(self.cache_dir, base_dt, f"{stock_code}.npz")
+
+    def _roll_day(self, base_dt: str):
+        """기준일이 바뀌면 메모리 캐시와 지난 날짜 디스크 캐시 정리"""
+        if base_dt == self._base_dt:
+            return
+        self._base_dt = base_dt
+        self._memory.clear()
+        self._pending.clear()
+        for day_dir in glob.glob(os.path.join(self.cache_dir, '*')):
+            if os.path.basename(day_dir) != base_dt:
+                shutil.rmtree(day_dir, ignore_errors=True)
+
+    def _load(self, stock_code: str, base_dt: str) -> Optional[DailyChart]:
+        try:
+            with np.load(self._path(stock_code, base_dt)) as data:
+                return DailyChart(stock_code, base_dt, data['dates'], data['close'])
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def _save(self, chart: DailyChart):
+        path = self._path(chart.stock_code, chart.base_dt)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + '.tmp.npz'
+            np.savez(tmp_path, dates=chart.dates, close=chart.close)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"일봉 캐시 저장 실패 ({chart.stock_code}): {e}")
+
+    async def _fetch(self, stock_code: str, base_dt: str) -> Optional[DailyChart]:
+        """일봉 조회 -> 기준일 전날까지의 봉만 DailyChart 로 (실패하면 None)"""
+        url = self.settings.get_api_url("daily_chart")
+        headers = self.settings.get_headers(tr_type="daily_chart")
+        data = {
+            "stk_cd": stock_code,
+            "base_dt": base_dt,
+            "upd_stkpc_tp": "1",
+            "req_cnt": CHART_BARS,
+        }
+        response = await self.transport.post(url, headers=headers, json_data=data)
+        if not response.ok:
+            return None
+        rows = [row for row in response.data.get('stk_dt_pole_chart_qry', []) if str(row.get('dt', '')) < base_dt]
+        rows.sort(key=lambda row: str(row.get('dt', '')))
+        dates = np.array([int(row['dt']) for row in rows], dtype=np.int32)
+        close = np.abs(np.array([int(row['cur_prc']) for row in rows], dtype=np.float64))
+        return DailyChart(stock_code, base_dt, dates, close)
+
+    async def get(self, stock_code: str, base_dt: str = None) -> Optional[DailyChart]:
+        """
+        일봉 캐시 조회 (메모리 -> 디스크 -> API 순서)
+
+        Args:
+            base_dt: 기준일 YYYYMMDD (None 이면 오늘)
+        Returns:
+            DailyChart (조회 실패 시 None, 실패는 캐시하지 않음)
+        """
+        base_dt = base_dt or datetime.now().strftime("%Y%m%d")
+        self._roll_day(base_dt)
+        chart = self._memory.get(stock_code)
+        if chart is not None:
+            return chart
+        if stock_code in self._pending:
+            return await asyncio.shield(self._pending[stock_code])
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[stock_code] = future
+        try:
+            chart = self._load(stock_code, base_dt)
+            if chart is None:
+                chart = await self._fetch(stock_code, base_dt)
+                if chart is not None:
+                    self._save(chart)
+            if chart is not None and self._base_dt == base_dt:
+                self._memory[stock_code] = chart
+            future.set_result(chart)
+            return chart
+        except Exception as e:
+            logger.error(f"일봉 조회 실패 ({stock_code}): {e}")
+            future.set_result(None)
+            return None
+        finally:
+            # 취소(CancelledError)된 경우에도 같은 종목을 기다리는 호출부가 멈추지 않도록 실패로 처리
+            if not future.done():
+                future.set_result(None)
+            if self._pending.get(stock_code) is future:
+                del self._pending[stock_code]
+
+
+# 전역 일봉 캐시 인스턴스
+_daily_chart_cache = None
+
+
+def get_daily_chart_cache(settings=None) -> DailyChartCache:
+    """전역 DailyChartCache (스캐너 공용)"""
+    global _daily_chart_cache
+    if _daily_chart_cache is None:
+        if settings is None:
+            from config.settings import get_settings
+            settings = get_settings()
+        _daily_chart_cache = DailyChartCache(settings)
+    return _daily_chart_cache
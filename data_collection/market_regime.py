@@ -0,0 +1,177 @@
+"""
+Market Regime - KOSPI 일봉 기반 시장상황 조회
+
+KOSPI_daily.csv 를 프로세스당 한 번만 읽어서 날짜 순 배열로 보관하고
+일별 수익률/변동성/시장국면(상승장/횡보장/하락장)을 날짜 배열 조인(searchsorted)으로 돌려준다.
+백테스트(Feature 계산)와 실시간 스캐너(VolumeScanner, Strategy2Analyzer)가 같이 사용한다.
+
+계산 결과는 CSV 옆 .regime.npz 로 캐시하고, CSV mtime/size 가 바뀌면 다시 계산한다.
+"""
+
+import os
+import json
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+KOSPI_PATH = os.path.join('data_collection', 'market_data', 'KOSPI_daily.csv')
+REGIME_VERSION = 1
+
+REGIME_MA_PERIOD = 20   # 시장국면 기준 이동평균 (20일선)
+REGIME_BAND = 0.01      # 20일선 대비 ±1% 이내는 횡보장
+
+REGIME_BULL, REGIME_NEUTRAL, REGIME_BEAR = 1, 0, -1
+REGIME_LABELS = {REGIME_BULL: '상승장', REGIME_NEUTRAL: '횡보장', REGIME_BEAR: '하락장'}
+
+_EPOCH = date(1970, 1, 1)
+_market_regimes = {}
+
+
+def _fingerprint(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _cache_path(path):
+    return os.path.splitext(path)[0] + '.regime.npz'
+
+
+def _to_days(dates):
+    """date/문자열/Timestamp 배열 -> 1970-01-01 기준 일수 (int64)"""
+    return pd.to_datetime(pd.Series(dates)).values.astype('datetime64[D]').astype(np.int64)
+
+
+class MarketRegime:
+    """날짜 순 KOSPI 수익률/변동성/시장국면 배열"""
+
+    def __init__(self, days, kospi_return, kospi_volatility, ma, regime):
+        self.days = days                      # int64, 1970-01-01 기준 일수 (오름차순)
+        self.kospi_return = kospi_return      # 전일 대비 수익률
+        self.kospi_volatility = kospi_volatility  # (고가-저가)/전일 종가
+        self.ma = ma                          # 종가 20일 이동평균
+        self.regime = regime                  # int8: 1 상승장, 0 횡보장, -1 하락장
+        self._frame = None
+
+    @classmethod
+    def from_prices(cls, dates, high, low, close):
+        """일봉 가격 -> 수익률/변동성/시장국면"""
+        days = _to_days(dates)
+        order = np.argsort(days, kind='stable')
+        days = days[order]
+        high, low, close = (np.asarray(a, dtype=np.float64)[order] for a in (high, low, close))
+
+        prev_close = np.r_[np.nan, close[:-1]]
+        kospi_return = close / prev_close - 1
+        kospi_volatility = (high - low) / prev_close
+        ma = pd.Series(close).rolling(REGIME_MA_PERIOD, min_periods=1).mean().to_numpy()
+        regime = np.where(close > ma * (1 + REGIME_BAND), REGIME_BULL,
+                          np.where(close < ma * (1 - REGIME_BAND), REGIME_BEAR, REGIME_NEUTRAL)).astype(np.int8)
+        return cls(days, kospi_return, kospi_volatility, ma, regime)
+
+    @classmethod
+    def from_csv(cls, path=KOSPI_PATH):
+        df = pd.read_csv(path)
+        return cls.from_prices(df['date'], df['high'], df['low'], df['close'])
+
+    @property
+    def frame(self):
+        """date(datetime.date), kospi_return, kospi_volatility, regime DataFrame (Feature 조인용)"""
+        if self._frame is None:
+            self._frame = pd.DataFrame({
+                'date': [_EPOCH + timedelta(days=int(d)) for d in self.days],
+                'kospi_return': self.kospi_return,
+                'kospi_volatility': self.kospi_volatility,
+                'regime': self.regime,
+            })
+        return self._frame
+
+    def lookup(self, dates):
+        """
+        날짜 배열과 같은 거래일 값 조인
+
+        Returns:
+            (kospi_return, kospi_volatility, regime, found) - 없는 날짜는 0 / 횡보장
+        """
+        days = _to_days(dates)
+        if len(self.days) == 0:
+            zeros = np.zeros(len(days))
+            return zeros, zeros.copy(), np.zeros(len(days), np.int8), np.zeros(len(days), bool)
+        pos = np.minimum(np.searchsorted(self.days, days), len(self.days) - 1)
+        found = self.days[pos] == days
+        return (np.where(found, self.kospi_return[pos], 0.0),
+                np.where(found, self.kospi_volatility[pos], 0.0),
+                np.where(found, self.regime[pos], REGIME_NEUTRAL).astype(np.int8),
+                found)
+
+    def asof(self, day=None):
+        """day(기본 오늘) 이전 가장 최근 거래일 시장상황 (없으면 None)"""
+        day = date.today() if day is None else day
+        pos = int(np.searchsorted(self.days, _to_days([day])[0], side='right')) - 1
+        if pos < 0:
+            return None
+        return {
+            'date': _EPOCH + timedelta(days=int(self.days[pos])),
+            'kospi_return': float(self.kospi_return[pos]),
+            'kospi_volatility': float(self.kospi_volatility[pos]),
+            'regime': int(self.regime[pos]),
+            'label': REGIME_LABELS[int(self.regime[pos])],
+        }
+
+    def save(self, path, source_fingerprint):
+        """계산 결과 캐시 파일 저장 (원자적 교체)"""
+        tmp_path = path + f'.{os.getpid()}.tmp.npz'
+        np.savez(tmp_path, days=self.days, kospi_return=self.kospi_return,
+                 kospi_volatility=self.kospi_volatility, ma=self.ma, regime=self.regime,
+                 meta=np.array(json.dumps({'version': REGIME_VERSION, 'source': source_fingerprint})))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, source_fingerprint):
+        """캐시 파일 로드 (없거나 원본이 바뀌었으면 None)"""
+        try:
+            with np.load(path) as data:
+                meta = json.loads(str(data['meta']))
+                if meta != {'version': REGIME_VERSION, 'source': source_fingerprint}:
+                    return None
+                return cls(data['days'], data['kospi_return'], data['kospi_volatility'], data['ma'], data['regime'])
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+def load_market_regime(path=KOSPI_PATH):
+    """캐시 파일이 최신이면 그대로, 아니면 CSV 에서 계산 후 캐시 저장"""
+    source = _fingerprint(path)
+    cache_path = _cache_path(path)
+    regime = MarketRegime.load(cache_path, source)
+    if regime is None:
+        regime = MarketRegime.from_csv(path)
+        try:
+            regime.save(cache_path, source)
+        except OSError:
+            pass
+    return regime
+
+
+def get_market_regime(path=KOSPI_PATH):
+    """프로세스 전역 시장상황 인스턴스 (CSV 가 바뀌면 다시 로드, 파일이 없으면 None)"""
+    try:
+        source = _fingerprint(path)
+    except OSError:
+        return None
+    cached = _market_regimes.get(path)
+    if cached is None or cached[0] != source:
+        _market_regimes[path] = (source, load_market_regime(path))
+    return _market_regimes[path][1]
+
+
+def current_regime(day=None, path=KOSPI_PATH):
+    """실시간 스캐너용: 오늘 기준 가장 최근 거래일 시장상황 dict (데이터 없으면 None)"""
+    regime = get_market_regime(path)
+    return regime.asof(day) if regime is not None else None
+
+
+def format_regime(market):
+    """current_regime() 결과 로그 문자열"""
+    return (f"{market['label']} (KOSPI {market['date']} 수익률 {market['kospi_return']:+.2%}, "
+            f"변동성 {market['kospi_volatility']:.2%})")
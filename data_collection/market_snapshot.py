@@ -0,0 +1,167 @@
+"""
+Market Snapshot - 거래량 급증 순위(ka10023) 공용 스냅샷
+
+틱마다 거래량 순위를 한 번만 조회해서 조회 시각이 붙은 불변 스냅샷으로 발행한다.
+VolumeScanner / Strategy2Analyzer 등 전략은 각자 조회하지 않고 스냅샷을 구독하므로
+전략이 늘어나도 순위 조회 횟수는 그대로다.
+
+- run(): snapshot_interval 마다 조회 -> 발행 (main.py 에서 태스크로 실행)
+- next_snapshot(after_tick): 구독용, after_tick 보다 새 스냅샷이 나올 때까지 대기
+  (처리가 늦어 여러 틱을 놓쳤으면 가장 최근 스냅샷을 바로 반환)
+- get(max_age): 단발 조회용, 최근 스냅샷이 max_age 보다 오래됐으면 새로 조회
+- 동시에 조회를 요청해도 API 호출은 한 번 (진행 중인 조회를 공유)
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Mapping, Optional, Tuple
+
+from utils.logger import get_logger
+
+logger = get_logger("market_snapshot")
+
+SNAPSHOT_INTERVAL = 30  # 기본 조회 간격 (초)
+
+# 거래량 급증 순위 조회 조건
+VOLUME_RANKING_QUERY = {
+    'mrkt_tp': '000',     # 전체 시장
+    'sort_tp': '1',       # 거래량 순
+    'tm_tp': '1',         # 1분 단위
+    'trde_qty_tp': '50',  # 상위 50개
+    'tm': '',
+    'stk_cnd': '20',      # 거래량 급증 조건
+    'pric_tp': '0',       # 전체 가격대
+    'stex_tp': '3',       # 코스피
+}
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """한 틱의 거래량 급증 순위 (불변 - 구독하는 전략끼리 공유)"""
+    tick: int                                       # 1부터 증가하는 발행 번호
+    timestamp: datetime                             # 조회 시각
+    volume_ranking: Tuple[Mapping[str, Any], ...]   # 순위 순서의 종목 항목 (읽기 전용)
+    monotonic: float = 0.0                          # 조회 시각 (time.monotonic, 경과 시간 계산용)
+
+    def age(self) -> float:
+        """조회 후 경과 시간 (초)"""
+        return time.monotonic() - self.monotonic
+
+
+class MarketSnapshotService:
+    """거래량 순위를 틱당 한 번 조회해서 구독자에게 발행"""
+
+    def __init__(self, settings, transport=None, interval: float = None):
+        self.settings = settings
+        if transport is None:
+            from api.kiwoom_transport import get_kiwoom_transport
+            transport = get_kiwoom_transport(settings)
+        self.transport = transport
+        if interval is None:
+            volume_config = getattr(settings, 'VOLUME_SCANNING', {})
+            interval = volume_config.get('snapshot_interval', volume_config.get('scan_interval', SNAPSHOT_INTERVAL))
+        self.interval = interval
+
+        self._latest: Optional[MarketSnapshot] = None
+        self._tick = 0
+        self._pending: Optional[asyncio.Future] = None
+        self._next: Optional[asyncio.Future] = None
+
+    @property
+    def latest(self) -> Optional[MarketSnapshot]:
+        """가장 최근 발행된 스냅샷 (아직 없으면 None)"""
+        return self._latest
+
+    async def _fetch(self) -> Optional[Tuple[Mapping[str, Any], ...]]:
+        """거래량 급증 순위 조회 (실패하면 None)"""
+        url = self.settings.get_api_url("volume_ranking")
+        headers = self.settings.get_headers(tr_type="volume_ranking")
+        # 429 재시도/속도 제한은 전송 계층에서 처리
+        response = await self.transport.post(url, headers=headers, json_data=dict(VOLUME_RANKING_QUERY))
+        if not response.ok:
+            logger.error(f"거래량 순위 조회 실패: {response.status}")
+            return None
+        result = response.data
+        if result.get("return_code") != 0:
+            logger.error(f"API 오류: {result.get('return_msg')}")
+            return None
+        return tuple(MappingProxyType(dict(item)) for item in result.get("trde_qty_sdnin", []))
+
+    def _publish(self, volume_ranking: Tuple[Mapping[str, Any], ...]) -> MarketSnapshot:
+        self._tick += 1
+        snapshot = MarketSnapshot(self._tick, datetime.now(), volume_ranking, time.monotonic())
+        self._latest = snapshot
+        if self._next is not None and not self._next.done():
+            self._next.set_result(snapshot)
+        self._next = None
+        return snapshot
+
+    async def refresh(self) -> Optional[MarketSnapshot]:
+        """
+        새로 조회해서 발행 (진행 중인 조회가 있으면 그 결과를 공유)
+
+        Returns:
+            새 스냅샷 (조회 실패 시 None, 실패는 발행하지 않음)
+        """
+        if self._pending is not None and not self._pending.done() \
+                and self._pending.get_loop() is asyncio.get_running_loop():
+            return await asyncio.shield(self._pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending = future
+        snapshot = None
+        try:
+            volume_ranking = await self._fetch()
+            if volume_ranking is not None:
+                snapshot = self._publish(volume_ranking)
+        except Exception as e:
+            logger.error(f"거래량 순위 조회 중 오류: {e}")
+        finally:
+            future.set_result(snapshot)
+            if self._pending is future:
+                self._pending = None
+        return snapshot
+
+    async def get(self, max_age: float = None) -> Optional[MarketSnapshot]:
+        """최근 스냅샷 (max_age 초보다 오래됐거나 없으면 새로 조회, 기본 max_age 는 조회 간격)"""
+        max_age = self.interval if max_age is None else max_age
+        if self._latest is not None and self._latest.age() < max_age:
+            return self._latest
+        return await self.refresh()
+
+    async def next_snapshot(self, after_tick: int = 0) -> MarketSnapshot:
+        """after_tick 보다 새 스냅샷을 기다려서 반환 (구독용)"""
+        if self._latest is not None and self._latest.tick > after_tick:
+            return self._latest
+        loop = asyncio.get_running_loop()
+        if self._next is None or self._next.done() or self._next.get_loop() is not loop:
+            self._next = loop.create_future()
+        return await asyncio.shield(self._next)
+
+    async def run(self):
+        """조회 간격마다 스냅샷 발행 (조회 시간은 간격에 포함)"""
+        logger.info(f"시장 스냅샷 발행 시작 (간격 {self.interval}초)")
+        while True:
+            started = time.monotonic()
+            snapshot = await self.refresh()
+            if snapshot is None:
+                logger.warning("거래량 순위 스냅샷 발행 실패 - 다음 틱에 재시도")
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+# 전역 스냅샷 서비스 인스턴스
+_market_snapshot_service = None
+
+
+def get_market_snapshot_service(settings=None) -> MarketSnapshotService:
+    """전역 MarketSnapshotService (전략 공용)"""
+    global _market_snapshot_service
+    if _market_snapshot_service is None:
+        if settings is None:
+            from config.settings import get_settings
+            settings = get_settings()
+        _market_snapshot_service = MarketSnapshotService(settings)
+    return _market_snapshot_service
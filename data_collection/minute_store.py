@@ -0,0 +1,394 @@
+"""
+Minute Bar Store - 1분봉 컬럼형 저장소
+
+minute_data/*_1min.csv 를 한 번만 파싱해서 종목별 디렉토리에 컬럼 단위 .npy 파일로 저장하고,
+백테스트에서는 memory-map 으로 필요한 종목/기간만 잘라서 읽는다.
+
+저장 구조 (종목코드/거래일 파티션):
+    <store_path>/<stock_code>/meta.json      # 원본 CSV mtime/size, 컬럼 순서
+    <store_path>/<stock_code>/datetime.npy   # int64 (ns)
+    <store_path>/<stock_code>/<column>.npy   # open/high/low/close/volume ...
+    <store_path>/<stock_code>/days.npy       # 거래일 ordinal (1970-01-01 기준 일수, 오름차순)
+    <store_path>/<stock_code>/day_offsets.npy  # 거래일별 시작 row (len = 거래일 수 + 1)
+    <store_path>/<stock_code>/tod.npy        # 장중 시각 (자정 기준 초)
+    <store_path>/<stock_code>/<N>m/          # N분봉 (TIMEFRAMES, 적재 시 1분봉에서 한 번만 집계)
+        days.npy / day_offsets.npy / minute.npy / open..volume.npy / bars.npy
+
+공용 1분봉 스키마 (load / read_minute_csv 결과, compact_minute_frame):
+    datetime            datetime64[ns]
+    stock_code          category
+    open/high/low/close int32 (원 단위 정수가 아니면 float64 유지)
+    volume              uint32 (범위를 넘으면 int64)
+    day                 int32  거래일 ordinal (1970-01-01 기준 일수)
+    minute              int32  장중 시각 (자정 기준 분, 09:00 = 540)
+행마다 date/time 객체를 만들지 않으므로 정렬/그룹핑은 day, minute 정수 컬럼으로 한다.
+
+N분봉 (load_bars / resample_frame 결과) 은 같은 스키마에 bars 컬럼(int32, 포함된 1분봉 수)이 붙고
+datetime/minute 은 봉 시작 시각이다. 봉 경계는 거래일별로 09:00 기준 N분 단위
+(5분봉: 09:00, 09:05, ...) 이므로 10~11시 구간은 60분봉 하나와 같다.
+"""
+
+import os
+import sys
+import glob
+import json
+import shutil
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+STORE_DIRNAME = "columnar"
+STORE_VERSION = 3
+META_FILE = "meta.json"
+EPOCH = date(1970, 1, 1)
+PRICE_COLUMNS = ('open', 'high', 'low', 'close')
+NS_PER_DAY = 86400 * 10**9
+TIMEFRAMES = (3, 5, 10, 15, 30, 60)  # 저장소에 미리 집계해 두는 N분봉
+SESSION_OPEN = 540                   # 봉 경계 기준 시각 (09:00, 자정 기준 분)
+
+
+def default_store_path(data_path):
+    """data_path 아래 기본 저장소 경로"""
+    return os.path.join(data_path, STORE_DIRNAME)
+
+
+def code_from_path(file_path):
+    """'005930_1min.csv' -> '005930'"""
+    return os.path.basename(file_path).split('_')[0]
+
+
+def to_day_ordinal(value):
+    """날짜(문자열/date/Timestamp) -> 1970-01-01 기준 일수"""
+    return int(np.datetime64(pd.to_datetime(value).date(), 'D').astype(np.int64))
+
+
+def minute_of_day(hhmm):
+    """'09:30' -> 570 (자정 기준 분, 공용 스키마 minute 컬럼과 비교용)"""
+    hour, minute = hhmm.split(':')
+    return int(hour) * 60 + int(minute)
+
+
+def ordinal_dates(day_ordinals):
+    """거래일 ordinal 배열 -> datetime.date 객체 배열"""
+    return np.asarray(day_ordinals, dtype=np.int64).astype('datetime64[D]').astype(object)
+
+
+def _compact_values(column, values):
+    """가격은 int32, 거래량은 uint32 로 축소 (값이 범위를 넘거나 정수가 아니면 그대로)"""
+    values = np.asarray(values)
+    if len(values) == 0 or values.dtype.kind not in 'iuf':
+        return values
+    if column in PRICE_COLUMNS:
+        target = np.int32
+    elif column == 'volume':
+        target = np.uint32
+    else:
+        return values
+    info = np.iinfo(target)
+    if values.dtype.kind == 'f' and not (np.isfinite(values).all() and (values == np.round(values)).all()):
+        return values
+    if values.min() < info.min or values.max() > info.max:
+        # 범위를 넘는 정수 거래량만 int64, 나머지는 원래 dtype
+        return values.astype(np.int64) if column == 'volume' and values.dtype.kind in 'iu' else values
+    return values.astype(target)
+
+
+def widen(values):
+    """compact 스키마 값(int32 가격, uint32 거래량)을 계산용 dtype(int64/float64)으로 확장"""
+    values = np.asarray(values)
+    return values.astype(np.int64) if values.dtype.kind in 'iu' else values.astype(np.float64, copy=False)
+
+
+def compact_minute_frame(df, stock_code, categories=None):
+    """
+    1분봉 DataFrame -> 공용 compact 스키마 (datetime 으로 정렬되어 있어야 함)
+
+    Args:
+        categories: stock_code 카테고리 목록 (여러 종목을 concat 할 때 같은 목록을 넘겨야 category 유지)
+    """
+    categories = list(categories) if categories is not None else [stock_code]
+    codes = np.full(len(df), categories.index(stock_code), dtype=np.int32)
+    df['stock_code'] = pd.Categorical.from_codes(codes, categories=categories)
+    for col in PRICE_COLUMNS + ('volume',):
+        if col in df.columns:
+            df[col] = _compact_values(col, df[col].to_numpy())
+    dt_ns = df['datetime'].values.astype('datetime64[ns]').astype(np.int64)
+    df['day'] = (dt_ns // NS_PER_DAY).astype(np.int32)
+    df['minute'] = ((dt_ns % NS_PER_DAY) // (60 * 10**9)).astype(np.int32)
+    return df
+
+
+def bar_groups(day, minute, timeframe, codes=None):
+    """
+    정렬된 1분봉의 N분봉 그룹 시작 row 와 봉 시작 분
+
+    Returns:
+        (starts, start_minute) - starts 는 그룹 첫 row, start_minute 은 그룹별 봉 시작 분
+    """
+    minute = np.asarray(minute, dtype=np.int64)
+    bucket = SESSION_OPEN + (minute - SESSION_OPEN) // timeframe * timeframe
+    day = np.asarray(day)
+    if len(minute) == 0:
+        return np.zeros(0, dtype=np.int64), bucket
+    change = (day[1:] != day[:-1]) | (bucket[1:] != bucket[:-1])
+    if codes is not None:
+        codes = np.asarray(codes)
+        change |= codes[1:] != codes[:-1]
+    starts = np.r_[0, np.flatnonzero(change) + 1].astype(np.int64)
+    return starts, bucket[starts]
+
+
+def resample_arrays(day, minute, columns, timeframe, codes=None):
+    """
+    1분봉 배열 -> N분봉 배열 dict (day, minute, open/high/low/close/volume, bars)
+
+    Args:
+        columns: {'open': ..., 'high': ..., 'low': ..., 'close': ..., 'volume': ...} (NaN 없는 정렬된 1분봉)
+        codes: 여러 종목이 섞여 있으면 종목 코드 배열 (종목이 바뀌면 새 봉)
+    """
+    starts, start_minute = bar_groups(day, minute, timeframe, codes)
+    ends = np.r_[starts[1:], len(minute)].astype(np.int64)
+    bars = {
+        'day': np.asarray(day)[starts].astype(np.int32),
+        'minute': start_minute.astype(np.int32),
+        'bars': (ends - starts).astype(np.int32),
+    }
+    if len(starts) == 0:
+        for col in PRICE_COLUMNS + ('volume',):
+            bars[col] = np.asarray(columns[col])[:0]
+        return bars, starts
+    bars['open'] = np.asarray(columns['open'])[starts]
+    bars['high'] = np.maximum.reduceat(np.asarray(columns['high']), starts)
+    bars['low'] = np.minimum.reduceat(np.asarray(columns['low']), starts)
+    bars['close'] = np.asarray(columns['close'])[ends - 1]
+    bars['volume'] = _compact_values('volume', np.add.reduceat(widen(columns['volume']), starts))
+    return bars, starts
+
+
+def resample_frame(df, timeframe):
+    """공용 1분봉 DataFrame(datetime 순, 여러 종목이면 종목별로 모여 있어야 함) -> N분봉 DataFrame"""
+    codes = df['stock_code'].cat.codes.to_numpy() if 'stock_code' in df else None
+    columns = {col: df[col].to_numpy() for col in PRICE_COLUMNS + ('volume',)}
+    bars, starts = resample_arrays(df['day'].to_numpy(), df['minute'].to_numpy(), columns, timeframe, codes)
+    dt_ns = bars['day'].astype(np.int64) * NS_PER_DAY + bars['minute'].astype(np.int64) * 60 * 10**9
+    out = {'datetime': dt_ns.view('datetime64[ns]')}
+    if codes is not None:
+        out['stock_code'] = df['stock_code'].take(starts).to_numpy()
+    out.update((col, bars[col]) for col in PRICE_COLUMNS + ('volume', 'day', 'minute', 'bars'))
+    return pd.DataFrame(out)
+
+
+def read_minute_csv(csv_path, date_range=None, categories=None):
+    """저장소 없이 CSV 를 직접 읽어서 공용 compact 스키마로 반환"""
+    df = pd.read_csv(csv_path)
+    df['datetime'] = pd.to_datetime(df['datetime'], errors='coerce')
+    df = df.dropna(subset=['datetime']).sort_values('datetime', kind='stable').reset_index(drop=True)
+    df = compact_minute_frame(df, code_from_path(csv_path), categories)
+    if date_range is not None:
+        start, end = to_day_ordinal(date_range[0]), to_day_ordinal(date_range[1])
+        df = df[(df['day'] >= start) & (df['day'] <= end)].reset_index(drop=True)
+    return df
+
+
+class MinuteBarStore:
+    """종목/거래일 파티션 1분봉 컬럼 저장소"""
+
+    def __init__(self, store_path):
+        self.store_path = store_path
+
+    def _stock_dir(self, stock_code):
+        return os.path.join(self.store_path, stock_code)
+
+    def read_meta(self, stock_code):
+        """저장된 메타데이터 (없으면 None)"""
+        meta_path = os.path.join(self._stock_dir(stock_code), META_FILE)
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def is_fresh(self, stock_code, csv_path):
+        """원본 CSV 가 바뀌지 않았으면 True"""
+        meta = self.read_meta(stock_code)
+        if meta is None or meta.get('version') != STORE_VERSION:
+            return False
+        stat = os.stat(csv_path)
+        return meta['source_mtime_ns'] == stat.st_mtime_ns and meta['source_size'] == stat.st_size
+
+    def ingest_file(self, csv_path):
+        """CSV 한 개를 파싱해서 저장소에 기록 (기존 파티션은 교체)"""
+        stock_code = code_from_path(csv_path)
+        stat = os.stat(csv_path)
+        df = pd.read_csv(csv_path)
+        df['datetime'] = pd.to_datetime(df['datetime'])
+        df = df.sort_values('datetime', kind='stable').reset_index(drop=True)
+
+        stock_dir = self._stock_dir(stock_code)
+        if os.path.exists(stock_dir):
+            shutil.rmtree(stock_dir)
+        os.makedirs(stock_dir)
+
+        dt_ns = df['datetime'].values.astype('datetime64[ns]').astype(np.int64)
+        day_ord = (dt_ns // NS_PER_DAY).astype(np.int32)
+        tod = ((dt_ns // 10**9) % 86400).astype(np.int32)
+        days, starts = np.unique(day_ord, return_index=True)
+        offsets = np.append(starts, len(df)).astype(np.int64)
+
+        np.save(os.path.join(stock_dir, 'datetime.npy'), dt_ns)
+        np.save(os.path.join(stock_dir, 'days.npy'), days)
+        np.save(os.path.join(stock_dir, 'day_offsets.npy'), offsets)
+        np.save(os.path.join(stock_dir, 'tod.npy'), tod)
+
+        columns = []
+        for col in df.columns:
+            if col == 'datetime' or col == 'stock_code':
+                columns.append(col)
+                continue
+            values = _compact_values(col, df[col].values)
+            if values.dtype == object:
+                values = values.astype(str)
+            np.save(os.path.join(stock_dir, f'{col}.npy'), values)
+            columns.append(col)
+
+        timeframes = []
+        if all(col in df.columns for col in PRICE_COLUMNS + ('volume',)):
+            timeframes = self._write_bars(stock_dir, df, day_ord, (tod // 60).astype(np.int32))
+
+        # meta.json 은 마지막에 기록 (meta 가 있어야 완성된 파티션으로 인정)
+        meta = {
+            'version': STORE_VERSION,
+            'stock_code': stock_code,
+            'source': os.path.abspath(csv_path),
+            'source_mtime_ns': stat.st_mtime_ns,
+            'source_size': stat.st_size,
+            'rows': int(len(df)),
+            'columns': columns,
+            'timeframes': timeframes,
+            'first_day': int(days[0]) if len(days) else None,
+            'last_day': int(days[-1]) if len(days) else None,
+        }
+        with open(os.path.join(stock_dir, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        return meta
+
+    def _write_bars(self, stock_dir, df, day_ord, minute):
+        """TIMEFRAMES N분봉을 <stock_dir>/<N>m/ 에 기록 (NaN 봉이 있는 가격 컬럼은 제외하고 집계)"""
+        valid = df[list(PRICE_COLUMNS) + ['volume']].notna().all(axis=1).to_numpy()
+        columns = {col: _compact_values(col, df[col].to_numpy()[valid]) for col in PRICE_COLUMNS + ('volume',)}
+        for timeframe in TIMEFRAMES:
+            bars, _ = resample_arrays(day_ord[valid], minute[valid], columns, timeframe)
+            days, starts = np.unique(bars['day'], return_index=True)
+            tf_dir = os.path.join(stock_dir, f'{timeframe}m')
+            os.makedirs(tf_dir)
+            np.save(os.path.join(tf_dir, 'days.npy'), days)
+            np.save(os.path.join(tf_dir, 'day_offsets.npy'), np.append(starts, len(bars['day'])).astype(np.int64))
+            for col in PRICE_COLUMNS + ('volume', 'minute', 'bars'):
+                np.save(os.path.join(tf_dir, f'{col}.npy'), bars[col])
+        return list(TIMEFRAMES)
+
+    def ensure(self, csv_files):
+        """없거나 오래된 파티션만 다시 적재. 적재한 파일 수 반환"""
+        ingested = 0
+        for csv_path in csv_files:
+            if not self.is_fresh(code_from_path(csv_path), csv_path):
+                self.ingest_file(csv_path)
+                ingested += 1
+        return ingested
+
+    def day_counts(self, stock_code):
+        """거래일 ordinal 배열과 거래일별 봉 개수"""
+        stock_dir = self._stock_dir(stock_code)
+        days = np.load(os.path.join(stock_dir, 'days.npy'))
+        offsets = np.load(os.path.join(stock_dir, 'day_offsets.npy'))
+        return days, np.diff(offsets)
+
+    def load(self, stock_code, date_range=None, categories=None):
+        """종목 하나를 기간 조건으로 잘라서 공용 compact 스키마 DataFrame 으로 반환"""
+        meta = self.read_meta(stock_code)
+        if meta is None:
+            raise FileNotFoundError(f"저장소에 없는 종목: {stock_code}")
+        stock_dir = self._stock_dir(stock_code)
+
+        def column(name):
+            return np.load(os.path.join(stock_dir, f'{name}.npy'), mmap_mode='r')
+
+        lo, hi = _row_range(column('days'), column('day_offsets'), date_range)
+
+        data = {}
+        for col in meta['columns']:
+            if col == 'stock_code':
+                data[col] = np.zeros(hi - lo, dtype=np.int8)  # compact_minute_frame 에서 category 로 교체
+            elif col == 'datetime':
+                data[col] = np.array(column('datetime')[lo:hi]).view('datetime64[ns]')
+            else:
+                data[col] = np.array(column(col)[lo:hi])
+        df = pd.DataFrame(data, columns=meta['columns'])
+        return compact_minute_frame(df, stock_code, categories)
+
+    def load_bars(self, stock_code, timeframe, date_range=None, categories=None):
+        """
+        종목 하나의 N분봉을 기간 조건으로 잘라서 반환 (적재 시 집계해 둔 값, 1 이면 load 와 같음)
+
+        Returns:
+            datetime(봉 시작), stock_code, open/high/low/close, volume, day, minute, bars 컬럼 DataFrame
+        """
+        if timeframe == 1:
+            return self.load(stock_code, date_range, categories)
+        meta = self.read_meta(stock_code)
+        if meta is None:
+            raise FileNotFoundError(f"저장소에 없는 종목: {stock_code}")
+        if timeframe not in meta.get('timeframes', []):
+            raise ValueError(f"저장소에 없는 봉 단위: {timeframe}분 (지원: {meta.get('timeframes', [])})")
+        tf_dir = os.path.join(self._stock_dir(stock_code), f'{timeframe}m')
+
+        def column(name):
+            return np.load(os.path.join(tf_dir, f'{name}.npy'), mmap_mode='r')
+
+        days = column('days')
+        lo, hi = _row_range(days, column('day_offsets'), date_range)
+        day = np.repeat(np.asarray(days), np.diff(column('day_offsets')))[lo:hi].astype(np.int32)
+        minute = np.array(column('minute')[lo:hi])
+        dt_ns = day.astype(np.int64) * NS_PER_DAY + minute.astype(np.int64) * 60 * 10**9
+        categories = list(categories) if categories is not None else [stock_code]
+        codes = np.full(hi - lo, categories.index(stock_code), dtype=np.int32)
+        data = {
+            'datetime': dt_ns.view('datetime64[ns]'),
+            'stock_code': pd.Categorical.from_codes(codes, categories=categories),
+        }
+        for col in PRICE_COLUMNS + ('volume',):
+            data[col] = np.array(column(col)[lo:hi])
+        data.update(day=day, minute=minute, bars=np.array(column('bars')[lo:hi]))
+        return pd.DataFrame(data)
+
+
+def _row_range(days, offsets, date_range):
+    """거래일 파티션에서 date_range 에 해당하는 row 구간 [lo, hi)"""
+    start_day, end_day = 0, len(days)
+    if date_range is not None:
+        start, end = date_range
+        start_day = int(np.searchsorted(days, to_day_ordinal(start), side='left'))
+        end_day = int(np.searchsorted(days, to_day_ordinal(end), side='right'))
+    end_day = max(end_day, start_day)
+    return int(offsets[start_day]), int(offsets[end_day])
+
+
+def ingest_directory(data_path="minute_data", store_path=None, force=False):
+    """minute_data 전체를 한 번에 저장소로 변환"""
+    store = MinuteBarStore(store_path or default_store_path(data_path))
+    csv_files = sorted(glob.glob(os.path.join(data_path, "*_1min.csv")))
+    ingested = 0
+    for csv_path in csv_files:
+        try:
+            if force or not store.is_fresh(code_from_path(csv_path), csv_path):
+                store.ingest_file(csv_path)
+                ingested += 1
+        except Exception as e:
+            print(f"에러 - {csv_path}: {e}")
+    print(f"저장소 적재 완료: {ingested}/{len(csv_files)} 파일 -> {store.store_path}")
+    return ingested
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    ingest_directory(args[0] if args else "minute_data", force='--force' in sys.argv)
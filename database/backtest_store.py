@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Backtest Result Store
+백테스트 실행/거래/성과 지표를 SQLite 테이블에 저장하고 조회
+
+실행(run) 단위로 run_id 를 발급하고 파라미터 해시, 코드 버전(git commit)을 같이 기록한다.
+거래는 stock_code/date/exit_reason 인덱스로 조회하고, 여러 실행 비교는 지표 테이블 한 번 조회로 끝낸다.
+스크립트마다 다른 거래 컬럼명(stock/buy_time/return/sell_reason 등)은 공용 컬럼으로 맞추고
+나머지 컬럼은 extra(JSON) 에 보관한다.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.logger import get_logger
+
+DEFAULT_DB_PATH = "database/backtest_results.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS backtest_runs (
+    run_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    experiment TEXT,
+    param_hash TEXT NOT NULL,
+    parameters TEXT NOT NULL,
+    code_version TEXT NOT NULL,
+    date_from TEXT,
+    date_to TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_backtest_runs_param ON backtest_runs(param_hash, code_version);
+CREATE INDEX IF NOT EXISTS idx_backtest_runs_strategy ON backtest_runs(strategy, created_at);
+
+CREATE TABLE IF NOT EXISTS backtest_trades (
+    run_id TEXT NOT NULL REFERENCES backtest_runs(run_id),
+    stock_code TEXT,
+    date TEXT,
+    entry_time TEXT,
+    exit_time TEXT,
+    entry_price REAL,
+    exit_price REAL,
+    pnl REAL,
+    exit_reason TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_backtest_trades_run ON backtest_trades(run_id);
+CREATE INDEX IF NOT EXISTS idx_backtest_trades_stock ON backtest_trades(stock_code, date);
+CREATE INDEX IF NOT EXISTS idx_backtest_trades_date ON backtest_trades(date);
+CREATE INDEX IF NOT EXISTS idx_backtest_trades_reason ON backtest_trades(exit_reason);
+
+CREATE TABLE IF NOT EXISTS backtest_metrics (
+    run_id TEXT NOT NULL REFERENCES backtest_runs(run_id),
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, name)
+);
+"""
+
+TRADE_COLUMNS = ['stock_code', 'date', 'entry_time', 'exit_time', 'entry_price', 'exit_price', 'pnl', 'exit_reason']
+
+# 스크립트별 거래 컬럼명 -> 공용 컬럼명
+TRADE_ALIASES = {
+    'stock': 'stock_code',
+    'buy_time': 'entry_time',
+    'sell_time': 'exit_time',
+    'buy_price': 'entry_price',
+    'sell_price': 'exit_price',
+    'return': 'pnl',
+    'sell_reason': 'exit_reason',
+}
+
+_code_version = None
+
+
+def code_version() -> str:
+    """현재 git commit (short hash, git 이 없으면 'unknown')"""
+    global _code_version
+    if _code_version is None:
+        try:
+            _code_version = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                capture_output=True, text=True, timeout=5, check=True).stdout.strip() or 'unknown'
+        except (OSError, subprocess.SubprocessError):
+            _code_version = 'unknown'
+    return _code_version
+
+
+def _json_default(value):
+    """numpy/pandas 값 JSON 변환"""
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def param_hash(parameters: Optional[Dict]) -> str:
+    """파라미터 dict 해시 (키 순서 무관)"""
+    raw = json.dumps(parameters or {}, sort_keys=True, default=_json_default)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def _text_column(series: pd.Series, unit: str = 's') -> list:
+    """문자열/날짜/시각 컬럼 -> 문자열 리스트 (날짜/시각은 ISO 형식 unit 단위까지, NaN 은 None)"""
+    missing = series.isna().to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = series.to_numpy().astype(f'datetime64[{unit}]')
+        text = np.datetime_as_string(values, unit=unit).astype(object)
+    else:
+        text = series.astype(str).to_numpy(dtype=object)
+    text[missing] = None
+    return text.tolist()
+
+
+def _float_column(series: pd.Series) -> list:
+    values = pd.to_numeric(series, errors='coerce').astype(np.float64)
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+class BacktestResultStore:
+    """백테스트 결과 SQLite 저장소"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.logger = get_logger("backtest_store")
+        with self.get_connection() as conn:
+            conn.executescript(SCHEMA)
+            conn.commit()
+
+    @contextmanager
+    def get_connection(self):
+        """데이터베이스 연결 컨텍스트 매니저"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            yield conn
+        except Exception as e:
+            self.logger.error(f"백테스트 결과 저장소 오류: {e}")
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    # ==================== 저장 ====================
+
+    def save_run(self, trades_df: Optional[pd.DataFrame] = None, metrics: Optional[Dict] = None,
+                 parameters: Optional[Dict] = None, strategy: str = "gradual_rise",
+                 experiment: Optional[str] = None, date_range: Optional[Iterable] = None) -> str:
+        """
+        실행 1건 저장 (run + 거래 + 지표를 한 트랜잭션으로)
+
+        Args:
+            trades_df: 거래 DataFrame (공용 컬럼 또는 TRADE_ALIASES 컬럼명)
+            metrics: 성과 지표 dict (숫자 값만 저장)
+            experiment: 같은 실험(배치/반복 실행)을 묶는 이름
+        Returns:
+            run_id
+        """
+        run_id = uuid.uuid4().hex
+        date_from, date_to = (str(d) for d in date_range) if date_range is not None else (None, None)
+        with self.get_connection() as conn:
+            conn.execute(
+                "INSERT INTO backtest_runs (run_id, created_at, strategy, experiment, param_hash, parameters, "
+                "code_version, date_from, date_to) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, datetime.now().isoformat(timespec='seconds'), strategy, experiment,
+                 param_hash(parameters), json.dumps(parameters or {}, sort_keys=True, default=_json_default),
+                 code_version(), date_from, date_to))
+            if trades_df is not None and len(trades_df) > 0:
+                conn.executemany(
+                    f"INSERT INTO backtest_trades (run_id, {', '.join(TRADE_COLUMNS)}, extra) "
+                    f"VALUES (?, {', '.join('?' * len(TRADE_COLUMNS))}, ?)",
+                    self._trade_rows(run_id, trades_df))
+            if metrics:
+                conn.executemany(
+                    "INSERT INTO backtest_metrics (run_id, name, value) VALUES (?, ?, ?)",
+                    [(run_id, name, float(value)) for name, value in metrics.items()
+                     if isinstance(value, (int, float, np.number)) and not isinstance(value, bool)])
+            conn.commit()
+        self.logger.info(f"백테스트 결과 저장: {run_id} ({strategy}, 거래 {0 if trades_df is None else len(trades_df)} 건)")
+        return run_id
+
+    def _trade_rows(self, run_id: str, trades_df: pd.DataFrame):
+        """거래 DataFrame -> executemany 용 row 튜플 (컬럼 단위로 변환)"""
+        df = trades_df.rename(columns={k: v for k, v in TRADE_ALIASES.items() if v not in trades_df})
+        if 'date' not in df and 'entry_time' in df:
+            df['date'] = pd.to_datetime(df['entry_time']).dt.normalize()
+        n = len(df)
+        columns = []
+        for col in TRADE_COLUMNS:
+            if col not in df:
+                columns.append([None] * n)
+            elif col in ('entry_price', 'exit_price', 'pnl'):
+                columns.append(_float_column(df[col]))
+            elif col == 'date':
+                # 기간 조회(BETWEEN)가 문자열 비교이므로 날짜만 저장
+                columns.append(_text_column(pd.to_datetime(df[col]), 'D'))
+            else:
+                columns.append(_text_column(df[col]))
+        rest = [c for c in df.columns if c not in TRADE_COLUMNS]
+        if rest:
+            extra = df[rest].to_json(orient='records', lines=True, date_format='iso').splitlines()
+        else:
+            extra = [None] * n
+        return zip([run_id] * n, *columns, extra)
+
+    # ==================== 조회 ====================
+
+    def list_runs(self, strategy: Optional[str] = None, experiment: Optional[str] = None,
+                  param_hash: Optional[str] = None) -> pd.DataFrame:
+        """실행 목록 (최신순)"""
+        where, args = self._where({'strategy': strategy, 'experiment': experiment, 'param_hash': param_hash})
+        with self.get_connection() as conn:
+            return pd.read_sql_query(f"SELECT * FROM backtest_runs{where} ORDER BY created_at DESC, rowid DESC",
+                                     conn, params=args)
+
+    def latest_run_id(self, strategy: Optional[str] = None) -> Optional[str]:
+        """가장 최근 실행 run_id (없으면 None)"""
+        runs = self.list_runs(strategy=strategy)
+        return runs['run_id'].iloc[0] if len(runs) else None
+
+    def load_trades(self, run_id: Optional[str] = None, stock_code: Optional[str] = None,
+                    date_range: Optional[Iterable] = None, exit_reason: Optional[str] = None,
+                    with_extra: bool = False) -> pd.DataFrame:
+        """거래 조회 (조건은 인덱스 컬럼으로 필터, 저장 순서 유지)"""
+        where, args = self._where({'run_id': run_id, 'stock_code': stock_code, 'exit_reason': exit_reason})
+        if date_range is not None:
+            start, end = (str(pd.to_datetime(d).date()) for d in date_range)
+            where += (" AND" if where else " WHERE") + " date BETWEEN ? AND ?"
+            args += [start, end]
+        columns = ', '.join(['run_id'] + TRADE_COLUMNS + (['extra'] if with_extra else []))
+        with self.get_connection() as conn:
+            df = pd.read_sql_query(f"SELECT {columns} FROM backtest_trades{where} ORDER BY rowid", conn, params=args)
+        for col in ('date', 'entry_time', 'exit_time'):
+            df[col] = pd.to_datetime(df[col])
+        if with_extra and len(df):
+            extra = pd.DataFrame([json.loads(e) if e else {} for e in df.pop('extra')], index=df.index)
+            df = df.join(extra)
+        return df
+
+    def load_metrics(self, run_ids: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """실행별 지표 (run_id 행 x 지표 열) + 파라미터 해시/코드 버전"""
+        query = ("SELECT m.run_id, m.name, m.value, r.param_hash, r.code_version, r.created_at "
+                 "FROM backtest_metrics m JOIN backtest_runs r ON r.run_id = m.run_id")
+        args = []
+        if run_ids is not None:
+            run_ids = list(run_ids)
+            query += f" WHERE m.run_id IN ({', '.join('?' * len(run_ids))})"
+            args = run_ids
+        with self.get_connection() as conn:
+            long = pd.read_sql_query(query, conn, params=args)
+        if len(long) == 0:
+            return pd.DataFrame()
+        wide = long.pivot(index=['run_id', 'param_hash', 'code_version', 'created_at'], columns='name', values='value')
+        return wide.reset_index().rename_axis(columns=None).sort_values('created_at', kind='stable')
+
+    @staticmethod
+    def _where(conditions: Dict):
+        """None 이 아닌 조건만 AND 로 연결"""
+        items = [(k, v) for k, v in conditions.items() if v is not None]
+        if not items:
+            return "", []
+        return " WHERE " + " AND ".join(f"{k} = ?" for k, _ in items), [v for _, v in items]
+
+
+# 전역 백테스트 결과 저장소 인스턴스
+_backtest_stores = {}
+
+
+def get_backtest_store(db_path: str = DEFAULT_DB_PATH) -> BacktestResultStore:
+    """db_path 별 전역 백테스트 결과 저장소 인스턴스 반환"""
+    if db_path not in _backtest_stores:
+        _backtest_stores[db_path] = BacktestResultStore(db_path)
+    return _backtest_stores[db_path]
@@ -25,6 +25,7 @@ from orders.order_manager import OrderManager
 from analysis.volume_scanner import VolumeScanner
 from analysis.momentum_analyzer import MomentumAnalyzer
 from analysis.strategy2_analyzer import Strategy2Analyzer  # 전략 2 분석기 추가
+from data_collection.market_snapshot import get_market_snapshot_service
 from monitor.sell_monitor import SellMonitor
 from utils.logger import get_logger
 from monitor.prometheus_metrics import set_holdings_count
@@ -82,6 +83,7 @@ class TradingSystem:
         self.momentum_analyzer = MomentumAnalyzer(self.settings)
         self.strategy2_analyzer = Strategy2Analyzer(self.settings, self.token_manager)  # 전략 2 분석기 추가
         self.sell_monitor = SellMonitor(self.settings, self.kiwoom_client)
+        self.market_snapshot = get_market_snapshot_service(self.settings)  # 거래량 순위 공용 스냅샷
         
         # 시스템 상태
         self.is_running = False
@@ -94,7 +96,7 @@ class TradingSystem:
         try:
             # 토큰 갱신
             logger.info("토큰 갱신 중...")
-            token_refresh_success = self.token_manager.refresh_token(self.settings.ENVIRONMENT)
+            token_refresh_success = await self.token_manager.refresh_token_async(self.settings.ENVIRONMENT)
             if not token_refresh_success:
                 logger.warning("토큰 갱신 실패, 기존 토큰 사용")
             logger.info("토큰 갱신 완료")
@@ -102,7 +104,7 @@ class TradingSystem:
             # 계좌 정보 조회
             logger.info("계좌 정보 조회 중...")
             try:
-                account_info = self.kiwoom_client.get_account_info()
+                account_info = await self.kiwoom_client.get_account_info_async()
                 logger.info(f"계좌 정보 조회 성공: {account_info}")
             except Exception as e:
                 logger.warning(f"계좌 정보 조회 실패, 기본값 사용: {e}")
@@ -219,7 +221,7 @@ class TradingSystem:
             # 실제 계좌에서 보유 종목 조회
             if self.kiwoom_client:
                 try:
-                    account_info = self.kiwoom_client.get_account_info()
+                    account_info = await self.kiwoom_client.get_account_info_async()
                     if account_info and 'acnt_evlt_remn_indv_tot' in account_info:
                         holdings = []
                         for stock in account_info['acnt_evlt_remn_indv_tot']:
@@ -282,6 +284,12 @@ class TradingSystem:
             
             tasks = []
             
+            # 거래량 순위 공용 스냅샷 발행 태스크 (전략들은 구독만 함)
+            if self.settings.VOLUME_SCANNING.get("enabled", False) or self.settings.VOLUME_SCANNING.get("strategy2_enabled", False):
+                snapshot_task = asyncio.create_task(self.market_snapshot.run())
+                tasks.append(snapshot_task)
+                logger.info("시장 스냅샷 발행 태스크 시작")
+            
             # 거래량 스캐닝 태스크 (웹소켓과 독립적으로 실행)
             if self.settings.VOLUME_SCANNING.get("enabled", False):
                 volume_task = asyncio.create_task(self.volume_scanner.start_scanning())
@@ -350,6 +358,9 @@ class TradingSystem:
                     for pos in summary['positions']:
                         logger.info(f"  {pos['stock_code']}: {pos['quantity']}주 @ {pos['avg_price']:,.0f}원")
             
+            # 키움 REST 커넥션 풀 종료
+            await self.kiwoom_client.transport.close()
+            
             logger.info("트레이딩 시스템 종료")
     
     def get_system_status(self) -> Dict[str, Any]:
@@ -5,12 +5,12 @@
 """
 
 import asyncio
-import time
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 
 from config.settings import Settings
 from api.kiwoom_client import KiwoomClient
+from api.rate_limiter import PRIORITY_SELL
 from utils.logger import get_logger
 from database.database_manager import get_database_manager
 
@@ -30,10 +30,6 @@ class SellMonitor:
         self.stop_loss_percent = self.sell_settings["stop_loss_percent"]
         self.take_profit_percent = self.sell_settings["take_profit_percent"]
         
-        # API 호출 제한을 위한 설정
-        self.last_api_call = 0
-        self.min_api_interval = 30  # 최소 30초 간격으로 API 호출
-        
         # 보유 종목 정보
         self.holdings: Dict[str, Dict] = {}
         self.last_check_time = 0
@@ -59,21 +55,12 @@ class SellMonitor:
     async def check_holdings_for_sell(self):
         """보유 종목 매도 조건 확인"""
         try:
-            # API 호출 제한 확인
-            current_time = time.time()
-            if current_time - self.last_api_call < self.min_api_interval:
-                self.logger.debug("API 호출 제한으로 인한 대기 중...")
-                return
-            
-            # 계좌 정보 조회
-            account_info = self.kiwoom_client.get_account_info()
+            # 계좌 정보 조회 (호출 제한은 공용 토큰 버킷에서 매도 감시 우선순위로 처리)
+            account_info = await self.kiwoom_client.get_account_info_async(priority=PRIORITY_SELL)
             if not account_info:
                 self.logger.warning("계좌 정보 조회 실패")
                 return
             
-            # API 호출 시간 업데이트
-            self.last_api_call = current_time
-            
             # 보유 종목 정보 추출
             holdings = self._extract_holdings(account_info)
             if not holdings:
@@ -162,7 +149,7 @@ class SellMonitor:
             self.logger.info(f"매도 주문 실행: {stock_name}({stock_code}) {quantity}주 - 사유: {reason}")
             
             # 매도 주문 실행
-            result = self.kiwoom_client.place_order(
+            result = await self.kiwoom_client.place_order_async(
                 stock_code=stock_code,
                 order_type="매도",
                 quantity=quantity,
@@ -21,6 +21,7 @@ from analysis.strategy2_analyzer import Strategy2Candidate  # 전략 2 후보 
 from api.kiwoom_client import KiwoomClient
 from config.settings import Settings
 from database.database_manager import get_database_manager
+from orders import position_sizing
 
 logger = logging.getLogger(__name__)
 
@@ -93,61 +94,44 @@ class OrderManager:
         
         logger.info(f"OrderManager 초기화 완료 (자동매매: {self.auto_execute}, 거래량자동매매: {self.volume_auto_trade})")
     
-    def calculate_order_quantity(self, stock_code: str, current_price: float) -> int:
+    async def calculate_order_quantity(self, stock_code: str, current_price: float) -> int:
         """주문 수량 계산 (리스크 관리) - 금액 기준 포지션 관리"""
         try:
             # 계좌 잔고 조회
-            balance = self.kiwoom_client.get_account_balance()
+            balance = await self.kiwoom_client.get_account_balance_async()
             available_cash = balance.get("available_cash", 0)
             total_assets = balance.get("total_assets", available_cash)
             
-            # 다중 안전장치: 계좌 잔고 2% AND 전체 자산 5% 제한
-            max_by_cash = available_cash * self.risk_management["position_size_ratio"]  # 계좌 잔고 2%
-            max_by_assets = total_assets * self.risk_management["max_position_size"]    # 전체 자산 5%
-            max_per_stock = self.risk_management["max_per_stock"]                       # 종목당 최대 50만원
+            # 다중 안전장치: 계좌 잔고 2% AND 전체 자산 5% AND 종목당 최대 금액 (orders/position_sizing.py)
+            max_investment = position_sizing.max_investment(self.risk_management, available_cash, total_assets)
             
-            # 가장 보수적인 기준 적용
-            max_investment = min(max_by_cash, max_by_assets, max_per_stock)
+            # 현재 보유 수량 (금액 기준으로 관리)
+            current_position = self.positions.get(stock_code)
+            held_quantity = current_position.quantity if current_position else 0
+            quantity, reason = position_sizing.order_quantity(self.risk_management, available_cash, total_assets,
+                                                              current_price, held_quantity)
             
-            # 최소 거래 금액 체크
-            if max_investment < self.risk_management["min_trade_amount"]:
+            if reason == position_sizing.REJECT_MIN_TRADE_AMOUNT:
                 logger.warning(f"최소 거래 금액 부족: {max_investment:,}원 < {self.risk_management['min_trade_amount']:,}원")
                 return 0
-            
-            # 최대 거래 금액 체크
             max_trade_amount = self.risk_management.get("max_trade_amount", float('inf'))
             if max_investment > max_trade_amount:
-                max_investment = max_trade_amount
-                logger.info(f"최대 거래 금액으로 제한: {max_investment:,}원")
-            
-            # 주문 수량 계산
-            quantity = int(max_investment / current_price)
-            
-            # 최소 주문 수량 체크
-            if quantity < self.risk_management["min_position_size"]:
-                logger.warning(f"최소 주문 수량 부족: {quantity} < {self.risk_management['min_position_size']}")
+                logger.info(f"최대 거래 금액으로 제한: {max_trade_amount:,}원")
+            if reason == position_sizing.REJECT_MIN_POSITION_SIZE:
+                logger.warning(f"최소 주문 수량 부족: {int(min(max_investment, max_trade_amount) / current_price)} "
+                               f"< {self.risk_management['min_position_size']}")
                 return 0
-            
-            # 현재 보유 수량 체크 (금액 기준으로 관리)
-            current_position = self.positions.get(stock_code)
-            if current_position and current_position.quantity > 0:
-                current_investment = current_position.quantity * current_price
-                if current_investment >= max_per_stock:
-                    logger.warning(f"이미 최대 투자 금액 도달: {stock_code} ({current_investment:,}원)")
-                    return 0
-                
-                # 추가 투자 가능 금액 계산
-                remaining_investment = max_per_stock - current_investment
-                additional_quantity = int(remaining_investment / current_price)
-                if additional_quantity <= 0:
-                    logger.warning(f"추가 투자 금액 부족: {stock_code}")
-                    return 0
-                
-                quantity = min(quantity, additional_quantity)
+            if reason == position_sizing.REJECT_MAX_PER_STOCK:
+                logger.warning(f"이미 최대 투자 금액 도달: {stock_code} ({held_quantity * current_price:,}원)")
+                return 0
+            if reason == position_sizing.REJECT_NO_REMAINING:
+                logger.warning(f"추가 투자 금액 부족: {stock_code}")
+                return 0
+            if held_quantity > 0:
                 logger.info(f"추가 매수 수량 제한: {quantity}주 ({quantity * current_price:,}원)")
             
             logger.info(f"주문 수량 계산: {stock_code} - {quantity}주 ({quantity * current_price:,}원)")
-            logger.info(f"  계좌잔고기준: {max_by_cash:,}원, 전체자산기준: {max_by_assets:,}원, 종목당최대: {max_per_stock:,}원")
+            logger.info(f"  최대 투자 금액: {max_investment:,}원 (계좌잔고/전체자산/종목당최대 중 최소)")
             return quantity
             
         except Exception as e:
@@ -167,16 +151,16 @@ class OrderManager:
                 return None
             stock_code = stock_data.code
             current_price = stock_data.current_price
-            quantity = self.calculate_order_quantity(stock_code, current_price)
+            quantity = await self.calculate_order_quantity(stock_code, current_price)
             if quantity <= 0:
                 return None
             # 10종목 제한 강제
-            if not self.check_risk_limits(stock_code, OrderType.BUY, quantity, current_price):
+            if not await self.check_risk_limits(stock_code, OrderType.BUY, quantity, current_price):
                 logger.warning(f"🚫 10종목 제한! 매수 차단: {stock_code}")
                 return None
             # 매수 주문 실행
             logger.info(f"매수 주문 실행: {stock_code} - {quantity}주 @ {current_price:,}원")
-            order_result = await self.kiwoom_client.place_order(
+            order_result = await self.kiwoom_client.place_order_async(
                 stock_code=stock_code,
                 order_type="매수",
                 quantity=quantity,
@@ -253,14 +237,14 @@ class OrderManager:
                 return None
             
             # 리스크 한도 체크
-            if not self.check_risk_limits(stock_code, OrderType.SELL, quantity, price):
+            if not await self.check_risk_limits(stock_code, OrderType.SELL, quantity, price):
                 return None
             
             # 주문 실행
             logger.info(f"매도 주문 실행: {stock_code} - {quantity}주 @ {price:,}원 ({reason})")
             
             # 키움 API 주문 실행
-            order_result = await self.kiwoom_client.place_order(
+            order_result = await self.kiwoom_client.place_order_async(
                 stock_code=stock_code,
                 order_type="매도",
                 quantity=quantity,
@@ -500,7 +484,7 @@ class OrderManager:
         
         return summary
     
-    def handle_volume_candidate(self, candidate: VolumeCandidate) -> Optional[Order]:
+    async def handle_volume_candidate(self, candidate: VolumeCandidate) -> Optional[Order]:
         """
         거래량 급증 후보 종목 처리 (10종목 제한 강제)
         """
@@ -517,21 +501,21 @@ class OrderManager:
             if stock_code in self.volume_positions:
                 logger.info(f"이미 거래량 포지션 보유 중: {stock_code}")
                 return None
-            quantity = self.calculate_order_quantity(stock_code, current_price)
+            quantity = await self.calculate_order_quantity(stock_code, current_price)
             if quantity <= 0:
                 logger.info(f"주문 수량 부족: {stock_code} - {quantity}")
                 return None
             # 10종목 제한 강제
-            if not self.check_risk_limits(stock_code, OrderType.BUY, quantity, current_price):
+            if not await self.check_risk_limits(stock_code, OrderType.BUY, quantity, current_price):
                 logger.warning(f"🚫 10종목 제한! 매수 차단: {stock_code}")
                 return None
             logger.info(f"✅ 리스크 한도 체크 통과: {stock_code} - 매수 진행")
             # 매수 주문 실행 (한 번 더 10종목 제한 강제)
-            if not self.check_risk_limits(stock_code, OrderType.BUY, quantity, current_price):
+            if not await self.check_risk_limits(stock_code, OrderType.BUY, quantity, current_price):
                 logger.warning(f"🚫 10종목 제한! 매수 차단(최종): {stock_code}")
                 return None
             
-            order_result = self.kiwoom_client.place_order(
+            order_result = await self.kiwoom_client.place_order_async(
                 stock_code=stock_code,
                 order_type="매수",
                 quantity=quantity,
@@ -586,7 +570,7 @@ class OrderManager:
             logger.error(f"거래량 후보 처리 실패: {e}")
             return None
 
-    def handle_strategy2_candidate(self, candidate: Strategy2Candidate) -> Optional[Order]:
+    async def handle_strategy2_candidate(self, candidate: Strategy2Candidate) -> Optional[Order]:
         """전략 2 후보 처리"""
         try:
             if not self.volume_auto_trade:
@@ -606,23 +590,23 @@ class OrderManager:
                 return None
             
             # 전략 2 매수 조건 확인
-            if not self.check_strategy2_buy_conditions(candidate):
+            if not await self.check_strategy2_buy_conditions(candidate):
                 return None
             
-            quantity = self.calculate_order_quantity(stock_code, current_price)
+            quantity = await self.calculate_order_quantity(stock_code, current_price)
             if quantity <= 0:
                 logger.info(f"주문 수량 부족: {stock_code} - {quantity}")
                 return None
             
             # 10종목 제한 강제
-            if not self.check_risk_limits(stock_code, OrderType.BUY, quantity, current_price):
+            if not await self.check_risk_limits(stock_code, OrderType.BUY, quantity, current_price):
                 logger.warning(f"🚫 10종목 제한! 매수 차단: {stock_code}")
                 return None
             
             logger.info(f"✅ 전략 2 리스크 한도 체크 통과: {stock_code} - 매수 진행")
             
             # 매수 주문 실행
-            order_result = self.kiwoom_client.place_order(
+            order_result = await self.kiwoom_client.place_order_async(
                 stock_code=stock_code,
                 order_type="매수",
                 quantity=quantity,
@@ -681,7 +665,7 @@ class OrderManager:
             logger.error(f"전략 2 후보 처리 실패: {e}")
             return None
 
-    def check_strategy2_buy_conditions(self, candidate: Strategy2Candidate) -> bool:
+    async def check_strategy2_buy_conditions(self, candidate: Strategy2Candidate) -> bool:
         """전략 2 매수 조건 확인"""
         try:
             # 기본 조건 확인
@@ -696,7 +680,7 @@ class OrderManager:
                 return False
             
             # 계좌 잔고 확인
-            balance = self.kiwoom_client.get_account_balance()
+            balance = await self.kiwoom_client.get_account_balance_async()
             available_cash = balance.get("available_cash", 0)
             min_trade_amount = self.risk_management.get("min_trade_amount", 100000)
             
@@ -770,7 +754,7 @@ class OrderManager:
             logger.info(f"  매수가: {position['buy_price']:,}원, 매도가: {sell_price:,}원")
             
             # 매도 주문 실행
-            order_result = await self.kiwoom_client.place_order(
+            order_result = await self.kiwoom_client.place_order_async(
                 stock_code=stock_code,
                 order_type="매도",
                 quantity=quantity,
@@ -829,15 +813,15 @@ class OrderManager:
         volume_holdings = set(self.volume_positions.keys())
         return regular_holdings.union(volume_holdings)
     
-    def get_position_count(self) -> int:
+    async def get_position_count(self) -> int:
         """현재 보유 종목 수 반환 (실제 계좌 기준)"""
-        return self.get_actual_position_count()
+        return await self.get_actual_position_count()
     
-    def get_actual_position_count(self) -> int:
+    async def get_actual_position_count(self) -> int:
         """실제 계좌 보유 종목 수 반환"""
         try:
-            # 실제 계좌 정보 조회
-            account_info = self.kiwoom_client.get_account_info()
+            # 실제 계좌 정보 조회 (공용 전송 계층, 이벤트 루프를 막지 않음)
+            account_info = await self.kiwoom_client.get_account_info_async()
             if not account_info:
                 logger.warning("계좌 정보 조회 실패 - 메모리 기준으로 계산")
                 return self._get_memory_position_count()
@@ -891,15 +875,13 @@ class OrderManager:
             logger.error(f"보유 종목 추출 중 오류: {e}")
             return {}
     
-    def can_buy_new_stock(self) -> bool:
+    async def can_buy_new_stock(self) -> bool:
         """새 종목 매수 가능 여부 확인 (10종목 제한)"""
-        current_count = self.get_position_count()
-        max_positions = self.risk_management["max_positions"]
-        return current_count < max_positions
+        return position_sizing.can_buy_new_stock(self.risk_management, await self.get_position_count())
     
-    def get_position_limit_status(self) -> dict:
+    async def get_position_limit_status(self) -> dict:
         """10종목 제한 상태 정보 반환 (실제 계좌 기준)"""
-        actual_count = self.get_actual_position_count()
+        actual_count = await self.get_actual_position_count()
         max_positions = self.risk_management["max_positions"]
         
         return {
@@ -910,13 +892,13 @@ class OrderManager:
             "can_buy_new": actual_count < max_positions
         }
 
-    def check_risk_limits(self, stock_code: str, order_type: OrderType, quantity: int, price: float) -> bool:
+    async def check_risk_limits(self, stock_code: str, order_type: OrderType, quantity: int, price: float) -> bool:
         """리스크 한도 체크 - 실제 계좌 기준 10종목 제한 + 주가 제한"""
         try:
             # 최대 보유 종목 수 체크 (실제 계좌 기준)
             if order_type == OrderType.BUY:
                 # 실제 계좌 보유 종목 수 조회
-                actual_position_count = self.get_actual_position_count()
+                actual_position_count = await self.get_actual_position_count()
                 
                 max_positions = self.risk_management["max_positions"]
                 strict_limit = self.risk_management.get("strict_position_limit", False)
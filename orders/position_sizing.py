@@ -0,0 +1,54 @@
+"""
+Position Sizing - 주문 수량/보유 종목 수 제한 규칙
+
+실시간 OrderManager 와 포트폴리오 백테스트(core/portfolio_backtest.py)가 같은 규칙을 쓰도록
+계좌 조회/로그 없이 숫자만 받아서 계산한다. risk 는 Settings.RISK_MANAGEMENT dict.
+"""
+
+# 주문 수량이 0 인 이유 코드
+REJECT_MIN_TRADE_AMOUNT = 'min_trade_amount'    # 투자 가능 금액 < 최소 거래 금액
+REJECT_MIN_POSITION_SIZE = 'min_position_size'  # 주문 수량 < 최소 주문 수량
+REJECT_MAX_PER_STOCK = 'max_per_stock'          # 이미 종목당 최대 투자 금액 도달
+REJECT_NO_REMAINING = 'no_remaining'            # 종목당 남은 투자 금액으로 1주도 못 삼
+REJECT_MAX_POSITIONS = 'max_positions'          # 최대 보유 종목 수 도달
+
+
+def max_investment(risk, available_cash, total_assets):
+    """계좌 잔고 비율, 전체 자산 비율, 종목당 최대 금액 중 가장 보수적인 투자 가능 금액"""
+    max_by_cash = available_cash * risk["position_size_ratio"]  # 계좌 잔고 2%
+    max_by_assets = total_assets * risk["max_position_size"]    # 전체 자산 5%
+    return min(max_by_cash, max_by_assets, risk["max_per_stock"])
+
+
+def order_quantity(risk, available_cash, total_assets, price, held_quantity=0):
+    """
+    주문 수량 계산 (금액 기준 포지션 관리)
+
+    Args:
+        held_quantity: 같은 종목 현재 보유 수량 (추가 매수면 종목당 최대 금액까지만)
+    Returns:
+        (quantity, reason) - 주문 불가면 (0, REJECT_*), 가능하면 (수량, None)
+    """
+    investment = max_investment(risk, available_cash, total_assets)
+    if investment < risk["min_trade_amount"]:
+        return 0, REJECT_MIN_TRADE_AMOUNT
+    investment = min(investment, risk.get("max_trade_amount", float('inf')))
+
+    quantity = int(investment / price)
+    if quantity < risk["min_position_size"]:
+        return 0, REJECT_MIN_POSITION_SIZE
+
+    if held_quantity > 0:
+        current_investment = held_quantity * price
+        if current_investment >= risk["max_per_stock"]:
+            return 0, REJECT_MAX_PER_STOCK
+        additional_quantity = int((risk["max_per_stock"] - current_investment) / price)
+        if additional_quantity <= 0:
+            return 0, REJECT_NO_REMAINING
+        quantity = min(quantity, additional_quantity)
+    return quantity, None
+
+
+def can_buy_new_stock(risk, position_count):
+    """새 종목 매수 가능 여부 (최대 보유 종목 수 제한)"""
+    return position_count < risk["max_positions"]
@@ -1 +1,899 @@
- 
\ No newline at end of file
+#!/usr/bin/env python3
+"""
+Test Gradual Rise Backtest
+완만 상승 백테스트 파이프라인 테스트
+"""
+
+import sys
+import os
+import json
+import glob
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+# 프로젝트 루트 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.gradual_rise_backtest import GradualRiseBacktest, expand_param_grid
+from core.feature_engine import compute_features, FEATURE_COLUMNS
+from core.feature_cache import FeatureCache
+from core.feature_store import FeatureStore
+from core.orb_simulator import simulate_batch, EXIT_REASONS
+from core.synthetic_data import generate_stock_bars, generate_dataset, stock_codes
+from core.backtest_benchmark import run_benchmark, compare_results, STAGES
+from data_collection.minute_store import MinuteBarStore, ordinal_dates, resample_frame
+from data_collection.market_regime import MarketRegime, get_market_regime, load_market_regime, REGIME_BULL, REGIME_BEAR
+
+
+def write_minute_csv(data_path, stock_code, n_days=5, seed=0):
+    """테스트용 1분봉 CSV (키움 저장 포맷과 동일하게 최신순)"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    price = 10000.0
+    for day in pd.bdate_range('2024-11-01', periods=n_days):
+        times = pd.date_range(day + pd.Timedelta(hours=9), periods=60, freq='min')
+        close = price * np.exp(np.cumsum(rng.normal(0.002, 0.005, len(times))))
+        open_ = np.r_[price, close[:-1]]
+        frames.append(pd.DataFrame({
+            'datetime': times,
+            'stock_code': int(stock_code),
+            'open': np.round(open_).astype(int),
+            'high': np.round(np.maximum(open_, close) * 1.002).astype(int),
+            'low': np.round(np.minimum(open_, close) * 0.998).astype(int),
+            'close': np.round(close).astype(int),
+            'volume': rng.integers(1, 10000, len(times)),
+        }))
+        price = close[-1]
+    df = pd.concat(frames)[::-1]
+    df.to_csv(os.path.join(data_path, f'{stock_code}_1min.csv'), index=False)
+
+
+def write_kospi_csv(data_path, n_days=5):
+    """테스트용 KOSPI 일봉 CSV"""
+    days = pd.bdate_range('2024-11-01', periods=n_days)
+    close = 2500 + np.arange(n_days) * 5.0
+    kospi_path = os.path.join(data_path, 'KOSPI_daily.csv')
+    pd.DataFrame({'date': days.strftime('%Y-%m-%d'), 'open': close, 'high': close + 10,
+                  'low': close - 10, 'close': close, 'volume': 1}).to_csv(kospi_path, index=False)
+    return kospi_path
+
+
+class TestMinuteBarStore(unittest.TestCase):
+    """컬럼형 1분봉 저장소 테스트"""
+
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp()
+        write_minute_csv(self.data_path, '005930', seed=1)
+        write_minute_csv(self.data_path, '000660', seed=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_path)
+
+    def test_store_matches_csv_loader(self):
+        """저장소 로드 결과가 CSV 직접 파싱과 동일해야 함"""
+        for date_range in [None, ('2024-11-04', '2024-11-06'), ('2025-01-01', '2025-01-31')]:
+            csv_bt = GradualRiseBacktest(self.data_path, use_store=False)
+            store_bt = GradualRiseBacktest(self.data_path)
+            expected = csv_bt.load_data(date_range=date_range)
+            actual = store_bt.load_data(date_range=date_range)
+            pd.testing.assert_frame_equal(expected, actual)
+
+    def test_compact_schema(self):
+        """공용 1분봉 스키마: int32 가격, category 종목코드, 정수 거래일/분"""
+        data = GradualRiseBacktest(self.data_path).load_data()
+        self.assertEqual(data['stock_code'].dtype, 'category')
+        self.assertEqual(sorted(data['stock_code'].cat.categories), ['000660', '005930'])
+        for col in ('open', 'high', 'low', 'close', 'day', 'minute'):
+            self.assertEqual(data[col].dtype, np.int32)
+        self.assertEqual(data['volume'].dtype, np.uint32)
+        self.assertNotIn('date', data.columns)
+        self.assertEqual(data['minute'].min(), 9 * 60)
+        self.assertEqual(ordinal_dates([data['day'].min()])[0], pd.Timestamp('2024-11-01').date())
+
+    def test_stale_partition_is_reingested(self):
+        """CSV 가 바뀌면 저장소를 다시 만들어야 함"""
+        store = MinuteBarStore(os.path.join(self.data_path, 'columnar'))
+        csv_path = os.path.join(self.data_path, '005930_1min.csv')
+        self.assertEqual(store.ensure([csv_path]), 1)
+        self.assertEqual(store.ensure([csv_path]), 0)
+        write_minute_csv(self.data_path, '005930', n_days=3, seed=3)
+        self.assertFalse(store.is_fresh('005930', csv_path))
+        self.assertEqual(store.ensure([csv_path]), 1)
+        self.assertEqual(store.read_meta('005930')['rows'], 3 * 60)
+
+    def test_resampled_bars_match_pandas(self):
+        """저장소 N분봉이 1분봉 pandas groupby 집계와 같아야 함 (빠진 분 포함)"""
+        csv_path = os.path.join(self.data_path, '005930_1min.csv')
+        raw = pd.read_csv(csv_path)
+        raw.drop(index=[3, 4, 17, 61, 62, 63]).to_csv(csv_path, index=False)
+        bt = GradualRiseBacktest(self.data_path)
+        minute = bt.load_data(stock_codes=['005930'])
+        for timeframe in (3, 5, 15, 60):
+            bars = bt.store.load_bars('005930', timeframe)
+            key = [minute['day'], 540 + (minute['minute'] - 540) // timeframe * timeframe]
+            expected = minute.groupby(key).agg(open=('open', 'first'), high=('high', 'max'), low=('low', 'min'),
+                                               close=('close', 'last'), volume=('volume', 'sum'),
+                                               bars=('open', 'size'))
+            for col in expected.columns:
+                np.testing.assert_array_equal(bars[col].to_numpy(), expected[col].to_numpy())
+            np.testing.assert_array_equal(bars['minute'], expected.index.get_level_values(1))
+            self.assertTrue((bars['datetime'].dt.minute % timeframe == 0).all())
+            # 저장소 없이 1분봉에서 바로 집계한 결과와 같음
+            pd.testing.assert_frame_equal(bars.drop(columns='stock_code'),
+                                          resample_frame(minute, timeframe).drop(columns='stock_code'))
+        sliced = bt.store.load_bars('005930', 5, ('2024-11-04', '2024-11-05'))
+        self.assertEqual(set(ordinal_dates(sliced['day'].unique())),
+                         {pd.Timestamp('2024-11-04').date(), pd.Timestamp('2024-11-05').date()})
+        self.assertEqual(len(bt.load_bars(15)), 2 * 5 * 4)
+        with self.assertRaises(ValueError):
+            bt.store.load_bars('005930', 7)
+
+
+class TestFeatureEngine(unittest.TestCase):
+    """배열 기반 Feature 계산 테스트 (거래일별 직접 계산과 비교)"""
+
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp()
+        write_minute_csv(self.data_path, '005930', seed=4)
+        self.data = GradualRiseBacktest(self.data_path, use_store=False).load_data()
+        self.kospi = pd.DataFrame({
+            'date': ordinal_dates(np.unique(self.data['day'])[:3]),
+            'kospi_return': [np.nan, 0.01, -0.02],
+            'kospi_volatility': [np.nan, 0.015, 0.02],
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.data_path)
+
+    def test_features_match_per_day_calculation(self):
+        from scipy import stats
+        features, sorted_df, starts, ends = compute_features(self.data, self.kospi)
+        self.assertEqual(list(features.columns), FEATURE_COLUMNS)
+        self.assertEqual(len(features), 5)
+
+        for i, row in features.iterrows():
+            day_df = sorted_df.iloc[starts[i]:ends[i]]
+            closes = day_df.iloc[:15]['close'].values
+            volumes = day_df.iloc[:15]['volume'].values
+            self.assertEqual(row['date'], ordinal_dates([day_df.iloc[0]['day']])[0])
+            self.assertAlmostEqual(row['r_1'], closes[0] / day_df.iloc[0]['open'] - 1)
+            self.assertAlmostEqual(row['cum_r_15'], closes[14] / day_df.iloc[0]['open'] - 1)
+            self.assertEqual(row['volume_15min'], volumes.sum())
+
+            delta = np.diff(closes)
+            avg_loss = np.mean(np.where(delta < 0, -delta, 0))
+            rs = np.mean(np.where(delta > 0, delta, 0)) / avg_loss if avg_loss != 0 else 0
+            self.assertAlmostEqual(row['rsi_15'], 100 - (100 / (1 + rs)))
+
+            self.assertAlmostEqual(row['trend_strength'], abs(stats.linregress(np.arange(15), closes).rvalue))
+            self.assertAlmostEqual(row['slope_15'], np.polyfit(np.arange(15), closes, 1)[0], places=6)
+            sma_5 = pd.Series(closes).rolling(5).mean().values
+            self.assertAlmostEqual(row['hl_score'], np.sum(closes[4:] > sma_5[3:-1]) / 11)
+            self.assertTrue(np.isnan(row['macd_line']) and np.isnan(row['bb_position']))
+            self.assertEqual(row['time_minutes'], 9 * 60 + 14)
+            self.assertEqual(row['is_opening'], 1)
+
+        # 첫 거래일은 전일 종가가 없어서 갭 0, 이후는 전일 마지막 봉 종가 기준
+        self.assertEqual(features.loc[0, 'opening_gap'], 0)
+        self.assertAlmostEqual(features.loc[1, 'opening_gap'],
+                               sorted_df.iloc[starts[1]]['open'] / sorted_df.iloc[ends[0] - 1]['close'] - 1)
+        # KOSPI 데이터가 없는 거래일은 0
+        self.assertAlmostEqual(features.loc[1, 'kospi_return_15'], 0.01)
+        self.assertEqual(features.loc[4, 'kospi_return_15'], 0)
+
+
+class TestOrbSimulator(unittest.TestCase):
+    """배열 기반 ORB 진입/청산 테스트 (거래일별 루프와 비교)"""
+
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp()
+        write_minute_csv(self.data_path, '005930', n_days=8, seed=7)
+        write_minute_csv(self.data_path, '000660', n_days=8, seed=8)
+        kospi_path = write_kospi_csv(self.data_path, n_days=8)
+        self.backtest = GradualRiseBacktest(self.data_path, use_store=False)
+        with mock.patch('core.gradual_rise_backtest.KOSPI_PATH', kospi_path):
+            self.features = self.backtest.calculate_features(self.backtest.load_data())
+
+    def tearDown(self):
+        shutil.rmtree(self.data_path)
+
+    @staticmethod
+    def reference_trade(day_df, params, slippage=0.001, commission=0.001):
+        """거래일 하나를 봉 단위 루프로 시뮬레이션"""
+        orb_high = day_df['high'].values[:params['orb_delay_min']].max()
+        window = day_df['high'].values[params['orb_delay_min']:params['orb_max_min']]
+        breakout = np.flatnonzero(window > orb_high)
+        if len(breakout) == 0:
+            return None
+        pos = params['orb_delay_min'] + breakout[0]
+        raw_entry = day_df['open'].values[pos]
+        entry_price = raw_entry * (1 + slippage)
+        tp_price = raw_entry * (1 + params['tp_pct']) * (1 - slippage)
+        sl_price = raw_entry * (1 - params['sl_pct']) * (1 - slippage)
+        exit_price, reason = day_df['close'].values[-1] * (1 - slippage), 'Close'
+        for high, low in zip(day_df['high'].values[pos:], day_df['low'].values[pos:]):
+            if high >= tp_price:
+                exit_price, reason = tp_price, 'TP'
+                break
+            if low <= sl_price:
+                exit_price, reason = sl_price, 'SL'
+                break
+        return reason, exit_price / entry_price - 1 - 2 * commission
+
+    def test_batch_matches_per_day_loop(self):
+        starts, ends = self.features['bar_start'].to_numpy(), self.features['bar_end'].to_numpy()
+        bar_array = self.backtest.bars
+        day_frames = [pd.DataFrame({col: getattr(bar_array, col)[s:e] for col in ('open', 'high', 'low', 'close')})
+                      for s, e in zip(starts, ends)]
+        bars = bar_array.day_bars(starts, ends)
+        param_sets = [
+            {'tp_pct': 0.01, 'sl_pct': 0.005, 'orb_delay_min': 5, 'orb_max_min': 30},
+            {'tp_pct': 0.003, 'sl_pct': 0.01, 'orb_delay_min': 5, 'orb_max_min': 30},
+            {'tp_pct': 0.05, 'sl_pct': 0.05, 'orb_delay_min': 3, 'orb_max_min': 45},
+        ]
+        results = simulate_batch(bars, np.arange(len(day_frames)), param_sets)
+        for params, result in zip(param_sets, results):
+            expected = {}
+            for i, day_df in enumerate(day_frames):
+                trade = self.reference_trade(day_df, params)
+                if trade is not None:
+                    expected[i] = trade
+            self.assertEqual(list(result['rows']), sorted(expected))
+            for row, code, pnl in zip(result['rows'], result['exit_code'], result['pnl']):
+                self.assertEqual(EXIT_REASONS[code], expected[row][0])
+                self.assertAlmostEqual(pnl, expected[row][1])
+
+    def test_trades_frame(self):
+        self.backtest.parameters.update({'tp_pct': 0.01, 'sl_pct': 0.005})
+        entries = self.backtest.find_orb_entries(self.features)
+        trades = self.backtest.simulate_trades(entries)
+        self.assertEqual(list(trades.columns), ['stock_code', 'date', 'entry_time', 'exit_time',
+                                                'entry_price', 'exit_price', 'pnl', 'exit_reason'])
+        self.assertEqual(len(trades), len(entries))
+        self.assertTrue((trades['exit_time'] >= trades['entry_time']).all())
+        self.assertTrue(self.backtest.simulate_trades(pd.DataFrame([])).empty)
+
+
+class TestBacktestBatch(unittest.TestCase):
+    """여러 파라미터 세트 배치 평가 테스트 (세트별 run_backtest 와 비교)"""
+
+    RELAXED = {'theta_spike': 0.05, 'theta_spike_low': -0.01, 'theta_15m': -0.01, 'theta_pull': 0.5,
+               'rsi_min': 0, 'rsi_max': 100, 'bb_position_min': 0, 'bb_position_max': 1,
+               'momentum_threshold': -1, 'kospi_return_min': -1,
+               'price_volume_momentum_threshold': -1, 'rsi_volume_interaction_threshold': -1}
+
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp()
+        write_minute_csv(self.data_path, '005930', n_days=8, seed=9)
+        write_minute_csv(self.data_path, '000660', n_days=8, seed=10)
+        self.kospi_path = write_kospi_csv(self.data_path, n_days=8)
+        patcher = mock.patch('core.gradual_rise_backtest.KOSPI_PATH', self.kospi_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_path)
+
+    def make_backtest(self):
+        backtest = GradualRiseBacktest(self.data_path, use_store=False)
+        features = backtest.calculate_features(backtest.load_data())
+        # 15분 구간에서는 볼린저 밴드가 NaN 이므로 필터 검증용 값으로 채움
+        features['bb_position'] = np.linspace(0, 1, len(features))
+        backtest.load_features = lambda *args, **kwargs: features
+        return backtest, features
+
+    def test_expand_param_grid(self):
+        grid = expand_param_grid({'tp_pct': [0.01, 0.02], 'sl_pct': [0.01, 0.02, 0.03], 'orb_delay_min': 5})
+        self.assertEqual(len(grid), 6)
+        self.assertEqual(grid[0], {'tp_pct': 0.01, 'sl_pct': 0.01, 'orb_delay_min': 5})
+        self.assertEqual(expand_param_grid([{'tp_pct': 0.01}]), [{'tp_pct': 0.01}])
+
+    def test_mask_matrix_matches_apply_filters(self):
+        backtest, features = self.make_backtest()
+        param_sets = [
+            dict(backtest.parameters),
+            {**backtest.parameters, **self.RELAXED},
+            {**backtest.parameters, **self.RELAXED, 'theta_vol': 1.0, 'volume_ratio_min': 0.5,
+             'time_opening_weight': 0.6, 'kospi_volatility_max': 0.01, 'bb_volume_interaction_threshold': 0.1},
+            {**backtest.parameters, **self.RELAXED, 'rsi_min': 40, 'rsi_max': 70, 'theta_spike': 0.002},
+        ]
+        masks = backtest.filter_mask_matrix(features, param_sets)
+        self.assertEqual(masks.shape, (len(features), len(param_sets)))
+        for j, params in enumerate(param_sets):
+            backtest.parameters = dict(params)
+            expected = backtest.apply_filters(features)
+            self.assertEqual(list(np.flatnonzero(masks[:, j])), list(expected.index))
+
+    def test_batch_metrics_match_run_backtest(self):
+        backtest, _ = self.make_backtest()
+        base = dict(backtest.parameters)
+        grid = [{**self.RELAXED, 'tp_pct': tp, 'sl_pct': sl, 'orb_delay_min': delay}
+                for tp, sl, delay in [(0.01, 0.005, 5), (0.003, 0.01, 3), (0.02, 0.02, 8)]]
+        grid.append({})  # 기본 파라미터 (거래 없음)
+        table = backtest.run_backtest_batch(grid, verbose=False)
+        self.assertEqual(len(table), len(grid))
+        for params, row in zip(grid, table.to_dict('records')):
+            backtest.parameters = {**base, **params}
+            metrics, trades = backtest.run_backtest(verbose=False)
+            self.assertEqual(row['total_trades'], len(trades))
+            for key, value in metrics.items():
+                self.assertAlmostEqual(row[key], value)
+        self.assertGreater(table['total_trades'].iloc[0], 0)
+
+
+class TestStreamingBacktest(unittest.TestCase):
+    """종목 chunk 스트리밍 백테스트 테스트 (전체 로드 run_backtest 와 비교)"""
+
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_path)
+        for i, code in enumerate(['000660', '005930', '035720']):
+            write_minute_csv(self.data_path, code, n_days=8, seed=20 + i)
+        kospi_path = write_kospi_csv(self.data_path, n_days=8)
+        patcher = mock.patch('core.gradual_rise_backtest.KOSPI_PATH', kospi_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_backtest(self):
+        backtest = GradualRiseBacktest(self.data_path, use_store=False)
+        backtest.parameters.update({'tp_pct': 0.01, 'sl_pct': 0.005})
+        # 15분 구간에서는 볼린저 밴드가 NaN 이라 기본 필터로는 신호가 없으므로 전체 거래일 통과
+        backtest.apply_filters = lambda features: features
+        return backtest
+
+    def test_streaming_matches_run_backtest(self):
+        metrics, trades = self.make_backtest().run_backtest(verbose=False)
+        self.assertGreater(len(trades), 0)
+        backtest = self.make_backtest()
+        chunks = list(backtest.iter_trades(chunk_size=1))
+        self.assertEqual(len(chunks), 3)
+        self.assertIsNone(backtest.bars)
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), trades)
+
+        trades_path = os.path.join(self.data_path, 'trades.csv')
+        streamed = self.make_backtest().run_backtest_streaming(chunk_size=2, trades_path=trades_path, verbose=False)
+        self.assertEqual(streamed.keys(), metrics.keys())
+        for key, value in metrics.items():
+            self.assertAlmostEqual(streamed[key], value)
+        self.assertEqual(len(pd.read_csv(trades_path)), len(trades))
+
+
+class TestPortfolioBacktest(unittest.TestCase):
+    """자본/보유 종목 수 제한 포트폴리오 백테스트 테스트"""
+
+    RISK = {'max_position_size': 0.05, 'position_size_ratio': 0.02, 'max_positions': 10,
+            'min_trade_amount': 100000, 'max_trade_amount': 500000, 'min_position_size': 1,
+            'max_per_stock': 500000}
+
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_path)
+        for i, code in enumerate(['000660', '005930', '035720']):
+            write_minute_csv(self.data_path, code, n_days=8, seed=30 + i)
+        patcher = mock.patch('core.gradual_rise_backtest.KOSPI_PATH', write_kospi_csv(self.data_path, n_days=8))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_portfolio(self, **risk):
+        backtest = GradualRiseBacktest(self.data_path, use_store=False)
+        backtest.parameters.update({'tp_pct': 0.01, 'sl_pct': 0.005})
+        backtest.apply_filters = lambda features: features
+        return backtest.run_portfolio_backtest(risk={**self.RISK, **risk}, verbose=False)
+
+    def make_reference(self):
+        backtest = GradualRiseBacktest(self.data_path, use_store=False)
+        backtest.parameters.update({'tp_pct': 0.01, 'sl_pct': 0.005})
+        backtest.apply_filters = lambda features: features
+        return backtest.run_backtest(verbose=False)
+
+    def test_unconstrained_matches_independent_trades(self):
+        """제한이 없으면 모든 후보가 체결되고 거래별 수익률은 run_backtest 와 같아야 함"""
+        _, expected = self.make_reference()
+        metrics, trades, equity = self.run_portfolio(max_positions=100)
+        self.assertEqual(metrics['rejected'], 0)
+        np.testing.assert_allclose(np.sort(trades['pnl']), np.sort(expected['pnl']))
+        self.assertAlmostEqual(equity['equity'].iloc[-1], 10_000_000 + trades['profit'].sum(), places=4)
+        self.assertEqual(equity['market_value'].iloc[-1], 0)
+        self.assertTrue((trades['quantity'] * trades['entry_price'] <= self.RISK['max_per_stock']).all())
+
+    def test_position_limit(self):
+        """보유 종목 1개 제한: 체결된 거래 보유 구간이 겹치지 않아야 함"""
+        metrics, trades, equity = self.run_portfolio(max_positions=1)
+        filled = trades[trades['quantity'] > 0].sort_values('entry_time')
+        self.assertGreater(metrics['rejected'], 0)
+        self.assertEqual(set(trades.loc[trades['quantity'] == 0, 'reject_reason']), {'max_positions'})
+        self.assertTrue((filled['entry_time'].to_numpy()[1:] >= filled['exit_time'].to_numpy()[:-1]).all())
+        self.assertTrue(equity['datetime'].is_monotonic_increasing)
+        self.assertLessEqual(metrics['max_drawdown'], 0)
+
+        # 최소 거래 금액보다 자본이 적으면 전부 거절
+        metrics, trades, _ = self.run_portfolio(min_trade_amount=10**9)
+        self.assertEqual(metrics['total_trades'], 0)
+        self.assertEqual(set(trades['reject_reason']), {'min_trade_amount'})
+
+
+class TestCostModel(unittest.TestCase):
+    """거래비용 모델 테스트 (호가단위, 세금/수수료, 거래량 슬리피지)"""
+
+    def test_krx_tick_rounding(self):
+        from core.cost_model import tick_size, round_to_tick
+        prices = np.array([1999, 2000, 4999, 5000, 19990, 20000, 49950, 50000, 199900, 200000, 499500, 500000])
+        np.testing.assert_array_equal(tick_size(prices), [1, 5, 5, 10, 10, 50, 50, 100, 100, 500, 500, 1000])
+        np.testing.assert_array_equal(round_to_tick([10003, 10010, 2001.2], up=True), [10010, 10010, 2005])
+        np.testing.assert_array_equal(round_to_tick([10003, 10010, 2001.2], up=False), [10000, 10010, 2000])
+
+    def test_krx_costs(self):
+        from core.cost_model import KRXCostModel, EXIT_TP, EXIT_SL, EXIT_CLOSE
+        model = KRXCostModel(commission_tiers=((0, 0.0002), (1_000_000, 0.0001)), order_value=500_000)
+        # 같은 가격 왕복: 매수/매도 수수료 + 매도 거래세만큼 손실
+        self.assertAlmostEqual(model.net_return(np.array([10000.0]), np.array([10000.0]))[0],
+                               10000 * (1 - 0.0002 - 0.0015) / (10000 * 1.0002) - 1)
+        # 주문 금액이 구간을 넘으면 낮은 수수료율
+        big = KRXCostModel(commission_tiers=((0, 0.0002), (1_000_000, 0.0001)), order_value=2_000_000)
+        self.assertGreater(big.net_return(np.array([10000.0]), np.array([10000.0]))[0],
+                           model.net_return(np.array([10000.0]), np.array([10000.0]))[0])
+        # 슬리피지: 거래량이 적을수록 크고 MAX_SLIPPAGE 로 제한, 체결가는 불리한 쪽 호가
+        price = np.full(3, 10000.0)
+        # (50주: 0.1 * sqrt(50 / 50000) = 0.32% -> 10031.6 -> 10040, 거래량 0 은 상한 1%)
+        entry = model.entry_fill(price, np.array([10**9, 50000, 0]))
+        np.testing.assert_array_equal(entry, [10010, 10040, 10100])
+        exit_ = model.exit_fill(price, np.array([EXIT_TP, EXIT_SL, EXIT_CLOSE]), np.array([50000, 50000, 0]))
+        np.testing.assert_array_equal(exit_, [10000, 9960, 9900])
+
+    def test_backtest_with_cost_model(self):
+        """GradualRiseBacktest 에 비용 모델 연결: 기본값은 기존 0.1% 고정, KRX 모델은 호가단위 체결"""
+        from core.cost_model import KRXCostModel, FlatCostModel, tick_size
+        data_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_path)
+        write_minute_csv(data_path, '005930', n_days=8, seed=40)
+        with mock.patch('core.gradual_rise_backtest.KOSPI_PATH', write_kospi_csv(data_path, n_days=8)):
+            trades = {}
+            for name, model in [('default', None), ('flat', FlatCostModel()), ('krx', KRXCostModel())]:
+                backtest = GradualRiseBacktest(data_path, use_store=False, cost_model=model)
+                backtest.parameters.update({'tp_pct': 0.01, 'sl_pct': 0.005})
+                backtest.apply_filters = lambda features: features
+                trades[name] = backtest.run_backtest(verbose=False)[1]
+        pd.testing.assert_frame_equal(trades['default'], trades['flat'])
+        krx = trades['krx']
+        self.assertEqual(len(krx), len(trades['default']))
+        for col in ('entry_price', 'exit_price'):
+            self.assertTrue((krx[col] % tick_size(krx[col]) == 0).all())
+
+
+class TestBacktestResultStore(unittest.TestCase):
+    """백테스트 결과 SQLite 저장소 테스트"""
+
+    def setUp(self):
+        from database.backtest_store import BacktestResultStore
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.store = BacktestResultStore(os.path.join(self.tmp, 'results.db'))
+        entry = pd.to_datetime(['2024-11-01 09:10', '2024-11-01 09:20', '2024-11-04 09:07'])
+        self.trades = pd.DataFrame({
+            'stock_code': ['005930', '000660', '005930'],
+            'date': entry.date,
+            'entry_time': entry,
+            'exit_time': entry + pd.Timedelta(minutes=30),
+            'entry_price': [10010.0, 20020.0, 10110.0],
+            'exit_price': [10100.0, 19900.0, np.nan],
+            'pnl': [0.007, -0.008, 0.001],
+            'exit_reason': ['TP', 'SL', 'Close'],
+        })
+
+    def test_round_trip_and_filters(self):
+        params = {'tp_pct': 0.01, 'sl_pct': 0.005}
+        run_id = self.store.save_run(self.trades, {'total_trades': 3, 'win_rate': 2 / 3, 'note': 'x'}, params)
+        loaded = self.store.load_trades(run_id)
+        expected = self.trades.assign(date=pd.to_datetime(self.trades['date']))
+        pd.testing.assert_frame_equal(loaded.drop(columns='run_id'), expected)
+        self.assertEqual(len(self.store.load_trades(stock_code='005930')), 2)
+        self.assertEqual(len(self.store.load_trades(run_id, date_range=('2024-11-01', '2024-11-01'))), 2)
+        self.assertEqual(self.store.load_trades(exit_reason='SL')['stock_code'].tolist(), ['000660'])
+
+        # 같은 파라미터(키 순서 무관)는 같은 해시, 지표는 실행별 한 행
+        other = self.store.save_run(self.trades.iloc[:1], {'total_trades': 1}, {'sl_pct': 0.005, 'tp_pct': 0.01})
+        runs = self.store.list_runs()
+        self.assertEqual(runs['param_hash'].nunique(), 1)
+        self.assertEqual(self.store.latest_run_id(), other)
+        metrics = self.store.load_metrics().set_index('run_id')
+        self.assertEqual(metrics.loc[run_id, 'total_trades'], 3)
+        self.assertNotIn('note', metrics.columns)
+
+    def test_script_columns_and_visualizer(self):
+        """파일 단위 스크립트 컬럼명(stock/buy_time/return...)은 공용 컬럼으로, 나머지는 extra 로 저장"""
+        script = pd.DataFrame({
+            'stock': ['005930_1min'], 'buy_time': pd.to_datetime(['2024-11-05 10:20']),
+            'buy_price': [10000], 'sell_time': pd.to_datetime(['2024-11-05 10:40']), 'sell_price': [10100],
+            'return': [0.01], 'sell_reason': ['Target Profit'], 'rsi_at_buy': [61.5],
+        })
+        run_id = self.store.save_run(script, strategy='gradual_riser_trailing')
+        loaded = self.store.load_trades(run_id, with_extra=True)
+        self.assertEqual(loaded['date'].iloc[0], pd.Timestamp('2024-11-05'))
+        self.assertEqual(loaded['exit_reason'].iloc[0], 'Target Profit')
+        self.assertEqual(loaded['rsi_at_buy'].iloc[0], 61.5)
+
+        from analysis.analysis_visualizer import AnalysisVisualizer
+        visualizer = AnalysisVisualizer()
+        self.store.save_run(self.trades)
+        visualizer.load_run(store=self.store)
+        self.assertEqual(visualizer.calculate_metrics()['total_trades'], 3)
+
+
+class TestFilePool(unittest.TestCase):
+    """파일 단위 스크립트 프로세스 풀 실행 테스트 (순차 실행과 비교)"""
+
+    def test_merge_counts(self):
+        from core.file_pool import merge_counts
+        total = {'total_trades': 1, 'max_profit_distribution': [0.1]}
+        merge_counts(total, {'total_trades': 2, 'tp_1.0_reached': 1, 'max_profit_distribution': [0.2, 0.3]})
+        self.assertEqual(total, {'total_trades': 3, 'tp_1.0_reached': 1, 'max_profit_distribution': [0.1, 0.2, 0.3]})
+
+    def test_parallel_matches_serial(self):
+        from core.file_pool import map_files
+        from core import backtest_gradual_riser_trailing as trailing
+        data_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_path)
+        generate_dataset(data_path, n_stocks=4, n_days=20, seed=3)
+        files = glob.glob(os.path.join(data_path, 'minute_data', '*.csv'))
+
+        self.assertEqual(map_files(os.path.getsize, files[::-1], workers=2),
+                         [(f, os.path.getsize(f)) for f in sorted(files)])
+        serial = trailing.run_backtest(files, workers=1)
+        parallel = trailing.run_backtest(files[::-1], workers=2)
+        self.assertGreater(len(serial[0]), 0)
+        self.assertEqual(pd.DataFrame(parallel[0]).to_dict('records'), pd.DataFrame(serial[0]).to_dict('records'))
+        self.assertEqual(parallel[1:], serial[1:])
+
+
+class TestTrailingExit(unittest.TestCase):
+    """trailing stop 청산 배열 커널 테스트 (봉 단위 루프와 비교)"""
+
+    @staticmethod
+    def reference_exit(buy_price, start, close, high, low, minute):
+        max_price = min_price = buy_price
+        for i in range(start, len(close)):
+            max_price, min_price = max(max_price, high[i]), min(min_price, low[i])
+            current_return = (close[i] - buy_price) / buy_price
+            if current_return >= 0.01:
+                return i, "Fixed TP 1.0%", max_price, min_price
+            if (max_price - buy_price) / buy_price > 0.015 and close[i] < max_price * 0.985:
+                return i, "Smart Trailing -1.5%", max_price, min_price
+            if current_return <= -0.015:
+                return i, "Hard Stop Loss -1.5%", max_price, min_price
+            if minute[i] > 15 * 60:
+                return i, "EOD Cut Small Gain" if current_return < 0.005 else "Overnight Profit", max_price, min_price
+        return None
+
+    def test_matches_bar_loop(self):
+        from core import backtest_gradual_riser_trailing as trailing
+        rng = np.random.default_rng(0)
+        n = 400
+        close = np.round(10000 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))).astype(np.int32)
+        high = (close + rng.integers(0, 200, n)).astype(np.int32)
+        low = (close - rng.integers(0, 30, n)).astype(np.int32)
+        minute = np.arange(9 * 60, 9 * 60 + n, dtype=np.int32)
+        minute[-20:] = 15 * 60 + 1
+        with mock.patch.object(trailing, 'EXIT_BLOCK', 7):
+            for start in range(1, n, 13):
+                buy_price = close[start - 1]
+                self.assertEqual(trailing.find_exit(buy_price, start, close, high, low, minute),
+                                 self.reference_exit(buy_price, start, close, high, low, minute))
+        self.assertIsNone(trailing.find_exit(close[0], n, close, high, low, minute))
+
+
+class TestWalkForward(unittest.TestCase):
+    """walk-forward 구간 분할 / 전체 구간 Feature 재사용 테스트"""
+
+    def test_make_folds(self):
+        from core.walk_forward import make_folds
+        folds = make_folds('2024-01-15', '2024-09-10', train_months=6, test_months=1, step_months=1)
+        self.assertEqual([f['train_range'] for f in folds],
+                         [('2024-01-15', '2024-06-30'), ('2024-02-01', '2024-07-31'), ('2024-03-01', '2024-08-31')])
+        self.assertEqual([f['test_range'] for f in folds],
+                         [('2024-07-01', '2024-07-31'), ('2024-08-01', '2024-08-31'), ('2024-09-01', '2024-09-10')])
+        self.assertEqual(make_folds('2024-01-01', '2024-03-31', train_months=6), [])
+
+    def test_results_saved_to_store(self):
+        from core.walk_forward import save_walk_forward
+        from database.backtest_store import BacktestResultStore
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        store = BacktestResultStore(os.path.join(tmp, 'results.db'))
+        fold_df = pd.DataFrame([
+            {'fold': 0, 'train_start': '2024-01-01', 'train_end': '2024-06-30', 'test_start': '2024-07-01',
+             'test_end': '2024-07-31', 'best_value': 1.5, 'test_total_trades': 2, 'best_params': '{"tp_pct": 0.05}'},
+            {'fold': 1, 'train_start': '2024-02-01', 'train_end': '2024-07-31', 'test_start': '2024-08-01',
+             'test_end': '2024-08-31', 'best_value': 0.5, 'test_total_trades': 1, 'best_params': '{"tp_pct": 0.07}'},
+        ])
+        entry = pd.to_datetime(['2024-07-02 09:10', '2024-07-03 09:10', '2024-08-05 09:10'])
+        oos_trades = pd.DataFrame({'fold': [0, 0, 1], 'stock_code': '005930', 'entry_time': entry,
+                                   'exit_time': entry + pd.Timedelta(minutes=30), 'pnl': [0.01, -0.01, 0.02]})
+        fold_run_ids, oos_run_id = save_walk_forward(fold_df, oos_trades, {'total_trades': 3}, 'wf_test', store)
+
+        runs = store.list_runs(experiment='wf_test')
+        self.assertEqual(set(runs['run_id']), set(fold_run_ids) | {oos_run_id})
+        self.assertEqual([len(store.load_trades(run_id)) for run_id in fold_run_ids], [2, 1])
+        metrics = store.load_metrics(fold_run_ids).set_index('run_id')
+        self.assertEqual(metrics.loc[fold_run_ids[1], 'best_value'], 0.5)
+        oos = runs.set_index('run_id').loc[oos_run_id]
+        self.assertEqual((oos['date_from'], oos['date_to']), ('2024-07-01', '2024-08-31'))
+
+    def test_feature_range_slices_full_span(self):
+        data_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_path)
+        write_minute_csv(data_path, '005930', n_days=10, seed=11)
+        kospi_path = write_kospi_csv(data_path, n_days=10)
+        with mock.patch('core.gradual_rise_backtest.KOSPI_PATH', kospi_path):
+            shared = GradualRiseBacktest(data_path, feature_cache=FeatureCache(os.path.join(data_path, 'fc')),
+                                         feature_range=('2024-11-01', '2024-11-14'))
+            window = ('2024-11-05', '2024-11-08')
+            actual = shared.load_features(date_range=window)
+            expected = GradualRiseBacktest(data_path).load_features(date_range=window)
+        self.assertEqual(len(actual), 4)
+        # 구간 첫날 opening_gap 만 전일 종가 기준으로 달라질 수 있음
+        columns = [c for c in FEATURE_COLUMNS if c != 'opening_gap']
+        pd.testing.assert_frame_equal(actual[columns], expected[columns])
+
+
+class TestStudyFingerprint(unittest.TestCase):
+    """Optuna study 는 입력(종목/기간/데이터)이 같을 때만 재개"""
+
+    def test_fingerprint_tracks_inputs(self):
+        from core.parameter_optimizer import ParameterOptimizer
+        data_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, data_path)
+        write_minute_csv(data_path, '005930', n_days=3)
+        optimizer = ParameterOptimizer(data_path)
+        optimizer.stock_codes = ['005930']
+        optimizer.date_range = ('2024-11-01', '2024-11-05')
+        base = optimizer.study_fingerprint()
+        self.assertEqual(optimizer.study_fingerprint(), base)
+
+        optimizer.date_range = ('2024-11-01', '2024-11-06')
+        self.assertNotEqual(optimizer.study_fingerprint(), base)
+        optimizer.date_range = ('2024-11-01', '2024-11-05')
+        optimizer.stock_codes = ['005930', '000660']
+        self.assertNotEqual(optimizer.study_fingerprint(), base)
+        optimizer.stock_codes = ['005930']
+        write_minute_csv(data_path, '005930', n_days=4)
+        self.assertNotEqual(optimizer.study_fingerprint(), base)
+
+
+class TestBatchedOptimizer(unittest.TestCase):
+    """배치 ask + 병렬 worker 로 돌려도 TPE 가 랜덤 탐색보다 좋아야 함"""
+
+    SEEDS = (0, 1)
+
+    def setUp(self):
+        from core.parameter_optimizer import ParameterOptimizer, _SearchSpaceRecorder
+        recorder = _SearchSpaceRecorder()
+        ParameterOptimizer.suggest_params(None, recorder)
+        space = recorder.space
+        # 각 범위의 30% 지점이 최적인 2차 함수를 백테스트 대신 사용
+        best = {name: lo + 0.3 * (hi - lo) for name, (_, lo, hi, *_rest) in space.items()}
+
+        def objective(params):
+            return -sum(((params[n] - best[n]) / (space[n][2] - space[n][1])) ** 2 for n in space)
+
+        class QuadraticBacktest:
+            def run_backtest_batch(self, param_sets, **kwargs):
+                return pd.DataFrame([{'total_trades': 50, 'sharpe_ratio': objective(p) / 0.4,
+                                      'win_rate': 0.0, 'total_return': 0.0} for p in param_sets])
+
+            def load_features(self, *args, **kwargs):
+                return []
+
+        self.objective = objective
+        for name, value in (('_make_backtest', lambda _self: QuadraticBacktest()), ('_report', lambda *a: None)):
+            patcher = mock.patch.object(ParameterOptimizer, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.data_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_path)
+
+    def optimize(self, seed):
+        from core.parameter_optimizer import ParameterOptimizer, N_JOBS, N_TRIALS
+        optimizer = ParameterOptimizer(self.data_path)
+        optimizer.stock_codes = ['005930']
+        optimizer.date_range = ('2024-11-01', '2024-11-05')
+        storage = f"sqlite:///{os.path.join(self.data_path, f'study_{seed}.db')}" if N_JOBS > 1 else None
+        optimizer.optimize(n_trials=N_TRIALS, n_jobs=N_JOBS, storage=storage, seed=seed)
+        return optimizer.best_value
+
+    def random_search(self, seed):
+        import optuna
+        from core.parameter_optimizer import ParameterOptimizer, N_TRIALS
+        study = optuna.create_study(direction='maximize', sampler=optuna.samplers.RandomSampler(seed=seed))
+        study.optimize(lambda trial: self.objective(ParameterOptimizer.suggest_params(None, trial)),
+                       n_trials=N_TRIALS)
+        return study.best_value
+
+    def test_beats_random_search_at_default_n_jobs(self):
+        # batch 가 worker 당 trial 수보다 크면 모든 trial 이 같은 (빈) 모델에서 뽑혀 랜덤 탐색과 같아짐
+        for seed in self.SEEDS:
+            with self.subTest(seed=seed):
+                self.assertGreater(self.optimize(seed), self.random_search(seed))
+
+
+class TestFeatureStore(unittest.TestCase):
+    """거래일 단위 Feature 증분 갱신 테스트 (전체 재계산과 비교)"""
+
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp()
+        write_minute_csv(self.data_path, '005930', n_days=6, seed=12)
+        write_minute_csv(self.data_path, '000660', n_days=6, seed=13)
+        self.kospi_path = write_kospi_csv(self.data_path, n_days=8)
+        patcher = mock.patch('core.gradual_rise_backtest.KOSPI_PATH', self.kospi_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.feature_store = FeatureStore(os.path.join(self.data_path, 'feature_store'))
+
+    def tearDown(self):
+        shutil.rmtree(self.data_path)
+
+    def assert_matches_full(self, features):
+        backtest = GradualRiseBacktest(self.data_path)
+        expected = backtest.calculate_features(backtest.load_data())
+        pd.testing.assert_frame_equal(features[FEATURE_COLUMNS], expected[FEATURE_COLUMNS])
+        # 거래일 offset 이 가리키는 1분봉도 동일
+        actual_bars = self.backtest.bars.day_bars(features['bar_start'], features['bar_end'])
+        expected_bars = backtest.bars.day_bars(expected['bar_start'], expected['bar_end'])
+        for col in ('open', 'high', 'low', 'close', 'dt_ns', 'valid'):
+            np.testing.assert_array_equal(getattr(actual_bars, col), getattr(expected_bars, col))
+
+    def load(self):
+        self.backtest = GradualRiseBacktest(self.data_path, feature_store=self.feature_store)
+        return self.backtest.load_features()
+
+    def recomputed_days(self):
+        with mock.patch('builtins.print') as printed:
+            features = self.load()
+        message = [c.args[0] for c in printed.call_args_list if 'Feature 증분 갱신' in str(c.args[0])][0]
+        return features, int(message.split('재계산 ')[1].split(' ')[0])
+
+    def test_only_new_days_are_recomputed(self):
+        features, recomputed = self.recomputed_days()
+        self.assertEqual(recomputed, 12)
+        self.assert_matches_full(features)
+        self.assertEqual(self.recomputed_days()[1], 0)
+
+        # 하루 추가 -> 새 거래일만 계산
+        csv_path = os.path.join(self.data_path, '005930_1min.csv')
+        df = pd.read_csv(csv_path, parse_dates=['datetime'])
+        last_day = df[df['datetime'].dt.date == df['datetime'].dt.date.max()].copy()
+        last_day['datetime'] += pd.Timedelta(days=3)
+        pd.concat([last_day, df]).to_csv(csv_path, index=False)
+        features, recomputed = self.recomputed_days()
+        self.assertEqual(recomputed, 1)
+        self.assertEqual(len(features), 13)
+        self.assert_matches_full(features)
+
+    def test_kospi_update_refreshes_market_columns(self):
+        self.load()
+        kospi = pd.read_csv(self.kospi_path)
+        kospi['close'] = kospi['close'][::-1].values
+        kospi.to_csv(self.kospi_path, index=False)
+        features, recomputed = self.recomputed_days()
+        self.assertEqual(recomputed, 0)
+        self.assert_matches_full(features)
+
+
+class TestMarketRegime(unittest.TestCase):
+    """KOSPI 시장상황 배열 조인 / 캐시 파일 테스트"""
+
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp()
+        self.kospi_path = write_kospi_csv(self.data_path, n_days=30)
+
+    def tearDown(self):
+        shutil.rmtree(self.data_path)
+
+    def test_lookup_matches_daily_frame(self):
+        regime = get_market_regime(self.kospi_path)
+        kospi = pd.read_csv(self.kospi_path)
+        prev_close = kospi['close'].shift(1)
+        np.testing.assert_allclose(regime.kospi_return, kospi['close'] / prev_close - 1)
+        np.testing.assert_allclose(regime.kospi_volatility, (kospi['high'] - kospi['low']) / prev_close)
+
+        dates = ['2024-11-05', '2024-11-09', '2024-12-10']  # 거래일 / 주말 / 거래일
+        ret, vol, labels, found = regime.lookup(dates)
+        self.assertEqual(found.tolist(), [True, False, True])
+        self.assertEqual(ret[1], 0.0)
+        self.assertAlmostEqual(ret[0], regime.frame.set_index('date')['kospi_return'][pd.Timestamp('2024-11-05').date()])
+        # 꾸준히 오르는 KOSPI -> 후반부는 20일선 위 상승장
+        self.assertEqual(labels[2], REGIME_BULL)
+        # 주말은 직전 거래일 값
+        self.assertEqual(regime.asof(pd.Timestamp('2024-11-09').date())['date'], pd.Timestamp('2024-11-08').date())
+        self.assertIsNone(regime.asof(pd.Timestamp('2024-10-01').date()))
+
+    def test_cache_file_reused_and_refreshed(self):
+        regime = get_market_regime(self.kospi_path)
+        self.assertIs(get_market_regime(self.kospi_path), regime)
+        cache_path = os.path.join(self.data_path, 'KOSPI_daily.regime.npz')
+        self.assertTrue(os.path.exists(cache_path))
+        with mock.patch.object(MarketRegime, 'from_csv', side_effect=AssertionError):
+            np.testing.assert_array_equal(load_market_regime(self.kospi_path).regime, regime.regime)
+
+        kospi = pd.read_csv(self.kospi_path)
+        kospi['close'] = kospi['close'][::-1].values
+        kospi.to_csv(self.kospi_path, index=False)
+        refreshed = get_market_regime(self.kospi_path)
+        self.assertIsNot(refreshed, regime)
+        self.assertEqual(refreshed.regime[-1], REGIME_BEAR)
+        self.assertIsNone(get_market_regime(os.path.join(self.data_path, 'missing.csv')))
+
+
+class TestBacktestBenchmark(unittest.TestCase):
+    """합성 1분봉 생성기 / 단계별 벤치마크 테스트"""
+
+    def test_generator_is_deterministic(self):
+        a = generate_stock_bars(0, 5, seed=3)
+        pd.testing.assert_frame_equal(a, generate_stock_bars(0, 5, seed=3))
+        self.assertFalse(a.equals(generate_stock_bars(0, 5, seed=4)))
+        # 종목 수를 늘려도 앞 종목 데이터는 그대로
+        root = tempfile.mkdtemp()
+        try:
+            generate_dataset(root, 2, 5, seed=3)
+            saved = pd.read_csv(os.path.join(root, 'minute_data', f'{stock_codes(1)[0]}_1min.csv'))
+            self.assertEqual(len(saved), len(a))
+            self.assertEqual(saved['close'].iloc[::-1].tolist(), a['close'].tolist())
+        finally:
+            shutil.rmtree(root)
+
+    def test_benchmark_stages_and_compare(self):
+        result = run_benchmark(n_stocks=2, n_days=4, repeat=1)
+        self.assertEqual(list(result['stages']), STAGES)
+        self.assertGreater(result['counts']['feature_days'], 0)
+        self.assertEqual(result['counts']['entries'], result['counts']['trades'])
+        result = json.loads(json.dumps(result))
+
+        self.assertFalse(any(row['regression'] for row in compare_results(result, result)))
+        slower = json.loads(json.dumps(result))
+        slower['stages']['features']['seconds'] = result['stages']['features']['seconds'] * 2 + 1
+        flagged = {row['stage'] for row in compare_results(result, slower) if row['regression']}
+        self.assertEqual(flagged, {'features'})
+
+
+class TestFeatureCache(unittest.TestCase):
+    """Feature 캐시 테스트"""
+
+    def setUp(self):
+        self.data_path = tempfile.mkdtemp()
+        write_minute_csv(self.data_path, '005930', seed=5)
+        self.csv_path = os.path.join(self.data_path, '005930_1min.csv')
+
+    def tearDown(self):
+        shutil.rmtree(self.data_path)
+
+    def test_key_changes_with_data_and_range(self):
+        cache = FeatureCache(os.path.join(self.data_path, 'feature_cache'))
+        key = cache.make_key([self.csv_path], ('2024-11-01', '2024-11-30'))
+        self.assertEqual(key, cache.make_key([self.csv_path], ('2024-11-01', '2024-11-30')))
+        self.assertNotEqual(key, cache.make_key([self.csv_path], ('2024-11-01', '2024-11-15')))
+        write_minute_csv(self.data_path, '005930', n_days=3, seed=6)
+        self.assertNotEqual(key, cache.make_key([self.csv_path], ('2024-11-01', '2024-11-30')))
+
+    def test_disk_roundtrip_and_lru_eviction(self):
+        cache_dir = os.path.join(self.data_path, 'feature_cache')
+        features = pd.DataFrame({'r_1': np.arange(1000, dtype=float)})
+        cache = FeatureCache(cache_dir)
+        cache.put('a', features)
+        # 새 프로세스처럼 메모리 캐시 없이 디스크에서 조회
+        pd.testing.assert_frame_equal(FeatureCache(cache_dir).get('a'), features)
+        self.assertIsNone(cache.get('missing'))
+
+        entry_size = os.path.getsize(os.path.join(cache_dir, 'a.pkl'))
+        small = FeatureCache(cache_dir, max_disk_bytes=entry_size * 2)
+        small.put('b', features)
+        os.utime(os.path.join(cache_dir, 'a.pkl'), (0, 0))  # a 를 가장 오래된 항목으로
+        small.put('c', features)
+        self.assertEqual(sorted(os.listdir(cache_dir)), ['b.pkl', 'c.pkl'])
+
+
+if __name__ == '__main__':
+    unittest.main()
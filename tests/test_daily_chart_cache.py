@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test Daily Chart Cache
+일봉 캐시 조회 횟수/디스크 재사용/이동평균 테스트
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import Mock, AsyncMock
+
+import numpy as np
+import pandas as pd
+
+# 프로젝트 루트 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.kiwoom_transport import KiwoomResponse
+from data_collection.daily_chart_cache import DailyChartCache
+
+BASE_DT = "20240410"
+
+
+def chart_response(n=80):
+    """기준일 당일 봉을 포함한 ka10081 응답 (최신 봉이 먼저)"""
+    dates = pd.bdate_range(end=pd.Timestamp(BASE_DT), periods=n).strftime("%Y%m%d")
+    rng = np.random.default_rng(0)
+    prices = np.round(10000 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))).astype(int)
+    rows = [{"dt": dt, "cur_prc": f"-{price}" if i % 3 else f"+{price}"}
+            for i, (dt, price) in enumerate(zip(dates, prices))]
+    return KiwoomResponse(200, {"stk_dt_pole_chart_qry": rows[::-1]}), prices
+
+
+class TestDailyChartCache(unittest.TestCase):
+    """종목/기준일당 한 번 조회, 디스크 재사용, 오늘 가격 반영 이동평균"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        self.settings = Mock()
+        self.settings.get_api_url.return_value = "http://localhost/api/dostk/chart"
+        self.settings.get_headers.return_value = {"api-id": "ka10081"}
+        self.response, self.prices = chart_response()
+
+    def make_cache(self):
+        transport = Mock()
+        transport.post = AsyncMock(return_value=self.response)
+        return DailyChartCache(self.settings, transport, cache_dir=self.cache_dir.name)
+
+    def test_fetch_once_and_warm_restart(self):
+        os.makedirs(os.path.join(self.cache_dir.name, "20240409"))
+        cache = self.make_cache()
+
+        async def scan():
+            charts = await asyncio.gather(*[cache.get("005930", BASE_DT) for _ in range(5)])
+            charts.append(await cache.get("005930", BASE_DT))
+            return charts
+
+        charts = asyncio.run(scan())
+        cache.transport.post.assert_awaited_once()
+        self.assertTrue(all(chart is charts[0] for chart in charts))
+        # 기준일 당일 봉은 제외, 날짜 오름차순
+        np.testing.assert_array_equal(charts[0].close, self.prices[:-1])
+        self.assertLess(charts[0].dates[-1], int(BASE_DT))
+        # 지난 기준일 디렉터리 정리
+        self.assertEqual(os.listdir(self.cache_dir.name), [BASE_DT])
+
+        restarted = self.make_cache()
+        chart = asyncio.run(restarted.get("005930", BASE_DT))
+        restarted.transport.post.assert_not_awaited()
+        np.testing.assert_array_equal(chart.close, charts[0].close)
+
+    def test_moving_averages_with_today_price(self):
+        chart = asyncio.run(self.make_cache().get("005930", BASE_DT))
+        today = 12345.0
+        close = pd.Series(np.append(self.prices[:-1], today).astype(float))
+        for period in (5, 7, 20, 60):
+            self.assertAlmostEqual(chart.moving_average(period, today),
+                                   close.rolling(period).mean().iloc[-1], places=6)
+        self.assertEqual(set(chart.moving_averages(today)), {"MA5", "MA10", "MA20", "MA60"})
+        self.assertTrue(np.isnan(chart.moving_average(120, today)))
+        # 3일 전 이동평균 / 최근 고점은 어제까지의 종가로 미리 계산
+        for period in (10, 20, 60):
+            self.assertAlmostEqual(chart.past_moving_average(period),
+                                   close.rolling(period).mean().iloc[-3], places=6)
+        self.assertEqual(chart.recent_high(), close.iloc[-10:-1].max())
+
+    def test_cancelled_fetch_releases_waiters(self):
+        cache = self.make_cache()
+        started = asyncio.Event()
+
+        async def slow_post(*args, **kwargs):
+            started.set()
+            await asyncio.sleep(10)
+
+        cache.transport.post.side_effect = slow_post
+
+        async def scenario():
+            first = asyncio.ensure_future(cache.get("005930", BASE_DT))
+            await started.wait()
+            waiter = asyncio.ensure_future(cache.get("005930", BASE_DT))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await asyncio.wait_for(waiter, 1)
+
+        self.assertIsNone(asyncio.run(scenario()))
+        self.assertEqual(cache._pending, {})
+
+    def test_failed_fetch_is_not_cached(self):
+        cache = self.make_cache()
+        cache.transport.post.return_value = KiwoomResponse(500, None)
+        self.assertIsNone(asyncio.run(cache.get("005930", BASE_DT)))
+        cache.transport.post.return_value = self.response
+        self.assertIsNotNone(asyncio.run(cache.get("005930", BASE_DT)))
+        self.assertEqual(cache.transport.post.await_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test Indicators
+기술적 지표 배치형/증분형 일치 테스트
+"""
+
+import sys
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+
+# 프로젝트 루트 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import indicators as ind
+
+
+def price_series(n=300, seed=0, integer=True):
+    rng = np.random.default_rng(seed)
+    close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    close = np.round(close) if integer else close
+    # 중간에 가격이 멈춘 구간 (스토캐스틱 고가=저가, RSI 하락폭 0)
+    close[100:130] = close[100]
+    high = close + np.round(rng.random(n) * 30)
+    low = close - np.round(rng.random(n) * 30)
+    high[100:130] = low[100:130] = close[100:130]
+    volume = rng.integers(0, 1000, n).astype(float)
+    volume[:3] = 0
+    return high, low, close, volume
+
+
+def stream(state, *columns):
+    """증분형 상태 객체에 한 틱씩 넣은 결과 배열 (튜플 반환은 지표별로 분리)"""
+    values = np.array([state.update(*tick) for tick in zip(*columns)], dtype=np.float64)
+    return values.T
+
+
+class TestIndicators(unittest.TestCase):
+    """배치형(배열)과 증분형(틱) 결과가 비트 단위로 같아야 함"""
+
+    def assert_same(self, actual, expected):
+        np.testing.assert_array_equal(np.asarray(actual), np.asarray(expected))
+
+    def test_incremental_matches_batch(self):
+        for integer in (True, False):
+            high, low, close, volume = price_series(integer=integer)
+            self.assert_same(stream(ind.SMAState(20), close), ind.sma(close, 20))
+            self.assert_same(stream(ind.EMAState(12), close), ind.ema(close, 12))
+            self.assert_same(stream(ind.RSIState(14), close), ind.rsi(close, 14))
+            self.assert_same(stream(ind.MACDState(), close), ind.macd(close))
+            self.assert_same(stream(ind.BollingerState(20), close), ind.bollinger(close, 20))
+            self.assert_same(stream(ind.VWAPState(), close, volume), ind.vwap(close, volume))
+            self.assert_same(stream(ind.StochasticState(14, 3), high, low, close),
+                             ind.stochastic(high, low, close, 14, 3))
+
+    def test_batch_2d_matches_rows(self):
+        rows = np.stack([price_series(120, seed=s)[2] for s in range(3)])
+        for fn in (lambda x: ind.rsi(x), lambda x: ind.macd(x, 5, 10, 4)[1],
+                   lambda x: ind.bollinger(x, 20)[1], lambda x: ind.stochastic(x, x, x)[0]):
+            self.assert_same(fn(rows), np.stack([fn(row) for row in rows]))
+
+    def test_matches_pandas_definitions(self):
+        _, _, close, volume = price_series(integer=False)
+        s = pd.Series(close)
+        np.testing.assert_allclose(ind.sma(close, 20), s.rolling(20).mean(), rtol=1e-12)
+        np.testing.assert_allclose(ind.ema(close, 12), s.ewm(span=12, adjust=False).mean(), rtol=1e-12)
+        middle, upper, _ = ind.bollinger(close, 20)
+        np.testing.assert_allclose((upper - middle) / 2, s.rolling(20).std(), rtol=1e-6)
+        # calc_rsi 는 기존 pandas rolling 구현과 동일
+        delta = s.diff()
+        rs = delta.clip(lower=0).rolling(14, min_periods=1).mean() / (
+            (-delta.clip(upper=0)).rolling(14, min_periods=1).mean() + 1e-9)
+        np.testing.assert_allclose(ind.calc_rsi(s), 100 - 100 / (1 + rs), rtol=1e-12)
+        self.assertTrue(np.isnan(ind.macd(close)[0][24]) and not np.isnan(ind.macd(close)[0][25]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test Kiwoom Transport
+공용 비동기 전송 계층 테스트 (로컬 aiohttp 서버 사용)
+"""
+
+import sys
+import os
+import asyncio
+import time
+import unittest
+from unittest.mock import Mock, AsyncMock, patch
+
+from aiohttp import web
+
+# 프로젝트 루트 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.kiwoom_transport import KiwoomTransport
+from api.rate_limiter import RateLimiter
+
+
+class TestKiwoomTransport(unittest.TestCase):
+    """429 재시도, 401 토큰 재발급, 이벤트 루프 비차단 속도 제한"""
+
+    def setUp(self):
+        self.settings = Mock()
+        self.settings.ENVIRONMENT = "simulation"
+        self.settings.get_api_config.return_value = {"token": "old"}
+        self.token_manager = Mock()
+        self.token_manager.refresh_token_async = AsyncMock(side_effect=self.refresh)
+        self.calls = []
+
+    async def refresh(self, environment, transport):
+        # 실제 refresh_token_async 처럼 settings 토큰 갱신
+        self.settings.get_api_config.return_value = {"token": "new"}
+        return "new"
+
+    async def handler(self, request):
+        self.calls.append(request.headers.get('authorization'))
+        if request.path == '/busy' and len(self.calls) == 1:
+            return web.json_response({}, status=429)
+        if request.path == '/auth' and request.headers.get('authorization') != 'Bearer new':
+            return web.json_response({}, status=401)
+        return web.json_response({"return_code": 0, "n": len(self.calls)})
+
+    def run_with_server(self, scenario, limiter=None):
+        async def main():
+            app = web.Application()
+            app.router.add_route('*', '/{tail:.*}', self.handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            transport = KiwoomTransport(self.settings, self.token_manager, limiter or RateLimiter(100, 10))
+            try:
+                return await scenario(transport, f'http://127.0.0.1:{port}')
+            finally:
+                await transport.close()
+                await runner.cleanup()
+        return asyncio.run(main())
+
+    def test_retry_on_429(self):
+        async def scenario(transport, base):
+            return await transport.post(base + '/busy', json_data={})
+        with patch('api.kiwoom_transport.BACKOFF_BASE', 0):
+            response = self.run_with_server(scenario)
+        self.assertTrue(response.ok)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_token_refresh_on_401(self):
+        async def scenario(transport, base):
+            return await asyncio.gather(*[
+                transport.post(base + '/auth', headers={'authorization': 'Bearer old'}) for _ in range(3)])
+        responses = self.run_with_server(scenario)
+        self.assertTrue(all(r.ok for r in responses))
+        # 동시에 401 을 받아도 재발급은 한 번
+        self.token_manager.refresh_token_async.assert_awaited_once()
+
+    def test_rate_limit_does_not_block_loop(self):
+        async def scenario(transport, base):
+            ticks = 0
+            done = False
+
+            async def ticker():
+                nonlocal ticks
+                while not done:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            task = asyncio.create_task(ticker())
+            start = time.monotonic()
+            await asyncio.gather(*[transport.get(base + '/ok') for _ in range(3)])
+            elapsed = time.monotonic() - start
+            done = True
+            await task
+            return elapsed, ticks
+
+        elapsed, ticks = self.run_with_server(scenario, RateLimiter(5, 1))
+        self.assertGreaterEqual(elapsed, 0.4)
+        self.assertGreater(ticks, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test Market Snapshot
+거래량 순위 공용 스냅샷 조회 횟수/구독/불변성 테스트
+"""
+
+import sys
+import os
+import asyncio
+import unittest
+from dataclasses import FrozenInstanceError
+from unittest.mock import Mock, AsyncMock
+
+# 프로젝트 루트 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.kiwoom_transport import KiwoomResponse
+from data_collection.market_snapshot import MarketSnapshotService
+
+RANKING = [
+    {"stk_cd": "005930", "stk_nm": "삼성전자", "cur_prc": "70000", "sdnin_rt": "+1.5%", "flu_rt": 2.0,
+     "prev_trde_qty": "0", "now_trde_qty": "100000"},
+    {"stk_cd": "000660", "stk_nm": "SK하이닉스", "cur_prc": "120000", "sdnin_rt": "+1.2%", "flu_rt": 1.0,
+     "prev_trde_qty": "0", "now_trde_qty": "50000"},
+]
+
+
+class TestMarketSnapshotService(unittest.TestCase):
+    """틱당 한 번 조회, 여러 전략이 같은 스냅샷 구독"""
+
+    def setUp(self):
+        self.settings = Mock()
+        self.settings.get_api_url.return_value = "http://localhost/api/dostk/rkinfo"
+        self.settings.get_headers.return_value = {"api-id": "ka10023"}
+        self.transport = Mock()
+        self.transport.post = AsyncMock(return_value=KiwoomResponse(200, {"return_code": 0, "trde_qty_sdnin": RANKING}))
+        self.service = MarketSnapshotService(self.settings, self.transport, interval=0.05)
+
+    def test_subscribers_share_one_fetch_per_tick(self):
+        async def subscriber(ticks):
+            seen, last_tick = [], 0
+            for _ in range(ticks):
+                snapshot = await self.service.next_snapshot(last_tick)
+                last_tick = snapshot.tick
+                seen.append(snapshot)
+            return seen
+
+        async def scenario():
+            runner = asyncio.ensure_future(self.service.run())
+            try:
+                return await asyncio.gather(*[subscriber(3) for _ in range(4)])
+            finally:
+                runner.cancel()
+
+        results = asyncio.run(scenario())
+        # 전략 4개가 3틱씩 받아도 조회는 틱당 1번
+        self.assertEqual(self.transport.post.await_count, 3)
+        for seen in results:
+            self.assertEqual([s.tick for s in seen], [1, 2, 3])
+            self.assertIs(seen[0], results[0][0])
+
+    def test_concurrent_get_fetches_once_and_reuses_fresh_snapshot(self):
+        async def scenario():
+            snapshots = await asyncio.gather(*[self.service.get() for _ in range(5)])
+            snapshots.append(await self.service.get(max_age=60))
+            return snapshots
+
+        snapshots = asyncio.run(scenario())
+        self.assertEqual(self.transport.post.await_count, 1)
+        self.assertTrue(all(s is snapshots[0] for s in snapshots))
+        self.assertEqual([item["stk_cd"] for item in snapshots[0].volume_ranking], ["005930", "000660"])
+
+    def test_snapshot_is_immutable(self):
+        snapshot = asyncio.run(self.service.refresh())
+        with self.assertRaises(FrozenInstanceError):
+            snapshot.tick = 5
+        with self.assertRaises(TypeError):
+            snapshot.volume_ranking[0]["cur_prc"] = "1"
+
+    def test_failed_fetch_is_not_published(self):
+        self.transport.post.return_value = KiwoomResponse(500, None, "error")
+        self.assertIsNone(asyncio.run(self.service.refresh()))
+        self.assertIsNone(self.service.latest)
+
+
+if __name__ == '__main__':
+    unittest.main()
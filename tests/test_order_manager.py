@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test Order Manager
+스캐너 후보 매수 경로가 비동기 키움 호출만 사용하는지 테스트
+"""
+
+import sys
+import os
+import asyncio
+import unittest
+from unittest.mock import Mock
+from datetime import datetime
+
+# 프로젝트 루트 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from orders.order_manager import OrderManager
+from analysis.volume_scanner import VolumeCandidate
+from analysis.strategy2_analyzer import Strategy2Candidate
+from api.kiwoom_client import KiwoomClient
+from config.settings import Settings
+
+
+class TestOrderManagerAsyncPath(unittest.TestCase):
+    """후보 처리 -> 잔고/보유종목 조회 -> 주문 전 구간 비동기"""
+
+    def setUp(self):
+        self.settings = Settings()
+        self.client = Mock(spec=KiwoomClient)
+        self.client.get_account_balance_async.return_value = {"available_cash": 100_000_000}
+        self.client.get_account_info_async.return_value = {"acnt_evlt_remn_indv_tot": []}
+        self.client.place_order_async.return_value = {"return_code": 0, "ord_no": "0001"}
+        self.manager = OrderManager(self.settings, self.client)
+        self.manager.db_manager = Mock()
+        self.manager.volume_auto_trade = True
+
+    def assert_async_only(self):
+        self.client.place_order_async.assert_awaited_once()
+        self.client.get_account_info_async.assert_awaited()
+        self.client.place_order.assert_not_called()
+        self.client.get_account_info.assert_not_called()
+        self.client.get_account_balance.assert_not_called()
+
+    def test_volume_candidate_uses_async_client(self):
+        candidate = VolumeCandidate(
+            stock_code="005930", stock_name="삼성전자", current_price=10000, volume_ratio=1.0,
+            price_change=2.0, trade_value=500_000_000, score=7, timestamp=datetime.now(),
+            is_breakout=True, ma_trend="상승추세"
+        )
+        order = asyncio.run(self.manager.handle_volume_candidate(candidate))
+        self.assertIsNotNone(order)
+        self.assertIn("005930", self.manager.volume_positions)
+        self.assert_async_only()
+
+    def test_strategy2_candidate_uses_async_client(self):
+        candidate = Strategy2Candidate(
+            stock_code="000660", stock_name="SK하이닉스", current_price=20000, price_change=1.5,
+            volume_ratio=50.0, market_amount=300_000_000, ma_short=19500, ma_long=19000,
+            core_conditions_met=True, additional_conditions_met=True, final_signal=True,
+            confidence_score=0.9, timestamp=datetime.now()
+        )
+        # 기본 설정(최소 1주 10만원, 주가 5만원 이하)으로는 전략 2 매수 조건이 항상 불만족
+        self.manager.risk_management = dict(self.settings.RISK_MANAGEMENT, min_position_size=5)
+        order = asyncio.run(self.manager.handle_strategy2_candidate(candidate))
+        self.assertIsNotNone(order)
+        self.assert_async_only()
+        self.client.get_account_balance_async.assert_awaited()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test Rate Limiter
+공용 토큰 버킷 우선순위/api-id 한도 테스트
+"""
+
+import sys
+import os
+import asyncio
+import time
+import unittest
+
+# 프로젝트 루트 경로 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.rate_limiter import RateLimiter, PRIORITY_ORDER, PRIORITY_SELL, PRIORITY_SCAN
+
+
+class TestRateLimiter(unittest.TestCase):
+    """토큰 배분 순서와 대기 시간"""
+
+    def run_requests(self, limiter, requests):
+        """(이름, api_id, priority) 요청을 순서대로 대기열에 넣고 토큰을 받은 순서 반환"""
+        async def main():
+            granted = []
+
+            async def call(name, api_id, priority):
+                await limiter.acquire(api_id, priority)
+                granted.append((name, time.monotonic()))
+
+            tasks = []
+            for request in requests:
+                tasks.append(asyncio.create_task(call(*request)))
+                await asyncio.sleep(0)
+            await asyncio.gather(*tasks)
+            return granted
+        return asyncio.run(main())
+
+    def test_priority_order(self):
+        limiter = RateLimiter(rate=20, burst=1)
+        requests = [(f"scan{i}", "ka10023", PRIORITY_SCAN) for i in range(4)]
+        requests += [("sell", "kt00018", PRIORITY_SELL), ("order", "kt10001", PRIORITY_ORDER)]
+        granted = [name for name, _ in self.run_requests(limiter, requests)]
+        # 첫 스캔은 남은 토큰으로 바로 통과, 이후에는 주문 > 매도 감시 > 스캔 순서
+        self.assertEqual(granted, ["scan0", "order", "sell", "scan1", "scan2", "scan3"])
+
+    def test_api_budget_does_not_block_other_apis(self):
+        limiter = RateLimiter(rate=50, burst=5, api_budgets={"ka10023": 5})
+        requests = [("rank0", "ka10023", PRIORITY_SCAN), ("rank1", "ka10023", PRIORITY_SCAN),
+                    ("chart", "ka10081", PRIORITY_SCAN)]
+        start = time.monotonic()
+        granted = dict(self.run_requests(limiter, requests))
+        self.assertLess(granted["chart"] - start, 0.05)
+        # ka10023 은 초당 5건 -> 두 번째 호출은 약 0.2초 후
+        self.assertGreater(granted["rank1"] - start, 0.15)
+
+    def test_pause_blocks_all_callers(self):
+        limiter = RateLimiter(rate=100, burst=1)
+        limiter.pause(0.2)
+        start = time.monotonic()
+        self.run_requests(limiter, [("order", "kt10000", PRIORITY_ORDER)])
+        self.assertGreater(time.monotonic() - start, 0.15)
+        start = time.monotonic()
+        limiter.pause(0.1)
+        limiter.acquire_blocking("kt10000")
+        self.assertGreater(time.monotonic() - start, 0.08)
+
+    def test_acquire_blocking_rejected_inside_event_loop(self):
+        limiter = RateLimiter(rate=100, burst=1)
+
+        async def call_sync_path():
+            limiter.acquire_blocking("kt10000")
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(call_sync_path())
+        # 루프 밖에서는 그대로 동작
+        limiter.acquire_blocking("kt10000")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,6 +7,7 @@ Test Volume Scanner
 import sys
 import os
 import asyncio
+import tempfile
 import unittest
 from unittest.mock import Mock, patch, AsyncMock
 from datetime import datetime
@@ -15,6 +16,9 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from analysis.volume_scanner import VolumeScanner, VolumeCandidate
+from api.kiwoom_transport import KiwoomTransport, KiwoomResponse
+from data_collection.daily_chart_cache import DailyChartCache
+from data_collection.market_snapshot import MarketSnapshotService
 from config.settings import Settings
 from utils.token_manager import TokenManager
 
@@ -26,6 +30,11 @@ class TestVolumeScanner(unittest.TestCase):
         self.settings = Settings()
         self.token_manager = Mock(spec=TokenManager)
         self.scanner = VolumeScanner(self.settings, self.token_manager)
+        # 일봉 캐시는 임시 디렉터리에
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.scanner.daily_charts = DailyChartCache(self.settings, cache_dir=cache_dir.name)
+        self.scanner.market_snapshot = MarketSnapshotService(self.settings)
     
     def test_volume_candidate_creation(self):
         """VolumeCandidate 생성 테스트"""
@@ -60,13 +69,11 @@ class TestVolumeScanner(unittest.TestCase):
         self.assertEqual(len(self.scanner.candidates), 0)
         self.assertEqual(len(self.scanner.processed_stocks), 0)
     
-    @patch('analysis.volume_scanner.requests.post')
+    @patch.object(KiwoomTransport, 'post', new_callable=AsyncMock)
     def test_get_volume_ranking(self, mock_post):
         """거래량 순위 조회 테스트"""
         # Mock 응답 설정
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        mock_post.return_value = KiwoomResponse(200, {
             "return_code": 0,
             "trde_qty_sdnin": [
                 {
@@ -79,8 +86,7 @@ class TestVolumeScanner(unittest.TestCase):
                     "now_trde_qty": "2500000"
                 }
             ]
-        }
-        mock_post.return_value = mock_response
+        })
         
         # 토큰 Mock 설정
         self.token_manager.get_valid_token = AsyncMock(return_value="test_token")
@@ -91,13 +97,11 @@ class TestVolumeScanner(unittest.TestCase):
         # API 호출 확인
         mock_post.assert_called_once()
     
-    @patch('analysis.volume_scanner.requests.post')
+    @patch.object(KiwoomTransport, 'post', new_callable=AsyncMock)
     def test_get_daily_chart_score(self, mock_post):
         """일봉 차트 점수 계산 테스트"""
         # Mock 응답 설정
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        mock_post.return_value = KiwoomResponse(200, {
             "stk_dt_pole_chart_qry": [
                 {"dt": "20240101", "cur_prc": "65000"},
                 {"dt": "20240102", "cur_prc": "66000"},
@@ -106,8 +110,7 @@ class TestVolumeScanner(unittest.TestCase):
                 {"dt": "20240105", "cur_prc": "69000"},
                 {"dt": "20240106", "cur_prc": "70000"}
             ]
-        }
-        mock_post.return_value = mock_response
+        })
         
         # 토큰 Mock 설정
         self.token_manager.get_valid_token = AsyncMock(return_value="test_token")
@@ -200,14 +203,13 @@ class TestVolumeScannerIntegration(unittest.TestCase):
         self.settings = Settings()
         self.token_manager = Mock(spec=TokenManager)
         self.scanner = VolumeScanner(self.settings, self.token_manager)
+        self.scanner.market_snapshot = MarketSnapshotService(self.settings)
     
-    @patch('analysis.volume_scanner.requests.post')
+    @patch.object(KiwoomTransport, 'post', new_callable=AsyncMock)
     def test_full_scanning_process(self, mock_post):
         """전체 스캐닝 프로세스 테스트"""
         # Mock 응답 설정
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        mock_post.return_value = KiwoomResponse(200, {
             "return_code": 0,
             "trde_qty_sdnin": [
                 {
@@ -229,8 +231,7 @@ class TestVolumeScannerIntegration(unittest.TestCase):
                     "now_trde_qty": "900000"
                 }
             ]
-        }
-        mock_post.return_value = mock_response
+        })
         
         # 토큰 Mock 설정
         self.token_manager.get_valid_token = AsyncMock(return_value="test_token")
@@ -243,5 +244,35 @@ class TestVolumeScannerIntegration(unittest.TestCase):
         # 실제 API 호출이 없으므로 빈 리스트 반환
         self.assertEqual(len(candidates), 0)
 
+    def test_execution_strength_fetched_concurrently(self):
+        """체결강도 조회는 동시에 요청하고 후보는 거래량 순위 순서 유지"""
+        codes = [f"00000{i}" for i in range(5)]
+        ranking = [
+            {"stk_cd": code, "stk_nm": code, "cur_prc": "10000", "sdnin_rt": "+1.5%", "flu_rt": 2.0,
+             "prev_trde_qty": "0", "now_trde_qty": "100000"}
+            for code in codes
+        ]
+
+        async def slow_strength(stock_code):
+            # 순위가 낮을수록 먼저 응답
+            await asyncio.sleep(0.1 - codes.index(stock_code) * 0.02)
+            return 150.0
+
+        self.scanner.db = Mock()
+        self.scanner.get_volume_ranking = AsyncMock(return_value=ranking)
+        self.scanner.get_execution_strength = slow_strength
+
+        async def scan():
+            start = asyncio.get_running_loop().time()
+            candidates = await self.scanner.scan_volume_candidates()
+            return candidates, asyncio.get_running_loop().time() - start
+
+        with patch.object(VolumeScanner, 'get_market_condition', return_value=None):
+            candidates, elapsed = asyncio.run(scan())
+
+        self.assertEqual([c.stock_code for c in candidates], codes)
+        # 순차 조회면 0.3초 이상
+        self.assertLess(elapsed, 0.2)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
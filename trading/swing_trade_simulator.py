@@ -1,8 +1,11 @@
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
+from core.cost_model import EXIT_TP, EXIT_CLOSE
 
-def simulate_trade(minute_csv_path, entry_time, entry_price, profit_target=0.10, stop_loss=0.05):
+
+def simulate_trade(minute_csv_path, entry_time, entry_price, profit_target=0.10, stop_loss=0.05, cost_model=None):
     """
     분봉 데이터를 이용해 진입가 대비 +10% 익절, -5% 손절 중 먼저 도달한 시점에 청산.
     Args:
@@ -11,8 +14,9 @@ def simulate_trade(minute_csv_path, entry_time, entry_price, profit_target=0.10,
         entry_price (float): 진입가 (진입 시점의 close)
         profit_target (float): 익절률 (default 0.10)
         stop_loss (float): 손절률 (default 0.05)
+        cost_model: core/cost_model.py 거래비용 모델 (지정하면 비용 반영 수익률 net_return 추가)
     Returns:
-        dict: {'entry_time', 'entry_price', 'exit_time', 'exit_price', 'return', 'result'}
+        dict: {'entry_time', 'entry_price', 'exit_time', 'exit_price', 'return', 'result'(, 'net_return')}
     """
     df = pd.read_csv(minute_csv_path, parse_dates=['datetime'])
     if isinstance(entry_time, str):
@@ -47,11 +51,18 @@ def simulate_trade(minute_csv_path, entry_time, entry_price, profit_target=0.10,
             exit_price = entry_price
             result = '데이터없음'
     ret = (exit_price - entry_price) / entry_price
-    return {
+    trade = {
         'entry_time': entry_time,
         'entry_price': entry_price,
         'exit_time': exit_time,
         'exit_price': exit_price,
         'return': ret,
         'result': result
-    } 
\ No newline at end of file
+    }
+    if cost_model is not None:
+        # 익절은 지정가, 나머지는 시장가 청산으로 보고 비용 반영
+        exit_code = EXIT_TP if result == '익절' else EXIT_CLOSE
+        entry_fill = cost_model.entry_fill(np.float64(entry_price))
+        exit_fill = cost_model.exit_fill(np.float64(exit_price), exit_code)
+        trade['net_return'] = float(cost_model.net_return(entry_fill, exit_fill))
+    return trade 
\ No newline at end of file
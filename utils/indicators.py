@@ -1,14 +1,352 @@
+"""
+기술적 지표 공용 라이브러리 (SMA/EMA/RSI/MACD/볼린저/VWAP/스토캐스틱)
+
+두 가지 형태를 같은 산술로 제공해서 백테스트와 실시간 계산 값이 일치한다.
+    배치형    rsi(close), macd(close) ...  - 마지막 축 기준 배열 연산 (1차원 시계열 또는 (종목/거래일 x 분) 2차원)
+    증분형    RSIState().update(price) ... - 틱마다 O(1) 갱신, 상태 객체 보관
+
+구간 합은 누적합 차이(C[t] - C[t-period])로, EMA 는 alpha * x + (1 - alpha) * prev 점화식으로
+양쪽 모두 계산하므로 같은 입력이면 값이 비트 단위로 같다.
+앞 구간(워밍업)은 NaN 이다 (RSI 는 calc_rsi 와 같이 가능한 개수로 평균).
+"""
+
+from collections import deque
+
 import numpy as np
 import pandas as pd
 
+RSI_EPS = 1e-9  # 평균 하락폭 0 나눗셈 방지 (calc_rsi 와 동일)
+
+
+def _as_float(x):
+    return np.asarray(x, dtype=np.float64)
+
+
+def _window_sums(x, period):
+    """마지막 축 기준 길이 period 구간 합 (앞 period-1 개는 NaN)"""
+    cum = np.cumsum(x, axis=-1)
+    sums = np.full(cum.shape, np.nan)
+    if cum.shape[-1] >= period:
+        sums[..., period - 1] = cum[..., period - 1]
+        sums[..., period:] = cum[..., period:] - cum[..., :-period]
+    return sums
+
+
+def _on_valid(fn, x, first, *args):
+    """x[..., first:] 에만 fn 적용 (앞 구간 NaN 이 누적합에 섞이지 않게)"""
+    out = np.full(x.shape, np.nan)
+    if x.shape[-1] > first:
+        out[..., first:] = fn(x[..., first:], *args)
+    return out
+
+
+def _rolling(x, period, reduce):
+    out = np.full(x.shape, np.nan)
+    if x.shape[-1] >= period:
+        windows = np.lib.stride_tricks.sliding_window_view(x, period, axis=-1)
+        out[..., period - 1:] = reduce(windows, axis=-1)
+    return out
+
+
+def sma(x, period):
+    """단순 이동평균"""
+    return _window_sums(_as_float(x), period) / period
+
+
+def ema(x, period):
+    """지수 이동평균 (pandas ewm(span=period, adjust=False) 와 같은 정의, 첫 값으로 시작)"""
+    x = _as_float(x)
+    alpha = 2.0 / (period + 1)
+    beta = 1.0 - alpha
+    out = np.empty(x.shape)
+    if x.shape[-1] == 0:
+        return out
+    if x.ndim == 1:
+        # 1차원은 파이썬 float 루프가 numpy 스칼라 연산보다 빠름 (산술은 동일)
+        value = float(x[0])
+        values = [value]
+        for v in x[1:].tolist():
+            value = alpha * v + beta * value
+            values.append(value)
+        out[:] = values
+        return out
+    out[..., 0] = x[..., 0]
+    for t in range(1, x.shape[-1]):
+        out[..., t] = alpha * x[..., t] + beta * out[..., t - 1]
+    return out
+
+
+def rolling_max(x, period):
+    return _rolling(_as_float(x), period, np.max)
+
+
+def rolling_min(x, period):
+    return _rolling(_as_float(x), period, np.min)
+
+
+def rsi_averages(close, period=14):
+    """직전 period 개 가격변화의 평균 상승폭/하락폭 (앞 구간은 있는 개수로 평균, 첫 값은 NaN)"""
+    close = _as_float(close)
+    delta = np.diff(close, axis=-1)
+    zero = np.zeros(close.shape[:-1] + (1,))
+    gain = np.cumsum(np.concatenate([zero, np.where(delta > 0, delta, 0.0)], axis=-1), axis=-1)
+    loss = np.cumsum(np.concatenate([zero, np.where(delta < 0, -delta, 0.0)], axis=-1), axis=-1)
+    gain_sum, loss_sum = gain.copy(), loss.copy()
+    gain_sum[..., period:] = gain[..., period:] - gain[..., :-period]
+    loss_sum[..., period:] = loss[..., period:] - loss[..., :-period]
+    count = np.minimum(np.arange(close.shape[-1]), period).astype(np.float64)
+    count[:1] = np.nan
+    return gain_sum / count, loss_sum / count
+
+
+def rsi(close, period=14):
+    """RSI (평균 상승폭/하락폭 단순평균 방식)"""
+    avg_gain, avg_loss = rsi_averages(close, period)
+    rs = avg_gain / (avg_loss + RSI_EPS)
+    return 100 - (100 / (1 + rs))
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """
+    MACD
+
+    Returns:
+        (macd_line, signal_line, histogram) - macd_line 은 slow 번째 값부터,
+        signal_line 은 그 뒤 signal 번째 값부터 (앞 구간 NaN)
+    """
+    close = _as_float(close)
+    line = ema(close, fast) - ema(close, slow)
+    line[..., :slow - 1] = np.nan
+    signal_line = _on_valid(ema, line, slow - 1, signal)
+    signal_line[..., :slow + signal - 2] = np.nan
+    return line, signal_line, line - signal_line
+
+
+def bollinger(close, period=20, num_std=2.0):
+    """
+    볼린저 밴드 (표본 표준편차, pandas rolling std 와 같은 ddof=1)
+
+    Returns:
+        (middle, upper, lower)
+    """
+    close = _as_float(close)
+    # 분산 누적합 오차를 줄이기 위해 첫 값 기준으로 이동 후 계산
+    base = close[..., :1]
+    shifted = close - base
+    sums = _window_sums(shifted, period)
+    squares = _window_sums(shifted * shifted, period)
+    var = np.maximum((squares - sums * sums / period) / (period - 1), 0.0)
+    middle = sums / period + base
+    std = np.sqrt(var)
+    return middle, middle + num_std * std, middle - num_std * std
+
+
+def vwap(price, volume):
+    """누적 VWAP (거래일 시작부터)"""
+    price, volume = _as_float(price), _as_float(volume)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.cumsum(price * volume, axis=-1) / np.cumsum(volume, axis=-1)
+
+
+def stochastic(high, low, close, k_period=14, d_period=3):
+    """
+    스토캐스틱 %K/%D (고가=저가 구간은 %K 50)
+
+    Returns:
+        (k_percent, d_percent)
+    """
+    highest = rolling_max(high, k_period)
+    lowest = rolling_min(low, k_period)
+    close = _as_float(close)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = np.where(highest != lowest, 100 * (close - lowest) / (highest - lowest), 50.0)
+    k[np.isnan(highest)] = np.nan
+    d = _on_valid(lambda x: _window_sums(x, d_period) / d_period, k, k_period - 1)
+    return k, d
+
+
 def calc_vwap(df):
-    return (df['close'] * df['volume']).cumsum() / df['volume'].cumsum()
+    return pd.Series(vwap(df['close'], df['volume']), index=df.index)
+
 
 def calc_rsi(series, period=14):
-    delta = series.diff()
-    up = delta.clip(lower=0)
-    down = -delta.clip(upper=0)
-    ma_up = up.rolling(window=period, min_periods=1).mean()
-    ma_down = down.rolling(window=period, min_periods=1).mean()
-    rs = ma_up / (ma_down + 1e-9)
-    return 100 - (100 / (1 + rs)) 
\ No newline at end of file
+    return pd.Series(rsi(series, period), index=series.index)
+
+
+# === 증분형 (실시간 틱) ===
+
+class _WindowSum:
+    """누적합 차이로 길이 period 구간 합 (배치형 _window_sums 와 같은 산술)"""
+
+    def __init__(self, period):
+        self.period = period
+        self.cum = 0.0
+        self.history = deque(maxlen=period + 1)  # 최근 누적합
+
+    def update(self, x):
+        self.cum = self.cum + x
+        self.history.append(self.cum)
+        if len(self.history) == self.period + 1:
+            return self.cum - self.history[0]
+        if len(self.history) == self.period:
+            return self.cum
+        return np.nan
+
+
+class SMAState:
+    """단순 이동평균 증분 계산"""
+
+    def __init__(self, period):
+        self.period = period
+        self._sum = _WindowSum(period)
+        self.value = np.nan
+
+    def update(self, x):
+        self.value = self._sum.update(float(x)) / self.period
+        return self.value
+
+
+class EMAState:
+    """지수 이동평균 증분 계산"""
+
+    def __init__(self, period):
+        self.alpha = 2.0 / (period + 1)
+        self.beta = 1.0 - self.alpha
+        self.value = None
+
+    def update(self, x):
+        x = float(x)
+        self.value = x if self.value is None else self.alpha * x + self.beta * self.value
+        return self.value
+
+
+class RSIState:
+    """RSI 증분 계산"""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.prev_close = None
+        self.count = 0
+        self.gain_cum = self.loss_cum = 0.0
+        self.gain_history = deque([0.0], maxlen=period + 1)
+        self.loss_history = deque([0.0], maxlen=period + 1)
+        self.avg_gain = self.avg_loss = self.value = np.nan
+
+    def update(self, close):
+        close = float(close)
+        if self.prev_close is None:
+            self.prev_close = close
+            return self.value
+        delta = close - self.prev_close
+        self.prev_close = close
+        self.gain_cum = self.gain_cum + (delta if delta > 0 else 0.0)
+        self.loss_cum = self.loss_cum + (-delta if delta < 0 else 0.0)
+        self.count += 1
+        self.gain_history.append(self.gain_cum)
+        self.loss_history.append(self.loss_cum)
+        full = len(self.gain_history) == self.period + 1
+        gain_sum = self.gain_cum - self.gain_history[0] if full else self.gain_cum
+        loss_sum = self.loss_cum - self.loss_history[0] if full else self.loss_cum
+        n = float(min(self.count, self.period))
+        self.avg_gain, self.avg_loss = gain_sum / n, loss_sum / n
+        self.value = 100 - (100 / (1 + self.avg_gain / (self.avg_loss + RSI_EPS)))
+        return self.value
+
+
+class MACDState:
+    """MACD 증분 계산 -> (macd_line, signal_line, histogram)"""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.slow = slow
+        self.signal_period = signal
+        self._fast = EMAState(fast)
+        self._slow = EMAState(slow)
+        self._signal = EMAState(signal)
+        self.count = 0
+
+    def update(self, close):
+        line = self._fast.update(close) - self._slow.update(close)
+        self.count += 1
+        if self.count < self.slow:
+            return np.nan, np.nan, np.nan
+        signal_line = self._signal.update(line)
+        if self.count < self.slow + self.signal_period - 1:
+            signal_line = np.nan
+        return line, signal_line, line - signal_line
+
+
+class BollingerState:
+    """볼린저 밴드 증분 계산 -> (middle, upper, lower)"""
+
+    def __init__(self, period=20, num_std=2.0):
+        self.period = period
+        self.num_std = num_std
+        self.base = None
+        self._sum = _WindowSum(period)
+        self._squares = _WindowSum(period)
+
+    def update(self, close):
+        close = float(close)
+        if self.base is None:
+            self.base = close
+        shifted = close - self.base
+        sums = self._sum.update(shifted)
+        squares = self._squares.update(shifted * shifted)
+        var = max((squares - sums * sums / self.period) / (self.period - 1), 0.0) if not np.isnan(sums) else np.nan
+        middle = sums / self.period + self.base
+        std = np.sqrt(var)
+        return middle, middle + self.num_std * std, middle - self.num_std * std
+
+
+class VWAPState:
+    """누적 VWAP 증분 계산 (거래일마다 새로 생성)"""
+
+    def __init__(self):
+        self.pv = 0.0
+        self.volume = 0.0
+        self.value = np.nan
+
+    def update(self, price, volume):
+        price, volume = float(price), float(volume)
+        self.pv = self.pv + price * volume
+        self.volume = self.volume + volume
+        self.value = self.pv / self.volume if self.volume else np.nan
+        return self.value
+
+
+class _RollingExtreme:
+    """단조 deque 로 길이 period 구간 최대/최소 (분할 상환 O(1))"""
+
+    def __init__(self, period, is_max):
+        self.period = period
+        self.is_max = is_max
+        self.window = deque()  # (index, value), 값이 단조
+        self.index = 0
+
+    def update(self, x):
+        while self.window and ((self.window[-1][1] <= x) if self.is_max else (self.window[-1][1] >= x)):
+            self.window.pop()
+        self.window.append((self.index, x))
+        if self.window[0][0] <= self.index - self.period:
+            self.window.popleft()
+        self.index += 1
+        return self.window[0][1] if self.index >= self.period else np.nan
+
+
+class StochasticState:
+    """스토캐스틱 증분 계산 -> (k_percent, d_percent)"""
+
+    def __init__(self, k_period=14, d_period=3):
+        self.d_period = d_period
+        self._high = _RollingExtreme(k_period, is_max=True)
+        self._low = _RollingExtreme(k_period, is_max=False)
+        self._d = _WindowSum(d_period)
+
+    def update(self, high, low, close):
+        highest = self._high.update(float(high))
+        lowest = self._low.update(float(low))
+        if np.isnan(highest):
+            return np.nan, np.nan
+        close = float(close)
+        k = 100 * (close - lowest) / (highest - lowest) if highest != lowest else 50.0
+        return k, self._d.update(k) / self.d_period
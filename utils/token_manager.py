@@ -132,6 +132,43 @@ class TokenManager:
             self.logger.error(f"Error refreshing token: {e}")
             return False
     
+    async def refresh_token_async(self, environment: str = "simulation", transport=None) -> Optional[str]:
+        """
+        토큰 비동기 재발급 (이벤트 루프를 막지 않음)
+
+        발급받은 토큰은 settings 와 secrets 파일에 반영하고 반환 (실패 시 None)
+        """
+        from api.rate_limiter import PRIORITY_ORDER
+        if transport is None:
+            from api.kiwoom_transport import get_kiwoom_transport
+            transport = get_kiwoom_transport(self.settings)
+
+        api_config = self.settings.get_api_config(environment)
+        url = self.settings.get_api_url("token", environment)
+        data = {
+            'grant_type': 'client_credentials',
+            'appkey': api_config.get('appkey'),
+            'secretkey': api_config.get('secretkey'),
+        }
+
+        try:
+            self.logger.info(f"Requesting token from: {url}")
+            # 토큰 발급은 스캔 트래픽 뒤에서 기다리지 않도록 주문 우선순위
+            response = await transport.post(url, headers={'Content-Type': 'application/json'}, json_data=data,
+                                            priority=PRIORITY_ORDER, retry_auth=False)
+            self.logger.info(f"Token request status: {response.status}")
+            token = (response.data or {}).get('token') if response.status == 200 else None
+            if not token:
+                self.logger.error(f"Token request failed: {response.status}")
+                self.logger.error(f"Response: {response.text}")
+                return None
+            self.settings.update_token(token, environment)
+            self.logger.info(f"Token refreshed for {environment} environment")
+            return token
+        except Exception as e:
+            self.logger.error(f"Error refreshing token: {e}")
+            return None
+
     def refresh_all_tokens(self) -> Dict[str, bool]:
         """Refresh tokens for all environments"""
         results = {}